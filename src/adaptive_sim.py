@@ -0,0 +1,147 @@
+from decimal import Decimal
+from typing import List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from scipy.stats import beta, norm
+
+from common import IntervalMethod, RandomSource
+from game_state import GameState
+from progress import Progress
+from sampling import IterationStreams, Seed
+
+if TYPE_CHECKING:
+    from parallel_sim import GamePool
+
+DEFAULT_CHUNK_SIZE = 50
+DEFAULT_CONFIDENCE = 0.95
+# with no explicit cap a game can be given this many times the fixed iteration count
+DEFAULT_MAX_ITERATIONS_FACTOR = 4
+
+
+def win_interval(wins: int, iterations: int, method: IntervalMethod = IntervalMethod.WILSON,
+                 confidence: float = DEFAULT_CONFIDENCE) -> Tuple[float, float]:
+    """The confidence interval of a win probability from wins out of iterations games"""
+    if iterations == 0:
+        return 0.0, 1.0
+    if method == IntervalMethod.JEFFREYS:
+        # equal tailed interval of the Beta(1/2, 1/2) prior's posterior, pinned at 0 and 1 like the usual variant
+        tail = (1.0 - confidence) / 2.0
+        low = 0.0 if wins == 0 else float(beta.ppf(tail, wins + 0.5, iterations - wins + 0.5))
+        high = 1.0 if wins == iterations else float(beta.ppf(1.0 - tail, wins + 0.5, iterations - wins + 0.5))
+        return low, high
+    z = float(norm.ppf(0.5 + confidence / 2.0))
+    p = wins / iterations
+    denominator = 1.0 + z * z / iterations
+    center = (p + z * z / (2.0 * iterations)) / denominator
+    half_width = z * ((p * (1.0 - p) / iterations + z * z / (4.0 * iterations * iterations)) ** 0.5) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+class AdaptiveGame(object):
+    def __init__(self, game: GameState, seed: Seed, random_source: RandomSource = RandomSource.PSEUDO) -> None:
+        """ A game played for its home win probability a chunk of iterations at a time.  Iteration x always rolls
+        from the same stream of seed, see IterationStreams, so the first n iterations are the same games a fixed
+        run of n plays.  Every iteration starts from the teams as they were when the game was given, so nothing
+        one iteration leaves on them, like the wired and tired buffs of coffee weather, carries into the next and
+        a chunk played on a start_copy elsewhere plays the same games. """
+        self.game = game
+        self.seed = seed
+        self.random_source = random_source
+        self.streams = IterationStreams(seed, random_source)
+        self.home_scores: List[Decimal] = []
+        self.away_scores: List[Decimal] = []
+        self.home_wins = 0
+        self.home_start = game.home_team.copy_for_game()
+        self.away_start = game.away_team.copy_for_game()
+
+    @property
+    def iterations(self) -> int:
+        return len(self.home_scores)
+
+    def run(self, num_iterations: int, start: Optional[int] = None) -> None:
+        """Play the next num_iterations iterations, or those from start on for a chunk played elsewhere"""
+        start = self.iterations if start is None else start
+        self.restart()
+        for x in range(start, start + num_iterations):
+            self.game.set_random_stream(self.streams.stream(x))
+            home_score, away_score, _ = self.game.simulate_game()
+            self.record([home_score], [away_score])
+            self.restart()
+
+    def restart(self) -> None:
+        """Reset the game to its start, with the teams as they were when it was given"""
+        self.game.home_team.restore_game_start(self.home_start)
+        self.game.away_team.restore_game_start(self.away_start)
+        self.game.reset_game_state()
+
+    def start_copy(self) -> GameState:
+        """A copy of the game at its start, with empty stats, for a chunk of its iterations played elsewhere"""
+        game = self.game.clone()
+        game.home_team.restore_game_start(self.home_start)
+        game.away_team.restore_game_start(self.away_start)
+        return game
+
+    def record(self, home_scores: List[Decimal], away_scores: List[Decimal]) -> None:
+        """Add the scores of the next iterations"""
+        self.home_scores.extend(home_scores)
+        self.away_scores.extend(away_scores)
+        self.home_wins += sum(1 for home_score, away_score in zip(home_scores, away_scores) if home_score > away_score)
+
+    def interval(self, method: IntervalMethod = IntervalMethod.WILSON,
+                 confidence: float = DEFAULT_CONFIDENCE) -> Tuple[float, float]:
+        return win_interval(self.home_wins, self.iterations, method, confidence)
+
+    def width(self, method: IntervalMethod = IntervalMethod.WILSON, confidence: float = DEFAULT_CONFIDENCE) -> float:
+        low, high = self.interval(method, confidence)
+        return high - low
+
+
+def run_chunks(chunks: Sequence[Tuple[AdaptiveGame, int]], pool: Optional['GamePool'] = None,
+               progress: Optional[Progress] = None) -> None:
+    """Play each (game, num_iterations) chunk, in order here or spread over the workers of pool"""
+    if pool is None:
+        for game, num_iterations in chunks:
+            game.run(num_iterations)
+            if progress is not None:
+                progress.advance(num_iterations)
+    else:
+        pool.run_chunks(chunks)
+        if progress is not None:
+            progress.advance(sum(num_iterations for _, num_iterations in chunks))
+
+
+def run_fixed(games: List[AdaptiveGame], iterations: int, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              pool: Optional['GamePool'] = None, progress: Optional[Progress] = None) -> None:
+    """Play every game iterations times, in chunks so a pool can share a game's iterations between workers"""
+    run_chunks([(game, min(chunk_size, iterations - start)) for game in games
+                for start in range(0, iterations, chunk_size)], pool, progress)
+
+
+def run_adaptive(games: List[AdaptiveGame], target_width: float, iterations: int, max_iterations: int,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, method: IntervalMethod = IntervalMethod.WILSON,
+                 confidence: float = DEFAULT_CONFIDENCE, pool: Optional['GamePool'] = None,
+                 progress: Optional[Progress] = None) -> None:
+    """ Play each game in chunks until its win interval is no wider than target_width, at most iterations times.
+    The iterations the decided games left of their share of the budget are then spent on the games still over
+    the width a chunk at a time, widest first, each up to max_iterations.  With a pool every undecided game
+    plays its next chunk at once, and the spare iterations go to as many of the widest games as it has workers. """
+    while True:
+        chunks = [(game, min(chunk_size, iterations - game.iterations)) for game in games
+                  if game.iterations < iterations and game.width(method, confidence) > target_width]
+        if not chunks:
+            break
+        run_chunks(chunks, pool, progress)
+    spare = iterations * len(games) - sum(game.iterations for game in games)
+    lanes = 1 if pool is None else pool.workers
+    while spare > 0:
+        open_games = [game for game in games
+                      if game.iterations < max_iterations and game.width(method, confidence) > target_width]
+        if not open_games:
+            break
+        chunks = []
+        for game in sorted(open_games, key=lambda g: g.width(method, confidence), reverse=True)[:lanes]:
+            num_iterations = min(chunk_size, spare, max_iterations - game.iterations)
+            chunks.append((game, num_iterations))
+            spare -= num_iterations
+            if spare == 0:
+                break
+        run_chunks(chunks, pool, progress)
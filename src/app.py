@@ -3,13 +3,16 @@ import logging
 from logging import Formatter, FileHandler
 from flask import Flask, request, render_template
 
+from common import IntervalMethod, JobStatus, RandomSource, StatProfile
 from fantasim import setup_and_run_custom
+from job_queue import JobQueue
 from power_rankings import run_power_ranking_sim
-from season_sim import run_season_sim
+from result_cache import ResultCache
+from season_sim import run_full_season_sim, run_season_sim
 from season_sim_sums import sum_season_files
 
 app = Flask(__name__)
-from daily_sim import run_daily_sim
+from daily_sim import fetch_daily_games, run_daily_sim
 
 _VERSION = 1  # API version
 
@@ -19,57 +22,163 @@ def main():
     return render_template('index.html')
 
 
-@app.route('/v{}/powerrankings'.format(_VERSION), methods=["GET"])
-def powerrankings():
-    iterations = int(request.get_json()['iterations'])
-    season = int(request.get_json()['season'])
+# identical requests on the same stlats and models are answered from here, see ResultCache
+result_cache = ResultCache()
 
-    return run_power_ranking_sim(season, iterations)
 
+def optional(params, key, convert):
+    value = params.get(key)
+    return convert(value) if value is not None else None
 
-@app.route('/v{}/seasonsim'.format(_VERSION), methods=["GET"])
-def seasonsim():
-    iterations = request.get_json()['iterations']
-    season = request.get_json()['season']
-    day = request.get_json()['day']
-    file_id = request.get_json()['file_id']
+
+def powerrankings_job(params, progress=None):
+    iterations = int(params['iterations'])
+    season = int(params['season'])
+    seed = params.get('seed')
+    random_source = RandomSource[params.get('random_source', RandomSource.PSEUDO.name)]
+    # the matchups are spread over this many worker processes
+    workers = optional(params, 'workers', int)
+
+    return result_cache.get_or_compute('powerrankings', params, lambda: run_power_ranking_sim(
+        season, iterations, seed=seed, random_source=random_source, workers=workers, progress=progress))
+
+
+def seasonsim_job(params, progress=None):
+    iterations = params['iterations']
+    season = params['season']
+    day = params['day']
+    file_id = params['file_id']
     try:
-        seg_size = request.get_json()['seg_size']
+        seg_size = params['seg_size']
     except KeyError:
         seg_size = None
+    seed = params.get('seed')
+    random_source = RandomSource[params.get('random_source', RandomSource.PSEUDO.name)]
 
-    return run_season_sim(int(season), int(day), file_id, int(iterations), int(seg_size), True)
+    return result_cache.get_or_compute('seasonsim', params, lambda: run_season_sim(
+        int(season), int(day), file_id, int(iterations), int(seg_size), True, seed=seed, random_source=random_source,
+        progress=progress))
 
-@app.route('/v{}/sumseason'.format(_VERSION), methods=["GET"])
-def sumseason():
-    file_id = request.get_json()['file_id']
 
-    return sum_season_files(file_id)
+def fullseasonsim_job(params, progress=None):
+    iterations = params['iterations']
+    season = params['season']
+    file_id = params['file_id']
+    seg_size = params.get('seg_size', 3)
+    future = params.get('future', True)
+    seed = params.get('seed')
+    random_source = RandomSource[params.get('random_source', RandomSource.PSEUDO.name)]
+    # the days are spread over this many worker processes
+    workers = optional(params, 'workers', int)
 
-@app.route('/v{}/dailysim'.format(_VERSION), methods=["GET"])
-def dailysim():
-    iterations = request.get_json()['iterations']
+    return result_cache.get_or_compute('fullseasonsim', params, lambda: run_full_season_sim(
+        int(season), file_id, int(iterations), int(seg_size), bool(future), seed=seed, random_source=random_source,
+        workers=workers, progress=progress))
+
+
+def dailysim_job(params, progress=None):
+    iterations = params['iterations']
     try:
-        day = request.get_json()['day']
+        day = params['day']
     except KeyError:
         day = None
     try:
-        home_team = request.get_json()['home_team']
+        home_team = params['home_team']
     except KeyError:
         home_team = None
     try:
-        away_team = request.get_json()['away_team']
+        away_team = params['away_team']
     except KeyError:
         away_team = None
     try:
-        save_stlats_str = request.get_json()['save_stlats']
+        save_stlats_str = params['save_stlats']
         save_stlats = True
         if save_stlats_str == "false":
             save_stlats = False
     except KeyError:
         save_stlats = True
+    seed = params.get('seed')
+    # the odds only need PITCHER_LINES, which is quicker but leaves the batters out of the stats
+    stat_profile = StatProfile[params.get('stat_profile', StatProfile.FULL.name)]
+    # with ci_width each game stops once its win interval is that narrow, iterations is then the average budget
+    ci_width = optional(params, 'ci_width', float)
+    max_iterations = optional(params, 'max_iterations', int)
+    interval_method = IntervalMethod[params.get('interval_method', IntervalMethod.WILSON.name)]
+    # ANTITHETIC or SOBOL trade independent iterations for a less noisy win probability
+    random_source = RandomSource[params.get('random_source', RandomSource.PSEUDO.name)]
+    # with rare_event_error the shutout and big score chances are importance sampled to that relative error
+    rare_event_error = optional(params, 'rare_event_error', float)
+    # the Monte Carlo iterations are spread over this many worker processes
+    workers = optional(params, 'workers', int)
+
+    # the sim data and games are quick to fetch and change through the day, with the pitchers, odds and results,
+    # so the cache keys on them.  the stlats of the players are only fetched by a run on a miss
+    games = fetch_daily_games(day, home_team, away_team)
+    if games is None:
+        return None
+    return result_cache.get_or_compute('dailysim', dict(params, day=games["day"]), lambda: run_daily_sim(
+        iterations, day, home_team, away_team, save_stlats, seed=seed, stat_profile=stat_profile, ci_width=ci_width,
+        max_iterations=max_iterations, interval_method=interval_method, random_source=random_source,
+        rare_event_error=rare_event_error, workers=workers, progress=progress, games=games), live_data=games)
+
+
+# the long sims can also run in the background, see the jobs endpoints
+job_queue = JobQueue()
+job_queue.register('powerrankings', powerrankings_job)
+job_queue.register('seasonsim', seasonsim_job)
+job_queue.register('fullseasonsim', fullseasonsim_job)
+job_queue.register('dailysim', dailysim_job)
 
-    return run_daily_sim(iterations, day, home_team, away_team, save_stlats)
+
+@app.route('/v{}/powerrankings'.format(_VERSION), methods=["GET"])
+def powerrankings():
+    return powerrankings_job(request.get_json())
+
+
+@app.route('/v{}/seasonsim'.format(_VERSION), methods=["GET"])
+def seasonsim():
+    return seasonsim_job(request.get_json())
+
+@app.route('/v{}/fullseasonsim'.format(_VERSION), methods=["GET"])
+def fullseasonsim():
+    return fullseasonsim_job(request.get_json())
+
+@app.route('/v{}/sumseason'.format(_VERSION), methods=["GET"])
+def sumseason():
+    file_id = request.get_json()['file_id']
+
+    return sum_season_files(file_id)
+
+@app.route('/v{}/dailysim'.format(_VERSION), methods=["GET"])
+def dailysim():
+    return dailysim_job(request.get_json())
+
+
+@app.route('/v{}/jobs/<kind>'.format(_VERSION), methods=["POST"])
+def submit_job(kind):
+    """Queue a powerrankings, seasonsim, fullseasonsim or dailysim run with the parameters of its endpoint"""
+    if kind not in job_queue.runners:
+        return {"error": f"unknown job kind {kind}"}, 404
+    job = job_queue.submit(kind, request.get_json())
+    return job.summary(), 202
+
+
+@app.route('/v{}/jobs/<job_id>'.format(_VERSION), methods=["GET"])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return {"error": f"no job {job_id}"}, 404
+    return job.summary()
+
+
+@app.route('/v{}/jobs/<job_id>/result'.format(_VERSION), methods=["GET"])
+def job_result(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return {"error": f"no job {job_id}"}, 404
+    if job.status != JobStatus.DONE:
+        return job.summary(), 409
+    return {"job_id": job.job_id, "result": job.result}
 
 
 @app.route('/v{}/customsim'.format(_VERSION), methods=["GET"])
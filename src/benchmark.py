@@ -0,0 +1,109 @@
+"""Simulation throughput on the test fixture game.  Run from src with python benchmark.py"""
+import argparse
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests"))
+
+from sim_fixtures import make_game
+from adaptive_sim import AdaptiveGame, run_fixed
+from common import BlaseballStatistics as Stats
+from common import RandomSource, StatProfile
+from parallel_sim import default_workers, GamePool
+from sampling import derive_seed, IterationStreams
+
+# the GameState options of each benchmarked configuration
+CONFIGURATIONS: Dict[str, Dict[str, Any]] = {
+    "logged": {},
+    "headless": {"headless": True},
+    "headless, event counts": {"headless": True, "event_counts": True},
+    "headless, wins only": {"headless": True, "stat_profile": StatProfile.WINS_ONLY},
+}
+
+
+def pitches_per_second(num_games: int, seed: int = 1, **kwargs) -> float:
+    """Play num_games of the fixture game with the given GameState options and return the pitches thrown a second"""
+    game = make_game(seed=seed, **kwargs)
+    t1 = time.perf_counter()
+    for _ in range(num_games):
+        game.simulate_game()
+        game.reset_game_state()
+    elapsed = time.perf_counter() - t1
+    # the pitches are counted with the full profile when the configuration doesn't record them
+    if not game.count_pitches:
+        game = make_game(seed=seed, **dict(kwargs, stat_profile=StatProfile.FULL))
+        for _ in range(num_games):
+            game.simulate_game()
+            game.reset_game_state()
+    pitches = sum(stats.get(Stats.PITCHER_PITCHES_THROWN, 0.0)
+                  for team in [game.home_team, game.away_team] for stats in team.game_stats.values())
+    return pitches / elapsed
+
+
+def effective_samples_per_second(source: RandomSource, num_games: int, replicates: int,
+                                 seed: int = 1) -> Dict[str, float]:
+    """ Estimate the home win probability and home runs scored of the fixture game from num_games iterations
+    of source, replicates times over.  The effective sample size is how many independent games would give
+    estimates as steady as the replicates are, the per game variance over the variance of the replicate
+    estimates, and is returned per second of one replicate's wall-clock time. """
+    game = make_game(seed=seed, headless=True, stat_profile=StatProfile.WINS_ONLY)
+    wins: List[List[float]] = []
+    runs: List[List[float]] = []
+    elapsed = 0.0
+    for replicate in range(replicates):
+        streams = IterationStreams(derive_seed(seed, replicate), source)
+        t1 = time.perf_counter()
+        scores = []
+        for x in range(num_games):
+            game.set_random_stream(streams.stream(x))
+            scores.append(game.simulate_game()[:2])
+            game.reset_game_state()
+        elapsed += time.perf_counter() - t1
+        wins.append([1.0 if home > away else 0.0 for home, away in scores])
+        runs.append([float(home) for home, _ in scores])
+    seconds = elapsed / replicates
+    ret_val = {}
+    for name, samples in [("win", np.array(wins)), ("runs", np.array(runs))]:
+        estimate_variance = samples.mean(axis=1).var(ddof=1)
+        game_variance = samples.var(ddof=1)
+        ess = game_variance / estimate_variance if estimate_variance > 0 else float("inf")
+        ret_val[name] = ess / seconds
+    return ret_val
+
+
+def games_per_second(num_games: int, workers: int, seed: int = 1) -> float:
+    """Play num_games of each of four copies of the fixture game, a day's worth of games, on a pool of workers"""
+    games = [AdaptiveGame(make_game(seed=seed, headless=True), derive_seed(seed, game_idx)) for game_idx in range(4)]
+    pool = GamePool(workers) if workers > 1 else None
+    t1 = time.perf_counter()
+    run_fixed(games, num_games, pool=pool)
+    elapsed = time.perf_counter() - t1
+    if pool is not None:
+        pool.close()
+    return len(games) * num_games / elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="report the best of this many runs")
+    parser.add_argument("--ess-games", type=int, default=64, help="games in each replicate of a random source")
+    parser.add_argument("--replicates", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=default_workers(), help="the most workers to scale up to")
+    args = parser.parse_args()
+    for name, options in CONFIGURATIONS.items():
+        best = max(pitches_per_second(args.games, args.seed, **options) for _ in range(args.repeat))
+        print(f"{name}: {best:.0f} pitches/sec")
+    for source in RandomSource:
+        rates = effective_samples_per_second(source, args.ess_games, args.replicates, args.seed)
+        print(f"{source.name.lower()}: {rates['win']:.0f} effective games/sec for the win probability, "
+              f"{rates['runs']:.0f} for home runs scored")
+    workers = 1
+    while workers <= args.workers:
+        print(f"{workers} workers: {games_per_second(args.games, workers, args.seed):.1f} games/sec")
+        workers *= 2
@@ -1,4 +1,5 @@
 import asyncio
+from decimal import Decimal
 from typing import Dict, List, Optional, Set, Tuple
 from enum import Enum
 
@@ -142,6 +143,139 @@ class MachineLearnedModel(Enum):
     OUT_TYPE = 8
 
 
+class InferenceBackend(Enum):
+    SKLEARN = 1
+    NUMPY = 2
+
+
+class SimulationEngine(Enum):
+    MONTE_CARLO = 1
+    LOCKSTEP = 2
+    DYNAMIC_PROGRAMMING = 3
+
+
+class IntervalMethod(Enum):
+    """How the confidence interval of a simulated win probability is computed"""
+    WILSON = 1
+    JEFFREYS = 2
+
+
+class JobStatus(Enum):
+    """Where a background simulation job is in its life"""
+    QUEUED = 1
+    RUNNING = 2
+    DONE = 3
+    FAILED = 4
+
+
+class RandomSource(Enum):
+    """Where the uniform rolls of the iterations of a Monte Carlo run come from"""
+    PSEUDO = 1
+    # iterations in pairs, the second rolling 1 - u for each roll u of the first
+    ANTITHETIC = 2
+    # each iteration's leading rolls are one point of a scrambled Sobol sequence
+    SOBOL = 3
+
+
+class RareEvent(Enum):
+    """Rare final scores of one team whose chance is estimated by importance sampling"""
+    SHUTOUT = 1
+    OVER_TEN = 2
+    OVER_TWENTY = 3
+
+
+class StatProfile(Enum):
+    """Which stats a game records, from just the result up to the full box score"""
+    WINS_ONLY = 1
+    TEAM_TOTALS = 2
+    PITCHER_LINES = 3
+    FULL = 4
+
+
+class SimulationGranularity(Enum):
+    PITCH = 1
+    PLATE_APPEARANCE = 2
+
+
+class PlateAppearanceOutcome(Enum):
+    WALK = 1
+    STRIKEOUT = 2
+    HIT = 3
+    OUT = 4
+    STEAL_ATTEMPT = 5
+
+
+class StatEvent(Enum):
+    """Plate appearance outcomes that can be counted in place of the batter and pitcher stats they imply"""
+    SINGLE = 1
+    DOUBLE = 2
+    TRIPLE = 3
+    HOME_RUN = 4
+    FLYOUT = 5
+    GROUNDOUT = 6
+    CROWS_OUT = 7
+
+
+class GameEvent(Enum):
+    PLAY_BALL = 1
+    HALF_START = 2
+    AT_BAT = 3
+    TRIPLE_THREAT = 4
+    LOSES_TRIPLE_THREAT = 5
+    SKIP_UNAVAILABLE = 6
+    O_BLOOD_REDO = 7
+    H2O_BLOOD_REDO = 8
+    BALL = 9
+    OH_NO = 10
+    FIERY_STRIKE = 11
+    STRIKE_SWINGING = 12
+    STRIKE_LOOKING = 13
+    FIERY_FOUL = 14
+    FOUL_STRIKE = 15
+    FOUL = 16
+    FLINCH = 17
+    PSYCHIC_STRIKEOUT = 18
+    PSYCHIC_WALK = 19
+    NOW_AT_BAT = 20
+    COUNT_RUNS = 21
+    WALK = 22
+    STRIKEOUT = 23
+    FLY_OUT = 24
+    GROUND_OUT = 25
+    SINGLE = 26
+    DOUBLE = 27
+    TRIPLE = 28
+    HOME_RUN = 29
+    AA_OVER_PERFORM = 30
+    AAA_OVER_PERFORM = 31
+    BIG_BUCKET = 32
+    BATTER_SCORES = 33
+    EXTRA_BASE = 34
+    TAG_UP = 35
+    FLOOD = 36
+    FLIPPERS = 37
+    EGO = 38
+    BEANED = 39
+    LOSES_TIRED = 40
+    BECOMES_TIRED = 41
+    BECOMES_WIRED = 42
+    FILLED_UP = 43
+    CROWS = 44
+    CHARM_STRIKEOUT = 45
+    CHARM_WALK = 46
+    ZAP = 47
+    BASE_INSTINCTS = 48
+    CAUGHT_STEALING = 49
+    STEAL = 50
+    RUNNER_SCORES = 51
+    SUN2_WIN = 52
+    BLACK_HOLE = 53
+    SIDE_RETIRED = 54
+    GAME_OVER = 55
+    SCORE = 56
+    ON_BASE = 57
+
+
 class BloodType(Enum):
     A = 1
     AA = 2
@@ -662,6 +796,21 @@ def get_player_buff_cache() -> Dict[str, Dict[PlayerBuff, int]]:
     return player_buffs
 
 
+# scores and run values are kept as integer tenths of a run inside a game, so the 0.1 steps of acidic, coffee and
+# triple threat runs stay exact without Decimal arithmetic
+TENTHS_PER_RUN = 10
+
+
+def to_tenths(score) -> int:
+    """Convert a score given as a Decimal, string or number to tenths of a run"""
+    return int((Decimal(str(score)) * TENTHS_PER_RUN).to_integral_value())
+
+
+def from_tenths(tenths: int) -> Decimal:
+    """Convert tenths of a run back to a Decimal score with one decimal place"""
+    return Decimal(tenths).scaleb(-1)
+
+
 def calc_vibes(pres, cin, buo, day):
     vibes = 0.5 * ((pres + cin) * math.sin(math.pi * (2 / (6 + round(10 * buo)) * day + 0.5)) - pres + cin)
     return vibes
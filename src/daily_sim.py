@@ -1,8 +1,9 @@
 import json
+import logging
 import os
 import time
 from decimal import Decimal
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 import requests
 from requests import Timeout
@@ -10,9 +11,17 @@ from requests import Timeout
 from common import enabled_player_buffs, get_stlats_for_day, get_ballparks, team_name_map, team_id_map, convert_keys
 from common import BlaseballStatistics as Stats, blood_name_map
 from common import ForbiddenKnowledge as FK
-from common import BloodType, Team, blood_id_map, fk_key, PlayerBuff, Weather
+from common import BloodType, InferenceBackend, IntervalMethod, RandomSource, SimulationEngine, StatProfile, Team, blood_id_map, fk_key, PlayerBuff, Weather
+from adaptive_sim import AdaptiveGame, DEFAULT_MAX_ITERATIONS_FACTOR, run_adaptive, run_fixed, win_interval
+from importance_sim import estimate_rare_events
 from team_state import TeamState, DEF_ID, TEAM_ID
 from game_state import GameState, InningHalf
+from lockstep_sim import LockstepSimulation
+from parallel_sim import GamePool
+from progress import Progress
+from stats_table import PROFILE_STATS
+from sampling import derive_seed, root_seed, Seed
+from win_probability import WinProbabilityEngine
 from stadium import Stadium
 
 lineups_by_team: Dict[str, Dict[int, str]] = {}
@@ -245,17 +254,45 @@ def get_pitcher_for_day_and_team(day, team):
     return rotations_by_team[team][rot_index]
 
 
-def run_daily_sim(iterations=250, day=None, home_team_in=None, away_team_in=None, save_stlats=True):
-    t1 = time.time()
+def summarize_simulations(home_team_state: TeamState, away_team_state: TeamState, home_scores: List[Decimal],
+                          away_scores: List[Decimal], iterations: int) -> Dict[str, Dict[str, float]]:
+    """Game odds from simulated games, in the form WinProbabilityEngine.solve returns them"""
+    ret_val = {}
+    # a team is shut out when the opposing starter records a shutout
+    for team, team_state, opponent_state, scores in [
+        ("home_team", home_team_state, away_team_state, home_scores),
+        ("away_team", away_team_state, home_team_state, away_scores),
+    ]:
+        # every strikeout and home run of a batter is recorded against the opposing starter too, so they are
+        # read from the pitcher lines and the sim doesn't need the batters' stats
+        strikeouts, home_runs, shutouts = 0.0, 0.0, 0.0
+        for player_id, stats in opponent_state.game_stats.items():
+            strikeouts += stats.get(Stats.PITCHER_STRIKEOUTS, 0.0)
+            home_runs += stats.get(Stats.PITCHER_HRS_ALLOWED, 0.0)
+            shutouts += stats.get(Stats.PITCHER_SHUTOUTS, 0.0)
+        ret_val[team] = {
+            "win": team_state.game_stats[TEAM_ID].get(Stats.TEAM_WINS, 0) / iterations,
+            "shutout": shutouts / iterations,
+            "over_ten": sum(1 for x in scores if x > 10) / iterations,
+            "over_twenty": sum(1 for x in scores if x > 20) / iterations,
+            "strikeouts": strikeouts / iterations,
+            "home_runs": home_runs / iterations,
+        }
+    return ret_val
+
+
+def fetch_daily_games(day=None, home_team_in=None, away_team_in=None) -> Optional[Dict[str, Any]]:
+    """ The season and day of a daily sim with the day's games and the teams it plays, the next day's by default,
+    or None when the sim data can't be had.  These are the two quick fetches a run starts with, the stlats of
+    the players are only fetched when it sets up the teams. """
     html_response = retry_request("https://www.blaseball.com/database/simulationdata")
     if not html_response:
         print('Bet Advice daily message failed to acquire sim data and exited.')
-        return
+        return None
     sim_data = html_response.json()
     season = sim_data['season']
     if day is None:
         day = sim_data['day'] + 1
-    print(f"Running sim for day {day} with {iterations} iterations")
     games = retry_request(f"https://www.blaseball.com/database/games?day={day}&season={season}")
     games_json = games.json()
     if home_team_in is None or away_team_in is None:
@@ -264,30 +301,53 @@ def run_daily_sim(iterations=250, day=None, home_team_in=None, away_team_in=None
         [team_ids.append(g['awayTeam']) for g in games_json]
     else:
         team_ids = [home_team_in, away_team_in]
-
-    setup_stlats(season, day, team_ids, save_stlats)
+    return {"season": season, "day": day, "games": games_json, "team_ids": team_ids}
+
+
+def run_daily_sim(iterations=250, day=None, home_team_in=None, away_team_in=None, save_stlats=True,
+                  inference_backend=InferenceBackend.SKLEARN, engine=SimulationEngine.MONTE_CARLO,
+                  seed: Optional[Seed] = None, stat_profile: StatProfile = StatProfile.FULL,
+                  ci_width: Optional[float] = None, max_iterations: Optional[int] = None,
+                  interval_method: IntervalMethod = IntervalMethod.WILSON,
+                  random_source: RandomSource = RandomSource.PSEUDO, rare_event_error: Optional[float] = None,
+                  workers: Optional[int] = None, progress: Optional[Progress] = None,
+                  games: Optional[Dict[str, Any]] = None):
+    """ Simulate the games of a day.  Monte Carlo games are played iterations times each, or with ci_width
+    adaptively: each game stops once its home win interval is no wider than ci_width, and the iterations that
+    leaves of the day's budget of iterations a game go to the games still over it, up to max_iterations each.
+    random_source picks the rolls of the Monte Carlo iterations, see IterationStreams.  With rare_event_error the
+    shutout and big score chances of Monte Carlo games are importance sampled to that relative error instead of
+    counted in the iterations.  With more than one worker the Monte Carlo iterations are played in chunks on a
+    pool of worker processes, with the same results as a serial run.  The stats returned are the ones stat_profile
+    records, every player's under FULL.  games are the day's games when already fetched, see fetch_daily_games. """
+    t1 = time.time()
+    # every game, and every iteration of it, rolls from its own stream under the root seed
+    seed = root_seed(seed)
+    if games is None:
+        games = fetch_daily_games(day, home_team_in, away_team_in)
+        if games is None:
+            return
+    season, day, games_json = games["season"], games["day"], games["games"]
+    print(f"Running sim for day {day} with {iterations} iterations")
+    setup_stlats(season, day, games["team_ids"], save_stlats)
     with open(os.path.join('..', 'season_sim', "ballparks.json"), 'r', encoding='utf8') as json_file:
         ballparks = json.load(json_file)
     results = {}
     all_stats = {}
     output = ""
     count = 1
-    for game in games_json:
+    sims = []
+    for game_idx, game in enumerate(games_json):
         home_team = game["homeTeam"]
         away_team = game["awayTeam"]
 
         if home_team not in team_ids or away_team not in team_ids:
             continue
-        home_team_name = game["homeTeamName"]
-        away_team_name = game["awayTeamName"]
         game_id = game["id"]
         day = int(game["day"])
 
         home_pitcher = game["homePitcher"]
         away_pitcher = game["awayPitcher"]
-
-        home_odds = game["homeOdds"]
-        away_odds = game["awayOdds"]
         weather = Weather(game["weather"])
 
         if day == 99:
@@ -319,85 +379,124 @@ def run_daily_sim(iterations=250, day=None, home_team_in=None, away_team_in=None
             outs=0,
             strikes=0,
             balls=0,
-            weather=weather
+            weather=weather,
+            inference_backend=inference_backend,
+            seed=derive_seed(seed, game_idx),
+            headless=True,
+            stat_profile=stat_profile,
         )
-        home_scores, away_scores = [], []
-        for x in range(0, iterations):
-            home_score, away_score = game_sim.simulate_game()
-            # if home_team == '8d87c468-699a-47a8-b40d-cfb73a5660ad':
-            #     if away_score > home_score:
-            #         filename = os.path.join('..', 'season_sim', 'game_logs', f"{round(time.time())}_c_g_log.txt")
-            #         with open(filename, 'w') as file:
-            #             for item in game_sim.game_log:
-            #                 file.write(f"{item}\n")
-            home_scores.append(home_score)
-            away_scores.append(away_score)
-            game_sim.reset_game_state()
-
-        home_wins = home_team_state.game_stats[TEAM_ID].get(Stats.TEAM_WINS, 0)
-        away_wins = away_team_state.game_stats[TEAM_ID].get(Stats.TEAM_WINS, 0)
+        odds = None
+        adaptive_game = None
+        if engine == SimulationEngine.DYNAMIC_PROGRAMMING and WinProbabilityEngine.can_model(game_sim):
+            odds = WinProbabilityEngine(game_sim).solve()
+        elif engine == SimulationEngine.LOCKSTEP:
+            home_scores, away_scores = [], []
+            for home_score, away_score in LockstepSimulation([game_sim], iterations).run()[0]:
+                home_scores.append(home_score)
+                away_scores.append(away_score)
+            odds = summarize_simulations(home_team_state, away_team_state, home_scores, away_scores, iterations)
+        else:
+            # monte carlo is the fallback for games the dynamic programming engine can't solve
+            adaptive_game = AdaptiveGame(game_sim, derive_seed(seed, game_idx), random_source)
+        sims.append((game, game_sim, home_team_state, away_team_state, odds, adaptive_game))
+
+    adaptive_games = [sim[-1] for sim in sims if sim[-1] is not None]
+    # the games solved or played in lockstep above are done, adaptive runs can finish under their budget
+    progress = progress or Progress()
+    progress.add_total(iterations * len(sims))
+    progress.advance(iterations * (len(sims) - len(adaptive_games)))
+    pool = GamePool(workers, inference_backend) if workers is not None and workers > 1 and adaptive_games else None
+    try:
+        if ci_width is None:
+            run_fixed(adaptive_games, iterations, pool=pool, progress=progress)
+        else:
+            if max_iterations is None:
+                max_iterations = DEFAULT_MAX_ITERATIONS_FACTOR * iterations
+            run_adaptive(adaptive_games, ci_width, iterations, max_iterations, method=interval_method, pool=pool,
+                         progress=progress)
+    finally:
+        if pool is not None:
+            pool.close()
+
+    iterations_by_team: Dict[str, int] = {}
+    for game, game_sim, home_team_state, away_team_state, odds, adaptive_game in sims:
+        home_team = game["homeTeam"]
+        away_team = game["awayTeam"]
+        home_team_name = game["homeTeamName"]
+        away_team_name = game["awayTeamName"]
+        home_pitcher = game["homePitcher"]
+        away_pitcher = game["awayPitcher"]
+        home_odds = game["homeOdds"]
+        away_odds = game["awayOdds"]
+        # a game the dynamic programming engine solved played no iterations, and its teams recorded no stats
+        solved = adaptive_game is None and engine == SimulationEngine.DYNAMIC_PROGRAMMING
+        game_iterations = iterations if adaptive_game is None else adaptive_game.iterations
+        if not solved:
+            iterations_by_team[home_team] = game_iterations
+            iterations_by_team[away_team] = game_iterations
+        if odds is None:
+            odds = summarize_simulations(home_team_state, away_team_state, adaptive_game.home_scores,
+                                         adaptive_game.away_scores, game_iterations)
+        rare_events = None
+        if adaptive_game is not None and rare_event_error is not None:
+            # the tilted games are played on a copy so they don't count toward the game's stats
+            rare_events = estimate_rare_events(game_sim.clone(), adaptive_game.seed, rare_event_error)
+            for team, estimates in rare_events.items():
+                for key, estimate in estimates.items():
+                    odds[team][key] = estimate["probability"]
+        if game_sim.prediction_cache is not None:
+            logging.debug(f"prediction cache: {game_sim.prediction_cache.stats()}")
+        # the interval of the home win probability, the away interval mirrors it.  the dynamic programming odds
+        # are exact
+        if adaptive_game is not None:
+            home_interval = adaptive_game.interval(interval_method)
+        elif engine == SimulationEngine.LOCKSTEP:
+            home_interval = win_interval(round(odds["home_team"]["win"] * iterations), iterations, interval_method)
+        else:
+            home_interval = (odds["home_team"]["win"], odds["home_team"]["win"])
+        away_interval = (1.0 - home_interval[1], 1.0 - home_interval[0])
+
+        home_win_per_raw = odds["home_team"]["win"]
+        away_win_per_raw = odds["away_team"]["win"]
         home_odds_str = round(home_odds * 1000) / 10
         away_odds_str = round(away_odds * 1000) / 10
-        print(f"{count}. {home_team_name}: {home_wins} ({home_wins / iterations}) - {home_odds_str}% "
-              f"{away_team_name}: {away_wins} ({away_wins / iterations}) - {away_odds_str}%")
+        if solved:
+            home_win_str, away_win_str = f"{home_win_per_raw}", f"{away_win_per_raw}"
+        else:
+            home_wins = home_team_state.game_stats[TEAM_ID].get(Stats.TEAM_WINS, 0)
+            away_wins = away_team_state.game_stats[TEAM_ID].get(Stats.TEAM_WINS, 0)
+            home_win_str = f"{home_wins} ({home_wins / game_iterations})"
+            away_win_str = f"{away_wins} ({away_wins / game_iterations})"
+        print(f"{count}. {home_team_name}: {home_win_str} - {home_odds_str}% "
+              f"{away_team_name}: {away_win_str} - {away_odds_str}%")
         count += 1
 
         home_pitcher_name = home_team_state.player_names[home_team_state.starting_pitcher]
         away_pitcher_name = away_team_state.player_names[away_team_state.starting_pitcher]
-        output += f"{home_team_name} ({home_pitcher_name}): {home_wins} ({home_wins / iterations}) - {home_odds_str}% " \
-                  f"{away_team_name} ({away_pitcher_name}): {away_wins} ({away_wins / iterations}) - {away_odds_str}%\n"
-
-        home_win_per = round((home_wins / iterations) * 1000) / 10
-        away_win_per = round((away_wins / iterations) * 1000) / 10
-        home_win_per_raw = home_wins / iterations
-        away_win_per_raw = away_wins / iterations
-
-        home_ks = 0
-        for player_id, stats in home_team_state.game_stats.items():
-            if Stats.BATTER_STRIKEOUTS in stats:
-                home_ks += stats[Stats.BATTER_STRIKEOUTS]
-        away_ks = 0
-        for player_id, stats in away_team_state.game_stats.items():
-            if Stats.BATTER_STRIKEOUTS in stats:
-                away_ks += stats[Stats.BATTER_STRIKEOUTS]
-        home_k_per = round((home_ks / iterations) * 100) / 100
-        away_k_per = round((away_ks / iterations) * 100) / 100
-
-        home_dingers = 0
-        for player_id, stats in home_team_state.game_stats.items():
-            if Stats.BATTER_HRS in stats:
-                home_dingers += stats[Stats.BATTER_HRS]
-        away_dingers = 0
-        for player_id, stats in away_team_state.game_stats.items():
-            if Stats.BATTER_HRS in stats:
-                away_dingers += stats[Stats.BATTER_HRS]
-        home_dingers_per = round((home_dingers / iterations) * 100) / 100
-        away_dingers_per = round((away_dingers / iterations) * 100) / 100
-
-        away_shutouts = 0
-        for player_id, stats in home_team_state.game_stats.items():
-            if Stats.PITCHER_SHUTOUTS in stats:
-                away_shutouts += stats[Stats.PITCHER_SHUTOUTS]
-        home_shutouts = 0
-        for player_id, stats in away_team_state.game_stats.items():
-            if Stats.PITCHER_SHUTOUTS in stats:
-                home_shutouts += stats[Stats.PITCHER_SHUTOUTS]
-        home_shutout_per = round((home_shutouts / iterations) * 1000) / 10
-        away_shutout_per = round((away_shutouts / iterations) * 1000) / 10
-
-        home_big_scores = sum(1 for x in home_scores if x > 10) / iterations
-        away_big_scores = sum(1 for x in away_scores if x > 10) / iterations
-        home_xbig_scores = sum(1 for x in home_scores if x > 20) / iterations
-        away_xbig_scores = sum(1 for x in away_scores if x > 20) / iterations
+        output += f"{home_team_name} ({home_pitcher_name}): {home_win_str} - {home_odds_str}% " \
+                  f"{away_team_name} ({away_pitcher_name}): {away_win_str} - {away_odds_str}%\n"
+
+        home_win_per = round(home_win_per_raw * 1000) / 10
+        away_win_per = round(away_win_per_raw * 1000) / 10
+        home_k_per = round(odds["home_team"]["strikeouts"] * 100) / 100
+        away_k_per = round(odds["away_team"]["strikeouts"] * 100) / 100
+        home_dingers_per = round(odds["home_team"]["home_runs"] * 100) / 100
+        away_dingers_per = round(odds["away_team"]["home_runs"] * 100) / 100
+        home_shutout_per = round(odds["home_team"]["shutout"] * 1000) / 10
+        away_shutout_per = round(odds["away_team"]["shutout"] * 1000) / 10
+        home_big_scores = odds["home_team"]["over_ten"]
+        away_big_scores = odds["away_team"]["over_ten"]
+        home_xbig_scores = odds["home_team"]["over_twenty"]
+        away_xbig_scores = odds["away_team"]["over_twenty"]
 
         upset = False
         home_odds = game["homeOdds"]
         away_odds = game["awayOdds"]
         if home_odds > away_odds:
-            if away_wins > home_wins:
+            if away_win_per_raw > home_win_per_raw:
                 upset = True
         else:
-            if home_wins > away_wins:
+            if home_win_per_raw > away_win_per_raw:
                 upset = True
 
         if .495 < home_odds < .505:
@@ -424,6 +523,7 @@ def run_daily_sim(iterations=250, day=None, home_team_in=None, away_team_in=None
                         "shutout_percentage": home_shutout_per,
                         "win_percentage": home_win_per,
                         "win_per_raw": home_win_per_raw,
+                        "win_interval": list(home_interval),
                         "strikeout_avg": home_k_per,
                         "dinger_avg": home_dingers_per,
                         "over_ten": home_big_scores,
@@ -444,6 +544,7 @@ def run_daily_sim(iterations=250, day=None, home_team_in=None, away_team_in=None
                         "shutout_percentage": away_shutout_per,
                         "win_percentage": away_win_per,
                         "win_per_raw": away_win_per_raw,
+                        "win_interval": list(away_interval),
                         "strikeout_avg": away_k_per,
                         "dinger_avg": away_dingers_per,
                         "over_ten": away_big_scores,
@@ -456,12 +557,26 @@ def run_daily_sim(iterations=250, day=None, home_team_in=None, away_team_in=None
                         }
                     }
         }
+        if not solved:
+            results[game["id"]]["iterations"] = game_iterations
+        if rare_events is not None:
+            results[game["id"]]["home_team"]["rare_events"] = rare_events["home_team"]
+            results[game["id"]]["away_team"]["rare_events"] = rare_events["away_team"]
 
     for cur_team in team_states.keys():
-        for player in team_states[cur_team].game_stats.keys():
+        # only the teams of games that were played have stats, a solved game's would all read as zeros
+        if cur_team not in iterations_by_team:
+            continue
+        team_stats = team_states[cur_team].game_stats
+        team_iterations = iterations_by_team[cur_team]
+        for player, player_stats in team_stats.items():
+            # stats the profile didn't record would read as zeros, so only the recorded ones are returned
+            recorded = {stat: value for stat, value in player_stats.items() if stat in PROFILE_STATS[stat_profile]}
+            if stat_profile != StatProfile.FULL and not any(recorded.values()):
+                continue
             all_stats[player] = {}
-            for stat in team_states[cur_team].game_stats[player]:
-                all_stats[player][stat] = team_states[cur_team].game_stats[player][stat] / float(iterations)
+            for stat, value in recorded.items():
+                all_stats[player][stat] = value / float(team_iterations)
 
     seg_stats_pretty = convert_keys(all_stats)
 
@@ -6,11 +6,9 @@ warnings.warn = warn
 from decimal import Decimal
 from typing import Any, Dict, List, Optional, Tuple, Union
 from enum import Enum
-from joblib import load
 
 import json
 import logging
-import os
 import random
 
 from team_state import DEF_ID, TEAM_ID, TeamState
@@ -18,6 +16,7 @@ from common import BlaseballStatistics as Stats
 from common import MachineLearnedModel as Ml
 from common import BloodType, PitchEventTeamBuff, PlayerBuff, pitch_reroll_event_map, team_pitch_event_map, Weather
 from common import season_based_event_map, SeasonEventTeamBuff
+from model_registry import EVAL_MODEL_SET, model_registry, ModelSet
 from stadium import Stadium
 
 
@@ -28,9 +27,11 @@ class Eval(object):
         away_team: TeamState,
         strikes: int,
         balls: int,
+        model_set: ModelSet = EVAL_MODEL_SET,
     ) -> None:
         """ A container class that holds the team state for a given game """
         self.day = 1
+        self.model_set = model_set
         self.home_team = home_team
         self.away_team = away_team
         self.strikes = strikes
@@ -51,11 +52,7 @@ class Eval(object):
         self._load_ml_models()
 
     def _load_ml_models(self):
-        self.clf = {
-            Ml.PITCH: load(os.path.join("..", "season_sim", "models", "pitch_v22.joblib")),
-            Ml.HIT_TYPE: load(os.path.join("..", "season_sim", "models", "hit_type_v22.joblib")),
-            Ml.OUT_TYPE: load(os.path.join("..", "season_sim", "models", "out_type_v22.joblib")),
-        }
+        self.clf = model_registry.get_models(self.model_set)
 
     def log_event(self, event: str) -> None:
         self.game_log.append(event)
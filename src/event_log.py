@@ -0,0 +1,156 @@
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+import numpy as np
+
+from common import GameEvent
+
+if TYPE_CHECKING:
+    from team_state import TeamState
+
+DEFAULT_EVENT_CAPACITY = 1024
+NO_PLAYER = -1
+# sides of the field stored in team events, matching InningHalf where the away team bats in the top
+AWAY_SIDE = 1
+HOME_SIDE = 2
+
+EVENT_DTYPE = np.dtype([
+    ("code", np.uint8),
+    ("base", np.int8),
+    ("player", np.int16),
+    ("player2", np.int16),
+    ("value", np.int32),
+    ("value2", np.int32),
+])
+
+EVENT_TEMPLATES: Dict[GameEvent, str] = {
+    GameEvent.PLAY_BALL: "Play ball.",
+    GameEvent.HALF_START: "\n{half_title} of the {value}, {team} batting.",
+    GameEvent.AT_BAT: "{player} at bat. {player2} pitching.",
+    GameEvent.TRIPLE_THREAT: "{player} and{player2} are now triple threats.",
+    GameEvent.LOSES_TRIPLE_THREAT: "{player} loses triple threat.",
+    GameEvent.SKIP_UNAVAILABLE: "Skipping {player} due to UNAVAILABILITY.",
+    GameEvent.O_BLOOD_REDO: "O Blood triggered a pitch redo!.",
+    GameEvent.H2O_BLOOD_REDO: "H2O Blood triggered a pitch redo!.",
+    GameEvent.BALL: "Ball {value}.",
+    GameEvent.OH_NO: "Oh No triggered!.",
+    GameEvent.FIERY_STRIKE: "FIERY STRIKE!",
+    GameEvent.STRIKE_SWINGING: "Strike swinging. Strike {value}.",
+    GameEvent.STRIKE_LOOKING: "Strike looking. Strike {value}.",
+    GameEvent.FIERY_FOUL: "Fouled off 2 fiery strikes.  Strike {value}.",
+    GameEvent.FOUL_STRIKE: "Foul ball.  Strike {value}.",
+    GameEvent.FOUL: "Foul ball.",
+    GameEvent.FLINCH: "{player} flinches. Strike {value}.",
+    GameEvent.PSYCHIC_STRIKEOUT: "Psychic triggered!  Transforming a walk into a strikeout.",
+    GameEvent.PSYCHIC_WALK: "Psychic triggered!  Transforming a strikeout into a walk.",
+    GameEvent.NOW_AT_BAT: "{player} now at bat.",
+    GameEvent.COUNT_RUNS: "Count runs to {value}-{value2}.",
+    GameEvent.WALK: "Batter {player} walks to base {value}.",
+    GameEvent.STRIKEOUT: "Batter {player} strikes out.",
+    GameEvent.FLY_OUT: "Batter {player} flies out.",
+    GameEvent.GROUND_OUT: "Batter {player} grounds out.",
+    GameEvent.SINGLE: "Batter {player} hits a single.",
+    GameEvent.DOUBLE: "Batter {player} hits a double.",
+    GameEvent.TRIPLE: "Batter {player} hits a triple.",
+    GameEvent.HOME_RUN: "Batter {player} hits a home run.",
+    GameEvent.AA_OVER_PERFORM: "AA triggers and turning on over perform.",
+    GameEvent.AAA_OVER_PERFORM: "AAA triggers and turning on over perform.",
+    GameEvent.BIG_BUCKET: "The home run lands in the big bucket, letting the batter score twice.",
+    GameEvent.BATTER_SCORES: "Batter {player} scores.",
+    GameEvent.EXTRA_BASE: "Runner {player} takes an extra base on the hit.",
+    GameEvent.TAG_UP: "Runner {player} tags up and advances.",
+    GameEvent.FLOOD: "A surge of Immateria rushes up from Under! Baserunners are swept from play!",
+    GameEvent.FLIPPERS: "{player} uses FLIPPERS to swim home.",
+    GameEvent.EGO: "{player}'s EGO keeps them on base.",
+    GameEvent.BEANED: "{player} is beaned.",
+    GameEvent.LOSES_TIRED: "{player} loses Tired.",
+    GameEvent.BECOMES_TIRED: "{player} becomes Tired.",
+    GameEvent.BECOMES_WIRED: "{player} becomes Wired.",
+    GameEvent.FILLED_UP: "{player} is filled up.",
+    GameEvent.CROWS: "{player} is chased away by crows.  Out.",
+    GameEvent.CHARM_STRIKEOUT: "Batter {player} is charmed into a strikeout.",
+    GameEvent.CHARM_WALK: "Batter {player} charms a walk.",
+    GameEvent.ZAP: "Batter {player} zaps a strike.",
+    GameEvent.BASE_INSTINCTS: "Batter {player} walks and base insticts lets them go to {value}.",
+    GameEvent.CAUGHT_STEALING: "Runner {player} caught stealing.",
+    GameEvent.STEAL: "Runner {player} steals base {value}.",
+    GameEvent.RUNNER_SCORES: "Runner {player} scores.",
+    GameEvent.SUN2_WIN: "Sun2 sets a win upon the {team_enum}.",
+    GameEvent.BLACK_HOLE: "Black hole steals a win from {team_enum}.",
+    GameEvent.SIDE_RETIRED: "Side retired. {half_name} of inning {value}.",
+    GameEvent.GAME_OVER: "Side retired. Game over.",
+    GameEvent.SCORE: "{away}: {away_score}  {home}: {home_score}.",
+    GameEvent.ON_BASE: "{player} is on base {base}.",
+}
+HALF_NAMES = {AWAY_SIDE: "TOP", HOME_SIDE: "BOTTOM"}
+
+
+class EventLog(object):
+    def __init__(self, capacity: int = DEFAULT_EVENT_CAPACITY) -> None:
+        """ The play by play of a game as fixed size (code, base, player, player2, value, value2) records in a
+        preallocated buffer.  Players are stored as indexes into the log's own player table, scores as tenths of
+        a run and the team of a team event as its side.  Text is only built when render_events is called. """
+        self.records = np.zeros(capacity, dtype=EVENT_DTYPE)
+        self.size = 0
+        self.players: List[str] = []
+        self.player_index: Dict[str, int] = {}
+
+    def clear(self) -> None:
+        """Empty the log, keeping the buffer and the player table"""
+        self.size = 0
+
+    def player(self, player_id: Optional[str]) -> int:
+        if player_id is None:
+            return NO_PLAYER
+        idx = self.player_index.get(player_id)
+        if idx is None:
+            idx = len(self.players)
+            self.players.append(player_id)
+            self.player_index[player_id] = idx
+        return idx
+
+    def append(self, event: GameEvent, player: Optional[str] = None, player2: Optional[str] = None, base: int = 0,
+               value: int = 0, value2: int = 0) -> None:
+        if self.size == len(self.records):
+            self.records = np.concatenate([self.records, np.zeros(len(self.records), dtype=EVENT_DTYPE)])
+        self.records[self.size] = (event.value, base, self.player(player), self.player(player2), value, value2)
+        self.size += 1
+
+    def copy(self) -> 'EventLog':
+        """A copy holding only the recorded events, for keeping the play by play of many games"""
+        log = EventLog(max(self.size, 1))
+        log.records[:self.size] = self.records[:self.size]
+        log.size = self.size
+        log.players = list(self.players)
+        log.player_index = dict(self.player_index)
+        return log
+
+    def nbytes(self) -> int:
+        return self.size * EVENT_DTYPE.itemsize
+
+
+def render_events(log: EventLog, home_team: 'TeamState', away_team: 'TeamState') -> List[str]:
+    """The human readable play by play of a log, one line per event"""
+    names: List[str] = []
+    for player_id in log.players:
+        team = home_team if player_id in home_team.player_names else away_team
+        names.append(team.get_player_name(player_id))
+    ret_val: List[str] = []
+    for code, base, player, player2, value, value2 in log.records[:log.size].tolist():
+        event = GameEvent(code)
+        team = away_team if value2 == AWAY_SIDE else home_team
+        ret_val.append(EVENT_TEMPLATES[event].format(
+            player=names[player] if player != NO_PLAYER else "",
+            player2=names[player2] if player2 != NO_PLAYER else "",
+            base=base,
+            value=value,
+            value2=value2,
+            team=team.name,
+            team_enum=team.team_enum.name,
+            half_name=HALF_NAMES.get(value2, ""),
+            half_title=HALF_NAMES.get(value2, "").title(),
+            away=away_team.name,
+            home=home_team.name,
+            away_score=f"{value / 10:.1f}",
+            home_score=f"{value2 / 10:.1f}",
+        ))
+    return ret_val
@@ -6,19 +6,28 @@ warnings.warn = warn
 from decimal import Decimal
 from typing import Any, Dict, List, Optional, Tuple, Union
 from enum import Enum
-from joblib import load
 
+import copy
 import json
 import logging
-import os
+import math
 import random
 
 from team_state import DEF_ID, TEAM_ID, TeamState
 from common import BlaseballStatistics as Stats
 from common import MachineLearnedModel as Ml
-from common import BloodType, PitchEventTeamBuff, PlayerBuff, pitch_reroll_event_map, team_pitch_event_map, Weather
+from common import BloodType, InferenceBackend, PitchEventTeamBuff, PlayerBuff, pitch_reroll_event_map, team_pitch_event_map, Weather
+from common import GameEvent, PlateAppearanceOutcome, SimulationGranularity, StatEvent, StatProfile
 from common import season_based_event_map, SeasonEventTeamBuff
+from common import from_tenths, TENTHS_PER_RUN, to_tenths
+from event_log import AWAY_SIDE, EventLog, HOME_SIDE, render_events
+from matchup_table import MatchupRow, MatchupTable
+from model_registry import get_model_set, model_registry, ModelSet
+from plate_appearance import PlateAppearanceChain
+from prediction_cache import DEFAULT_PREDICTION_CACHE_SIZE, PredictionCache
+from sampling import COMMON_BLOCK_SIZE, derive_seed, OutcomeTilt, RandomStream, root_seed, Seed, TILT_SCORES
 from stadium import Stadium
+from stats_table import BATTER_EVENT_BASE, PITCHER_EVENT_BASE, PROFILE_STATS
 
 
 CHARM_TRIGGER_PERCENTAGE = 0.02
@@ -34,6 +43,7 @@ COFFEE_2_PERCENTAGE = 0.04
 REMOVE_COFFEE_3_PERCENTAGE = 0.33
 FRIEND_OF_CROWS_PERCENTAGE = 0.02
 BIG_BUCKET_PERCENTAGE = 0.09
+PLATE_APPEARANCE_CHAIN_CACHE_SIZE = 4096
 BASE_INSTINCT_PRIORS = {
     # num bases: map of priors for base to walk to
     4: {
@@ -71,7 +81,17 @@ class GameState(object):
         strikes: int,
         balls: int,
         weather: Weather,
-        old_models: bool=None
+        old_models: bool=None,
+        model_set: Optional[ModelSet] = None,
+        inference_backend: InferenceBackend = InferenceBackend.SKLEARN,
+        prediction_cache: Optional[PredictionCache] = None,
+        prediction_cache_size: int = DEFAULT_PREDICTION_CACHE_SIZE,
+        use_matchup_table: bool = False,
+        granularity: SimulationGranularity = SimulationGranularity.PITCH,
+        seed: Optional[Seed] = None,
+        headless: bool = False,
+        stat_profile: StatProfile = StatProfile.FULL,
+        event_counts: bool = False,
     ) -> None:
         """ A container class that holds the team state for a given game """
         self.game_id = game_id
@@ -80,8 +100,9 @@ class GameState(object):
         self.stadium = stadium
         self.home_team = home_team
         self.away_team = away_team
-        self.home_score = home_score
-        self.away_score = away_score
+        # scores are kept in tenths of a run, home_score and away_score convert to and from Decimal
+        self.home_score_tenths = to_tenths(home_score)
+        self.away_score_tenths = to_tenths(away_score)
         self.inning = inning
         self.half = half
         self.outs = outs
@@ -103,45 +124,88 @@ class GameState(object):
         self.cur_base_runners: Dict[int, str] = {}
         self.is_game_over = False
         self.clf: Dict[Ml, Any] = {}
-        self.game_log: List[str] = ["Play ball."]
-        self._load_ml_models(old_models)
+        # a headless game skips recording its play by play, for runs that only keep scores and stats
+        self.headless = headless
+        self.set_stat_profile(stat_profile, event_counts)
+        self.events = EventLog()
+        # every log opens with play ball, a headless one too
+        self.events.append(GameEvent.PLAY_BALL)
+        self.model_set: ModelSet = model_set if model_set is not None else get_model_set(old_models)
+        self.inference_backend = inference_backend
+        self.granularity = granularity
+        # every roll of the game and its teams comes from its own stream, seeded from the global random module
+        # unless given
+        self.rng: RandomStream
+        self.set_random_stream(RandomStream(seed if seed is not None else random.getrandbits(63)))
+        # with common random numbers every step of a plate appearance rolls from its own stream under this seed
+        self.common_seed: Optional[Seed] = None
+        self.common_key: Tuple[int, int] = (0, 0)
+        self.common_step = 0
+        # with an outcome tilt the side's PITCH and HIT_TYPE rolls are importance sampled, and the log likelihood
+        # ratio of the game so far is kept to reweight it
+        self.tilt: Optional[OutcomeTilt] = None
+        self.tilt_side = HOME_SIDE
+        self.log_likelihood_ratio = 0.0
+        # count chains keyed on the pitch probabilities and count rules, shared with clones of this game
+        self.plate_appearance_chains: Dict[Tuple, PlateAppearanceChain] = {}
+        # a cache size of 0 turns memoization off, a shared cache can be passed in to reuse it across games
+        if prediction_cache is None and prediction_cache_size > 0:
+            prediction_cache = PredictionCache(prediction_cache_size)
+        self.prediction_cache: Optional[PredictionCache] = prediction_cache
+        self._load_ml_models()
+        self.matchup_table: Optional[MatchupTable] = None
+        self.matchup_row: Optional[MatchupRow] = None
+        if use_matchup_table:
+            self.matchup_table = MatchupTable(self.clf, self.stadium.get_stadium_fv())
         self.refresh_game_status()
+        self.prepare_matchup()
 
-    def _load_ml_models(self, old_models):
-        if old_models == True:
-            self.clf = {
-                Ml.PITCH: load(os.path.join("..", "season_sim", "models", "s_14_backup", "pitch_v3.joblib")),
-                Ml.HIT_TYPE: load(os.path.join("..", "season_sim", "models", "s_14_backup", "hit_type_v2.joblib")),
-                Ml.RUNNER_ADV_OUT: load(
-                    os.path.join("..", "season_sim", "models", "s_14_backup", "runner_advanced_on_out_v2.joblib")),
-                Ml.RUNNER_ADV_HIT: load(
-                    os.path.join("..", "season_sim", "models", "s_14_backup", "extra_base_on_hit_v2.joblib")),
-                Ml.SB_ATTEMPT: load(os.path.join("..", "season_sim", "models", "s_14_backup", "sba_v2.joblib")),
-                Ml.SB_SUCCESS: load(os.path.join("..", "season_sim", "models", "s_14_backup", "sb_success_v2.joblib")),
-                Ml.OUT_TYPE: load(os.path.join("..", "season_sim", "models", "s_14_backup", "out_type_v2.joblib")),
-            }
-        else:
-            self.clf = {
-                Ml.PITCH: load(os.path.join("..", "season_sim", "models", "pitch_v6.joblib")),
-                Ml.HIT_TYPE: load(os.path.join("..", "season_sim", "models", "hit_type_v6.joblib")),
-                Ml.RUNNER_ADV_OUT: load(os.path.join("..", "season_sim", "models", "runner_advanced_on_out_v6.joblib")),
-                Ml.RUNNER_ADV_HIT: load(os.path.join("..", "season_sim", "models", "extra_base_on_hit_v6.joblib")),
-                Ml.SB_ATTEMPT: load(os.path.join("..", "season_sim", "models", "sba_v6.joblib")),
-                Ml.SB_SUCCESS: load(os.path.join("..", "season_sim", "models", "sb_success_v6.joblib")),
-                Ml.OUT_TYPE: load(os.path.join("..", "season_sim", "models", "out_type_v6.joblib")),
-            }
-
-    def log_event(self, event: str) -> None:
-        self.game_log.append(event)
+    def _load_ml_models(self):
+        # Models are shared process wide through the registry, so they must be treated as read-only
+        self.clf = model_registry.get_models(self.model_set, self.inference_backend)
+
+    def prepare_matchup(self) -> None:
+        """Precompute the pitch outcome distributions of every lineup slot when the matchup table is on"""
+        if self.matchup_table is not None:
+            self.matchup_table.prepare(self.home_team, self.away_team)
+
+    def log_event(self, event: GameEvent, player: Optional[str] = None, player2: Optional[str] = None,
+                  base: int = 0, value: int = 0, value2: int = 0) -> None:
+        """Add an entry to the play by play, a headless game records nothing"""
+        if self.headless:
+            return
+        self.events.append(event, player, player2, base, value, value2)
+
+    @property
+    def game_log(self) -> List[str]:
+        """The play by play rendered as text"""
+        return render_events(self.events, self.home_team, self.away_team)
+
+    def side_of(self, team: TeamState) -> int:
+        return HOME_SIDE if team is self.home_team else AWAY_SIDE
+
+    @property
+    def home_score(self) -> Decimal:
+        return from_tenths(self.home_score_tenths)
+
+    @home_score.setter
+    def home_score(self, score: Decimal) -> None:
+        self.home_score_tenths = to_tenths(score)
+
+    @property
+    def away_score(self) -> Decimal:
+        return from_tenths(self.away_score_tenths)
+
+    @away_score.setter
+    def away_score(self, score: Decimal) -> None:
+        self.away_score_tenths = to_tenths(score)
 
     def log_score(self) -> None:
-        self.log_event(
-            f'{self.away_team.name}: {self.away_score}  {self.home_team.name}: {self.home_score}.')
+        self.log_event(GameEvent.SCORE, value=self.away_score_tenths, value2=self.home_score_tenths)
 
     def log_runners(self) -> None:
         for base in self.cur_base_runners.keys():
-            self.log_event(
-                f'{self.cur_batting_team.get_player_name(self.cur_base_runners[base])} is on base {base}.')
+            self.log_event(GameEvent.ON_BASE, self.cur_base_runners[base], base=base)
 
     def reset_game_state(self, game_stats_reset=False) -> None:
         """Reset the game state to the start of the game"""
@@ -151,25 +215,122 @@ class GameState(object):
         self.refresh_game_status()
         self.home_team.reset_team_state(game_stats_reset)
         self.away_team.reset_team_state(game_stats_reset)
-        self.home_score = Decimal("0.0")
-        self.away_score = Decimal("0.0")
-        self.game_log = ["Play ball."]
+        self.home_score_tenths = 0
+        self.away_score_tenths = 0
+        self.log_likelihood_ratio = 0.0
+        self.events.clear()
+        # every log opens with play ball, a headless one too
+        self.events.append(GameEvent.PLAY_BALL)
         if self.weather == Weather.COFFEE3:
             self.cur_batting_team.player_buffs[self.cur_batting_team.starting_pitcher][PlayerBuff.TRIPLE_THREAT] = 1
             self.cur_pitching_team.player_buffs[self.cur_pitching_team.starting_pitcher][PlayerBuff.TRIPLE_THREAT] = 1
-            self.log_event(f'{self.cur_batting_team.player_names[self.cur_batting_team.starting_pitcher]} and'
-                           f'{self.cur_pitching_team.player_names[self.cur_pitching_team.starting_pitcher]} are now '
-                           f'triple threats.')
+            self.log_event(GameEvent.TRIPLE_THREAT, self.cur_batting_team.starting_pitcher,
+                           self.cur_pitching_team.starting_pitcher)
         self.cur_base_runners = {}
         self.is_game_over = False
         self.apply_season_buffs()
         self.refresh_game_status()
+        self.prepare_matchup()
+
+    def clone(self) -> 'GameState':
+        """Copy the game with its own team states, empty stats and its own random stream.  The copy still shares
+        the loaded models and the prediction cache with this game."""
+        game = copy.copy(self)
+        game.home_team = self.home_team.copy_for_game()
+        game.away_team = self.away_team.copy_for_game()
+        if self.cur_batting_team is self.home_team:
+            game.cur_batting_team, game.cur_pitching_team = game.home_team, game.away_team
+        else:
+            game.cur_batting_team, game.cur_pitching_team = game.away_team, game.home_team
+        game.cur_base_runners = dict(self.cur_base_runners)
+        game.events = self.events.copy()
+        game.set_random_stream(self.rng.spawn())
+        if self.matchup_table is not None:
+            game.matchup_table = self.matchup_table.copy()
+        return game
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """ Pickle the game without its models and caches, for a worker process.  The models are taken from the
+        worker's own registry again when it is unpickled, and the caches start empty there. """
+        state = self.__dict__.copy()
+        state["clf"] = {}
+        state["plate_appearance_chains"] = {}
+        if self.prediction_cache is not None:
+            state["prediction_cache"] = (self.prediction_cache.max_size, self.prediction_cache.precision)
+        state["matchup_table"] = self.matchup_table is not None
+        state["matchup_row"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._load_ml_models()
+        if self.prediction_cache is not None:
+            self.prediction_cache = PredictionCache(*self.prediction_cache)
+        if self.matchup_table:
+            self.matchup_table = MatchupTable(self.clf, self.stadium.get_stadium_fv())
+        else:
+            self.matchup_table = None
+
+    def set_stat_profile(self, profile: StatProfile, event_counts: bool = False) -> None:
+        """ Record only the stats of profile for both teams.  The pitch counters are the only stats updated on
+        every pitch, so below PITCHER_LINES the game doesn't build their updates at all.  With event_counts the
+        teams count each plate appearance outcome once instead of every stat it adds to. """
+        self.stat_profile = profile
+        self.event_counts = event_counts
+        self.count_pitches = Stats.PITCHER_PITCHES_THROWN in PROFILE_STATS[profile]
+        self.home_team.set_stat_profile(profile, event_counts)
+        self.away_team.set_stat_profile(profile, event_counts)
+
+    def count_stat_event(self, event: StatEvent) -> None:
+        """Count a plate appearance outcome for the current batter and pitcher when counting events"""
+        if self.event_counts:
+            value = event._value_
+            self.cur_batting_team.count_event(self.cur_batting_team.cur_batter, BATTER_EVENT_BASE + value, self.day)
+            self.cur_pitching_team.count_event(self.cur_pitching_team.starting_pitcher, PITCHER_EVENT_BASE + value,
+                                               self.day)
+
+    def set_random_stream(self, rng: RandomStream) -> None:
+        """Draw the rolls of this game and its teams from rng from now on"""
+        self.rng = rng
+        self.home_team.rng = rng
+        self.away_team.rng = rng
+
+    def set_common_random_numbers(self, seed: Optional[Seed]) -> None:
+        """ Roll the next game on common random numbers under seed, or stop when seed is None.  Step k of the n-th
+        plate appearance of each side rolls from derive_seed(seed, side, n, k), so games set up differently but
+        given the same seed see the same draws at the same pitch even after their play has diverged. """
+        if seed is None:
+            self.common_seed = None
+            return
+        self.common_seed = root_seed(seed)
+        self.common_key = (0, 0)
+        self.set_random_stream(RandomStream(self.common_seed, COMMON_BLOCK_SIZE))
+
+    def set_outcome_tilt(self, side: int, tilt: Optional[OutcomeTilt]) -> None:
+        """Roll the PITCH and HIT_TYPE outcomes of side's plate appearances from tilt, or untilted when None"""
+        self.tilt = tilt
+        self.tilt_side = side
+        self.log_likelihood_ratio = 0.0
+
+    def is_tilted(self) -> bool:
+        return self.tilt is not None and self.side_of(self.cur_batting_team) == self.tilt_side
+
+    def sync_common_random_numbers(self) -> None:
+        """Switch to the stream of the step about to be played"""
+        side = HOME_SIDE if self.cur_batting_team is self.home_team else AWAY_SIDE
+        plate_appearance = (side, self.cur_batting_team.plate_appearances)
+        if plate_appearance != self.common_key:
+            self.common_key = plate_appearance
+            self.common_step = 0
+        else:
+            self.common_step += 1
+        self.rng.reseed(derive_seed(self.common_seed, side, plate_appearance[1], self.common_step))
 
     def apply_season_buffs(self):
         if self.home_team.team_enum in season_based_event_map:
             if self.season in season_based_event_map[self.home_team.team_enum]:
                 if SeasonEventTeamBuff.HOME_FIELD_ADVANTAGE in season_based_event_map[self.home_team.team_enum][self.season]:
-                    self.home_score = Decimal("1.0")
+                    self.home_score_tenths = TENTHS_PER_RUN
 
     def refresh_game_status(self):
         """Refresh game state variables dependant on which team is batting"""
@@ -178,19 +339,16 @@ class GameState(object):
             # This means its a fresh game and we must set the triple threat buff
             self.cur_batting_team.player_buffs[self.cur_batting_team.starting_pitcher][PlayerBuff.TRIPLE_THREAT] = 1
             self.cur_pitching_team.player_buffs[self.cur_pitching_team.starting_pitcher][PlayerBuff.TRIPLE_THREAT] = 1
-            self.log_event(f'{self.cur_batting_team.player_names[self.cur_batting_team.starting_pitcher]} and'
-                           f'{self.cur_pitching_team.player_names[self.cur_pitching_team.starting_pitcher]} are now '
-                           f'triple threats.')
+            self.log_event(GameEvent.TRIPLE_THREAT, self.cur_batting_team.starting_pitcher,
+                           self.cur_pitching_team.starting_pitcher)
         if self.half == InningHalf.TOP:
-            self.log_event(f'\nTop of the {self.inning}, {self.away_team.name} batting.')
-            self.log_event(f'{self.away_team.get_cur_batter_name()} at bat. {self.home_team.get_cur_pitcher_name()} '
-                           f'pitching.')
+            self.log_event(GameEvent.HALF_START, value=self.inning, value2=InningHalf.TOP.value)
+            self.log_event(GameEvent.AT_BAT, self.away_team.cur_batter, self.home_team.starting_pitcher)
             self.cur_batting_team = self.away_team
             self.cur_pitching_team = self.home_team
         else:
-            self.log_event(f'\nBottom of the {self.inning}, {self.home_team.name} batting.')
-            self.log_event(f'{self.home_team.get_cur_batter_name()} at bat. {self.away_team.get_cur_pitcher_name()} '
-                           f'pitching.')
+            self.log_event(GameEvent.HALF_START, value=self.inning, value2=InningHalf.BOTTOM.value)
+            self.log_event(GameEvent.AT_BAT, self.home_team.cur_batter, self.away_team.starting_pitcher)
             self.cur_batting_team = self.home_team
             self.cur_pitching_team = self.away_team
         self.cur_base_runners = {}
@@ -290,36 +448,46 @@ class GameState(object):
     def simulate_game(self) -> Tuple[Union[Decimal, Decimal], Union[Decimal, Decimal], List[str]]:
         """Loop until the game over state is true"""
         while not self.is_game_over:
-            if not self.stolen_base_sim():
-                self.pitch_sim()
-            if len(self.cur_base_runners) > 0:
-                self.cur_batting_team.runners_aboard = True
-            else:
-                self.cur_batting_team.runners_aboard = False
-            self.attempt_to_advance_inning()
-            self.cur_batting_team.validate_game_state_additives(self.get_batting_team_score(), self.stadium)
-            self.cur_pitching_team.validate_game_state_additives(self.get_pitching_team_score(), self.stadium)
-            if self.inning == 4 and self.half == InningHalf.TOP and len(self.cur_base_runners) == 0 and \
-                self.outs == 0 and self.strikes == 0 and self.balls == 0:
-                if PlayerBuff.TRIPLE_THREAT in self.cur_batting_team.player_buffs[self.cur_batting_team.starting_pitcher]:
-                    if self._random_roll() <= REMOVE_COFFEE_3_PERCENTAGE:
-                        self.log_event(f'{self.cur_batting_team.player_names[self.cur_batting_team.starting_pitcher]} '
-                                       f'loses triple threat.')
-                        del self.cur_batting_team.player_buffs[self.cur_batting_team.starting_pitcher][PlayerBuff.TRIPLE_THREAT]
-                if PlayerBuff.TRIPLE_THREAT in self.cur_pitching_team.player_buffs[self.cur_pitching_team.starting_pitcher]:
-                    if self._random_roll() <= REMOVE_COFFEE_3_PERCENTAGE:
-                        self.log_event(f'{self.cur_pitching_team.player_names[self.cur_pitching_team.starting_pitcher]} '
-                                       f'loses triple threat.')
-                        del self.cur_pitching_team.player_buffs[self.cur_pitching_team.starting_pitcher][PlayerBuff.TRIPLE_THREAT]
-        if self.away_score == 0:
+            self.step()
+        return self.finalize_game()
+
+    def step(self) -> None:
+        """Advance the game by a single steal attempt, pitch or, at plate appearance granularity, plate appearance"""
+        if self.common_seed is not None:
+            self.sync_common_random_numbers()
+        if self.granularity == SimulationGranularity.PLATE_APPEARANCE:
+            self.plate_appearance_sim()
+        elif not self.stolen_base_sim():
+            self.pitch_sim()
+        if len(self.cur_base_runners) > 0:
+            self.cur_batting_team.runners_aboard = True
+        else:
+            self.cur_batting_team.runners_aboard = False
+        self.attempt_to_advance_inning()
+        self.cur_batting_team.validate_game_state_additives(self.get_batting_team_score(), self.stadium)
+        self.cur_pitching_team.validate_game_state_additives(self.get_pitching_team_score(), self.stadium)
+        if self.inning == 4 and self.half == InningHalf.TOP and len(self.cur_base_runners) == 0 and \
+            self.outs == 0 and self.strikes == 0 and self.balls == 0:
+            if PlayerBuff.TRIPLE_THREAT in self.cur_batting_team.player_buffs[self.cur_batting_team.starting_pitcher]:
+                if self._random_roll() <= REMOVE_COFFEE_3_PERCENTAGE:
+                    self.log_event(GameEvent.LOSES_TRIPLE_THREAT, self.cur_batting_team.starting_pitcher)
+                    del self.cur_batting_team.player_buffs[self.cur_batting_team.starting_pitcher][PlayerBuff.TRIPLE_THREAT]
+            if PlayerBuff.TRIPLE_THREAT in self.cur_pitching_team.player_buffs[self.cur_pitching_team.starting_pitcher]:
+                if self._random_roll() <= REMOVE_COFFEE_3_PERCENTAGE:
+                    self.log_event(GameEvent.LOSES_TRIPLE_THREAT, self.cur_pitching_team.starting_pitcher)
+                    del self.cur_pitching_team.player_buffs[self.cur_pitching_team.starting_pitcher][PlayerBuff.TRIPLE_THREAT]
+
+    def finalize_game(self) -> Tuple[Union[Decimal, Decimal], Union[Decimal, Decimal], List[str]]:
+        """Record the end of game stats once the game is over"""
+        if self.away_score_tenths == 0:
             self.home_team.update_stat(self.home_team.starting_pitcher, Stats.PITCHER_SHUTOUTS, 1.0, self.day)
-        if self.home_score == 0:
+        if self.home_score_tenths == 0:
             self.away_team.update_stat(self.away_team.starting_pitcher, Stats.PITCHER_SHUTOUTS, 1.0, self.day)
         self.home_team.update_stat(self.home_team.starting_pitcher, Stats.PITCHER_SHUTOUTS, 0.0, self.day)
         self.away_team.update_stat(self.away_team.starting_pitcher, Stats.PITCHER_SHUTOUTS, 0.0, self.day)
         self.home_team.update_stat(self.home_team.starting_pitcher, Stats.PITCHER_GAMES_APPEARED, 1.0, self.day)
         self.away_team.update_stat(self.away_team.starting_pitcher, Stats.PITCHER_GAMES_APPEARED, 1.0, self.day)
-        if self.home_score > self.away_score:
+        if self.home_score_tenths > self.away_score_tenths:
             self.home_team.update_stat(TEAM_ID, Stats.TEAM_WINS, 1.0, self.day)
             self.away_team.update_stat(TEAM_ID, Stats.TEAM_LOSSES, 1.0, self.day)
         else:
@@ -330,7 +498,7 @@ class GameState(object):
     def validate_current_batter_state(self):
         cur_buffs = self.cur_batting_team.player_buffs[self.cur_batting_team.cur_batter]
         if PlayerBuff.ELSEWHERE in cur_buffs.keys() or PlayerBuff.SHELLED in cur_buffs.keys():
-            self.log_event(f"Skipping {self.cur_batting_team.get_cur_batter_name()} due to UNAVAILABILITY.")
+            self.log_event(GameEvent.SKIP_UNAVAILABLE, self.cur_batting_team.cur_batter)
             self.cur_batting_team.next_batter()
             self.validate_current_batter_state()
 
@@ -341,17 +509,25 @@ class GameState(object):
         if self.resolve_team_pre_pitch_event():
             # A pre-pitch event occurred, skip the pitch and let the game state try to advance
             return
-        self.cur_pitching_team.update_stat(self.cur_pitching_team.starting_pitcher,
-                                           Stats.PITCHER_PITCHES_THROWN, 1.0, self.day)
-        self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
-                                          Stats.BATTER_PITCHES_FACED, 1.0, self.day)
-        pitch_fv = self.gen_pitch_fv(
-            self.cur_batting_team.get_cur_batter_feature_vector(),
-            self.cur_pitching_team.get_pitcher_feature_vector(),
-            self.cur_pitching_team.get_defense_feature_vector(),
-            self.stadium.get_stadium_fv(),
-        )
-        pitch_result = self.generic_model_roll(Ml.PITCH, pitch_fv)
+        if self.count_pitches:
+            self.cur_pitching_team.update_stat(self.cur_pitching_team.starting_pitcher,
+                                               Stats.PITCHER_PITCHES_THROWN, 1.0, self.day)
+            self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
+                                              Stats.BATTER_PITCHES_FACED, 1.0, self.day)
+        # with a matchup table row the pitch, hit type and out type outcomes are sampled from it and no feature
+        # vector is built
+        pitch_fv = None
+        self.matchup_row = None
+        if self.matchup_table is not None:
+            self.matchup_row = self.matchup_table.get_row(self.cur_batting_team, self.cur_pitching_team)
+        if self.matchup_row is None:
+            pitch_fv = self.gen_pitch_fv(
+                self.cur_batting_team.get_cur_batter_feature_vector(),
+                self.cur_pitching_team.get_pitcher_feature_vector(),
+                self.cur_pitching_team.get_defense_feature_vector(),
+                self.stadium.get_stadium_fv(),
+            )
+        pitch_result = self.pitch_model_roll(Ml.PITCH, pitch_fv)
 
         # check for fiery pitch
         num_strikes = self.resolve_fiery()
@@ -368,9 +544,9 @@ class GameState(object):
                 if self.is_start_of_at_bat() and self.check_blood_requirement(self.cur_batting_team.cur_batter, req_blood) and pitch_result == 5:
                     retry_count = 0
                     while pitch_result == 5:
-                        self.log_event(f'O Blood triggered a pitch redo!.')
+                        self.log_event(GameEvent.O_BLOOD_REDO)
                         retry_count += 1
-                        pitch_result = self.generic_model_roll(Ml.PITCH, pitch_fv)
+                        pitch_result = self.pitch_model_roll(Ml.PITCH, pitch_fv)
                         if retry_count > 20:
                             raise Exception("Error: Unable to reroll pitch for O Blood.")
             # Deal with H2O
@@ -379,8 +555,8 @@ class GameState(object):
                     retry_count = 0
                     while pitch_result == 5:
                         retry_count += 1
-                        self.log_event(f'H2O Blood triggered a pitch redo!.')
-                        pitch_result = self.generic_model_roll(Ml.PITCH, pitch_fv)
+                        self.log_event(GameEvent.H2O_BLOOD_REDO)
+                        pitch_result = self.pitch_model_roll(Ml.PITCH, pitch_fv)
                         if retry_count > 20:
                             raise Exception("Error: Unable to reroll pitch for H2O Blood.")
 
@@ -389,19 +565,13 @@ class GameState(object):
             self.cur_pitching_team.update_stat(self.cur_pitching_team.starting_pitcher,
                                                Stats.PITCHER_BALLS_THROWN, 1.0, self.day)
             self.balls += 1
-            self.log_event(f'Ball {self.balls}.')
+            self.log_event(GameEvent.BALL, value=self.balls)
             if self.balls == self.balls_for_walk:
-                if psychic_pitcher_check:
-                    self.log_event(f'Psychic triggered!  Transforming a walk into a strikeout.')
-                    self.strikes = self.strikes_for_out
-                    self.resolve_strikeout(acidic_pitcher_check=False)
-                else:
-                    num_bases_to_advance: int = self.resolve_base_instincts()
-                    self.resolve_walk(num_bases_to_advance, acidic_pitcher_check)
+                self.resolve_ball_four(psychic_pitcher_check, acidic_pitcher_check)
             return
         if pitch_result == 1:
             if self.resolve_o_no():
-                self.log_event(f'Oh No triggered!.')
+                self.log_event(GameEvent.OH_NO)
                 pitch_result = 2
             else:
                 self.cur_pitching_team.update_stat(
@@ -412,20 +582,14 @@ class GameState(object):
                 )
                 self.strikes += num_strikes
                 if num_strikes > 1:
-                    self.log_event(f'FIERY STRIKE!')
-                self.log_event(f'Strike swinging. Strike {self.strikes}.')
+                    self.log_event(GameEvent.FIERY_STRIKE)
+                self.log_event(GameEvent.STRIKE_SWINGING, value=self.strikes)
                 if self.strikes >= self.strikes_for_out:
-                    if psychic_batter_check:
-                        self.log_event(f'Psychic triggered!  Transforming a strikeout into a walk.')
-                        self.strikes -= self.strikes_for_out
-                        self.balls = self.balls_for_walk
-                        self.resolve_walk(1, acidic_pitcher_check)
-                    else:
-                        self.resolve_strikeout(acidic_pitcher_check)
+                    self.resolve_strike_three(psychic_batter_check, acidic_pitcher_check)
                 return
         if pitch_result == 5:
             if self.resolve_o_no():
-                self.log_event(f'Oh No triggered!.')
+                self.log_event(GameEvent.OH_NO)
                 pitch_result = 2
             else:
                 self.cur_pitching_team.update_stat(
@@ -436,16 +600,10 @@ class GameState(object):
                 )
                 self.strikes += num_strikes
                 if num_strikes > 1:
-                    self.log_event(f'FIERY STRIKE!')
-                self.log_event(f'Strike looking. Strike {self.strikes}.')
+                    self.log_event(GameEvent.FIERY_STRIKE)
+                self.log_event(GameEvent.STRIKE_LOOKING, value=self.strikes)
                 if self.strikes >= self.strikes_for_out:
-                    if psychic_batter_check:
-                        self.log_event(f'Psychic triggered!  Transforming a strikeout into a walk.')
-                        self.strikes -= self.strikes_for_out
-                        self.balls = self.balls_for_walk
-                        self.resolve_walk(1, acidic_pitcher_check)
-                    else:
-                        self.resolve_strikeout(acidic_pitcher_check)
+                    self.resolve_strike_three(psychic_batter_check, acidic_pitcher_check)
                 return
         if pitch_result == 2:
             self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
@@ -455,12 +613,12 @@ class GameState(object):
                     self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
                                                       Stats.BATTER_FOUL_BALLS, 1.0, self.day)
                     self.strikes += 2
-                    self.log_event(f'Fouled off 2 fiery strikes.  Strike {self.strikes}.')
+                    self.log_event(GameEvent.FIERY_FOUL, value=self.strikes)
                 else:
                     self.strikes += 1
-                    self.log_event(f'Foul ball.  Strike {self.strikes}.')
+                    self.log_event(GameEvent.FOUL_STRIKE, value=self.strikes)
             else:
-                self.log_event(f'Foul ball.')
+                self.log_event(GameEvent.FOUL)
             return
         if pitch_result == 3:
             # Resolve flinch here.  If flinch and no strikes, add a strike and short circuit the hit.
@@ -473,28 +631,11 @@ class GameState(object):
                     self.day
                 )
                 self.strikes += 1
-                self.log_event(f'{self.cur_batting_team.player_names[self.cur_batting_team.cur_batter]} flinches. '
-                               f'Strike {self.strikes}.')
+                self.log_event(GameEvent.FLINCH, self.cur_batting_team.cur_batter, value=self.strikes)
                 return
 
             # No flinch, its a hit
-            # Official plate appearance
-            self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
-                                              Stats.BATTER_PLATE_APPEARANCES, 1.0, self.day)
-            self.cur_pitching_team.update_stat(
-                self.cur_pitching_team.starting_pitcher,
-                Stats.PITCHER_BATTERS_FACED,
-                1.0,
-                self.day
-            )
-            self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
-                                              Stats.BATTER_AT_BATS, 1.0, self.day)
-            self.hit_sim(pitch_fv, acidic_pitcher_check)
-            self.cur_batting_team.apply_hit_to_buffs(self.cur_batting_team.cur_batter)
-            self.reset_pitch_count()
-            self.cur_batting_team.next_batter()
-            if self.outs < self.outs_for_inning:
-                self.log_event(f'{self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} now at bat.')
+            self.resolve_hit(pitch_fv, acidic_pitcher_check)
             return
         if pitch_result == 4:
             # Resolve flinch here.  If flinch and no strikes, add a strike and short circuit the out.
@@ -507,29 +648,195 @@ class GameState(object):
                     self.day
                 )
                 self.strikes += 1
-                self.log_event(f'{self.cur_batting_team.player_names[self.cur_batting_team.cur_batter]} flinches. '
-                               f'Strike {self.strikes}.')
+                self.log_event(GameEvent.FLINCH, self.cur_batting_team.cur_batter, value=self.strikes)
                 return
             # Its an out
-            # Official plate appearance
-            self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
-                                              Stats.BATTER_PLATE_APPEARANCES, 1.0, self.day)
-            self.cur_pitching_team.update_stat(
-                self.cur_pitching_team.starting_pitcher,
-                Stats.PITCHER_BATTERS_FACED,
-                1.0,
-                self.day
+            self.resolve_in_play_out(pitch_fv, acidic_pitcher_check)
+            return
+
+    def resolve_ball_four(self, psychic_pitcher_check: bool, acidic_pitcher_check: bool) -> None:
+        if psychic_pitcher_check:
+            self.log_event(GameEvent.PSYCHIC_STRIKEOUT)
+            self.strikes = self.strikes_for_out
+            self.resolve_strikeout(acidic_pitcher_check=False)
+        else:
+            num_bases_to_advance: int = self.resolve_base_instincts()
+            self.resolve_walk(num_bases_to_advance, acidic_pitcher_check)
+
+    def resolve_strike_three(self, psychic_batter_check: bool, acidic_pitcher_check: bool) -> None:
+        if psychic_batter_check:
+            self.log_event(GameEvent.PSYCHIC_WALK)
+            self.strikes -= self.strikes_for_out
+            self.balls = self.balls_for_walk
+            self.resolve_walk(1, acidic_pitcher_check)
+        else:
+            self.resolve_strikeout(acidic_pitcher_check)
+
+    def resolve_hit(self, pitch_fv: Optional[List[List[float]]], acidic_pitcher_check: bool) -> None:
+        # Official plate appearance
+        self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
+                                          Stats.BATTER_PLATE_APPEARANCES, 1.0, self.day)
+        self.cur_pitching_team.update_stat(
+            self.cur_pitching_team.starting_pitcher,
+            Stats.PITCHER_BATTERS_FACED,
+            1.0,
+            self.day
+        )
+        self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
+                                          Stats.BATTER_AT_BATS, 1.0, self.day)
+        self.hit_sim(pitch_fv, acidic_pitcher_check)
+        self.cur_batting_team.apply_hit_to_buffs(self.cur_batting_team.cur_batter)
+        self.reset_pitch_count()
+        self.cur_batting_team.next_batter()
+        if self.outs < self.outs_for_inning:
+            self.log_event(GameEvent.NOW_AT_BAT, self.cur_batting_team.cur_batter)
+
+    def resolve_in_play_out(self, pitch_fv: Optional[List[List[float]]], acidic_pitcher_check: bool) -> None:
+        # Official plate appearance
+        self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
+                                          Stats.BATTER_PLATE_APPEARANCES, 1.0, self.day)
+        self.cur_pitching_team.update_stat(
+            self.cur_pitching_team.starting_pitcher,
+            Stats.PITCHER_BATTERS_FACED,
+            1.0,
+            self.day
+        )
+        self.in_play_sim(pitch_fv, acidic_pitcher_check)
+        self.cur_batting_team.reset_hit_buffs(self.cur_batting_team.cur_batter)
+        self.reset_pitch_count()
+        self.cur_batting_team.next_batter()
+        if self.outs < self.outs_for_inning:
+            self.log_event(GameEvent.NOW_AT_BAT, self.cur_batting_team.cur_batter)
+
+    # PLATE APPEARANCE MECHANICS
+    def can_sim_plate_appearance(self) -> bool:
+        """Check that nothing but the count and steal attempts can happen between pitches, so the count chain is
+        exact"""
+        if self.weather in [Weather.COFFEE, Weather.COFFEE2]:
+            return False
+        if self.weather == Weather.FLOODING and len(self.cur_base_runners) > 0:
+            return False
+        if self.weather == Weather.BIRD and \
+                PlayerBuff.FRIEND_OF_CROWS in self.cur_pitching_team.player_buffs[self.cur_pitching_team.starting_pitcher]:
+            return False
+        if PlayerBuff.HAUNTED in self.cur_batting_team.player_buffs[self.cur_batting_team.cur_batter]:
+            return False
+        if self.cur_batting_team.team_enum in pitch_reroll_event_map:
+            event, start_season, end_season, req_blood = pitch_reroll_event_map[self.cur_batting_team.team_enum]
+            if self.check_valid_season(start_season, end_season):
+                return False
+        if self.cur_batting_team.team_enum in team_pitch_event_map:
+            event, start_season, end_season, req_blood = team_pitch_event_map[self.cur_batting_team.team_enum]
+            if event in [PitchEventTeamBuff.ZAP, PitchEventTeamBuff.O_NO] and \
+                    self.check_valid_season(start_season, end_season):
+                return False
+        return True
+
+    def get_plate_appearance_chain(self, pitch_probs: List[float], steal_chance: float) -> PlateAppearanceChain:
+        fiery_chance = 0.0
+        if self.cur_pitching_team.team_enum in team_pitch_event_map:
+            if team_pitch_event_map[self.cur_pitching_team.team_enum][0] == PitchEventTeamBuff.FIERY:
+                fiery_chance = FIERY_TRIGGER_PERCENTAGE
+        flinch = PlayerBuff.FLINCH in self.cur_batting_team.player_buffs[self.cur_batting_team.cur_batter]
+        key = (tuple(pitch_probs), self.balls_for_walk, self.strikes_for_out, fiery_chance, flinch, steal_chance)
+        chain = self.plate_appearance_chains.get(key)
+        if chain is None:
+            if len(self.plate_appearance_chains) >= PLATE_APPEARANCE_CHAIN_CACHE_SIZE:
+                self.plate_appearance_chains.clear()
+            chain = PlateAppearanceChain(
+                pitch_probs, self.balls_for_walk, self.strikes_for_out, fiery_chance, flinch, steal_chance
             )
-            self.in_play_sim(pitch_fv, acidic_pitcher_check)
-            self.cur_batting_team.reset_hit_buffs(self.cur_batting_team.cur_batter)
-            self.reset_pitch_count()
-            self.cur_batting_team.next_batter()
-            if self.outs < self.outs_for_inning:
-                self.log_event(f'{self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} now at bat.')
+            self.plate_appearance_chains[key] = chain
+        return chain
+
+    def resolve_chained_steal_attempt(self, steal_odds: List[Tuple[int, str, List[List[float]], float]]) -> None:
+        """Pick the runner of a steal attempt known to happen, as stolen_base_sim would have"""
+        weights = []
+        no_steal_chance = 1.0
+        for _, _, _, attempt_chance in steal_odds:
+            weights.append(no_steal_chance * attempt_chance)
+            no_steal_chance *= 1.0 - attempt_chance
+        base, base_runner_id, base_runner_fv, _ = steal_odds[self.roll_outcome(weights)]
+        self.resolve_steal_attempt(base, base_runner_id, base_runner_fv)
+
+    def plate_appearance_sim(self) -> None:
+        """Simulate the rest of a plate appearance in one step by sampling how its count ends from the PITCH model,
+        either with the plate appearance resolved or with a steal attempt before one of the pitches.  Falls back to
+        a single steal check and pitch when another event could happen between pitches."""
+        self.validate_current_batter_state()
+        if not self.can_sim_plate_appearance():
+            if not self.stolen_base_sim():
+                self.pitch_sim()
+            return
+        # the runners and their odds of attempting a steal can't change until the count is interrupted
+        steal_odds = self.get_steal_attempt_odds()
+        no_steal_chance = 1.0
+        for _, _, _, attempt_chance in steal_odds:
+            no_steal_chance *= 1.0 - attempt_chance
+        if len(steal_odds) > 0 and self._random_roll() >= no_steal_chance:
+            self.resolve_chained_steal_attempt(steal_odds)
+            return
+        if self.resolve_team_pre_pitch_event():
+            return
+        pitch_fv = None
+        self.matchup_row = None
+        if self.matchup_table is not None:
+            self.matchup_row = self.matchup_table.get_row(self.cur_batting_team, self.cur_pitching_team)
+        if self.matchup_row is None:
+            pitch_fv = self.gen_pitch_fv(
+                self.cur_batting_team.get_cur_batter_feature_vector(),
+                self.cur_pitching_team.get_pitcher_feature_vector(),
+                self.cur_pitching_team.get_defense_feature_vector(),
+                self.stadium.get_stadium_fv(),
+            )
+            pitch_probs = self.get_model_probs(Ml.PITCH, pitch_fv)
+        else:
+            pitch_probs = self.matchup_row.probs[Ml.PITCH]
+        chain = self.get_plate_appearance_chain(pitch_probs, 1.0 - no_steal_chance)
+        if self.is_tilted():
+            # the rest of the game only depends on how the count ends, so its chance under each chain is the ratio
+            tilted_chain = self.get_plate_appearance_chain(self.tilt.tilt(Ml.PITCH, pitch_probs)[0],
+                                                           1.0 - no_steal_chance)
+            pa_exit = tilted_chain.sample(self._random_roll(), self.balls, self.strikes)
+            self.log_likelihood_ratio += math.log(chain.exit_probability(pa_exit, self.balls, self.strikes) /
+                                                  pa_exit.probability)
+        else:
+            pa_exit = chain.sample(self._random_roll(), self.balls, self.strikes)
+
+        # the pitch counters are the expected values over every count that ends this way
+        if self.count_pitches:
+            pitcher, batter = self.cur_pitching_team.starting_pitcher, self.cur_batting_team.cur_batter
+            self.cur_pitching_team.update_stat(pitcher, Stats.PITCHER_PITCHES_THROWN, pa_exit.pitches, self.day)
+            self.cur_batting_team.update_stat(batter, Stats.BATTER_PITCHES_FACED, pa_exit.pitches, self.day)
+            if pa_exit.balls_thrown > 0:
+                self.cur_pitching_team.update_stat(pitcher, Stats.PITCHER_BALLS_THROWN, pa_exit.balls_thrown,
+                                                   self.day)
+            if pa_exit.strikes_thrown > 0:
+                self.cur_pitching_team.update_stat(pitcher, Stats.PITCHER_STRIKES_THROWN, pa_exit.strikes_thrown,
+                                                   self.day)
+            if pa_exit.foul_balls > 0:
+                self.cur_batting_team.update_stat(batter, Stats.BATTER_FOUL_BALLS, pa_exit.foul_balls, self.day)
+        self.balls = pa_exit.balls
+        self.strikes = pa_exit.strikes
+        self.log_event(GameEvent.COUNT_RUNS, value=self.balls, value2=self.strikes)
+        if pa_exit.outcome == PlateAppearanceOutcome.STEAL_ATTEMPT:
+            self.resolve_chained_steal_attempt(steal_odds)
             return
 
+        psychic_batter_check = self.resolve_psychic_batter()
+        psychic_pitcher_check = self.resolve_psychic_pitcher()
+        acidic_pitcher_check = self.resolve_acidic_pitcher()
+        if pa_exit.outcome == PlateAppearanceOutcome.WALK:
+            self.resolve_ball_four(psychic_pitcher_check, acidic_pitcher_check)
+        elif pa_exit.outcome == PlateAppearanceOutcome.STRIKEOUT:
+            self.resolve_strike_three(psychic_batter_check, acidic_pitcher_check)
+        elif pa_exit.outcome == PlateAppearanceOutcome.HIT:
+            self.resolve_hit(pitch_fv, acidic_pitcher_check)
+        else:
+            self.resolve_in_play_out(pitch_fv, acidic_pitcher_check)
+
     def resolve_walk(self, num_bases_to_advance: int, acidic_pitcher_check: bool) -> None:
-        self.log_event(f'Batter {self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} walks to base {num_bases_to_advance}.')
+        self.log_event(GameEvent.WALK, self.cur_batting_team.cur_batter, value=num_bases_to_advance)
         # advance runners that are able
         # Known bug here for 5th base walks and base instincts
         if num_bases_to_advance == 4 or num_bases_to_advance == 3:
@@ -547,10 +854,10 @@ class GameState(object):
         self.cur_base_runners[num_bases_to_advance] = self.cur_batting_team.cur_batter
         self.reset_pitch_count()
         self.cur_batting_team.next_batter()
-        self.log_event(f'{self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} now at bat.')
+        self.log_event(GameEvent.NOW_AT_BAT, self.cur_batting_team.cur_batter)
 
     def resolve_strikeout(self, acidic_pitcher_check: bool = False) -> None:
-        self.log_event(f'Batter {self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} strikes out.')
+        self.log_event(GameEvent.STRIKEOUT, self.cur_batting_team.cur_batter)
         self.cur_pitching_team.update_stat(self.cur_pitching_team.starting_pitcher,
                                            Stats.PITCHER_STRIKEOUTS, 1.0, self.day)
         self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
@@ -558,47 +865,47 @@ class GameState(object):
         self.outs += 1
         self.cur_batting_team.reset_hit_buffs(self.cur_batting_team.cur_batter)
 
-        # Let's check if coffee3 applies
-        run_modifier = Decimal("0.0")
+        # Let's check if coffee3 applies, runs are in tenths
+        run_modifier = 0
         if acidic_pitcher_check:
-            run_modifier = Decimal("-0.1")
+            run_modifier = -1
         if PlayerBuff.TRIPLE_THREAT in self.cur_pitching_team.player_buffs[self.cur_pitching_team.starting_pitcher]:
             if self.balls == 3:
-                self.increase_batting_team_runs(Decimal("-0.3") + run_modifier)
+                self.increase_batting_team_runs(-3 + run_modifier)
             if len(self.cur_base_runners) == 3:
-                self.increase_batting_team_runs(Decimal("-0.3") + run_modifier)
+                self.increase_batting_team_runs(-3 + run_modifier)
             if 3 in self.cur_base_runners:
-                self.increase_batting_team_runs(Decimal("-0.3") + run_modifier)
+                self.increase_batting_team_runs(-3 + run_modifier)
 
         self.reset_pitch_count()
         self.cur_batting_team.next_batter()
         if self.outs < self.outs_for_inning:
-            self.log_event(f'{self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} now at bat.')
+            self.log_event(GameEvent.NOW_AT_BAT, self.cur_batting_team.cur_batter)
 
     # HIT MECHANICS
     def in_play_sim(self, pitch_feature_vector: List[List[float]], acidic_pitcher_check: bool = False) -> None:
-        contact_type = self.generic_model_roll(Ml.OUT_TYPE, pitch_feature_vector)
+        contact_type = self.pitch_model_roll(Ml.OUT_TYPE, pitch_feature_vector)
         # 0 = Flyout, 1 = Groundout
         if contact_type == 0:
-            self.log_event(
-                f'Batter {self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} flies out.')
+            self.log_event(GameEvent.FLY_OUT, self.cur_batting_team.cur_batter)
             self.outs += 1
             self.cur_pitching_team.update_stat(self.cur_pitching_team.starting_pitcher,
                                                Stats.PITCHER_FLYOUTS, 1.0, self.day)
             self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
                                               Stats.BATTER_FLYOUTS, 1.0, self.day)
+            self.count_stat_event(StatEvent.FLYOUT)
             self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
                                               Stats.BATTER_AT_BATS, 1.0, self.day)
             if self.outs < self.outs_for_inning:
                 self.attempt_to_advance_runners_on_flyout(acidic_pitcher_check)
         if contact_type == 1:
-            self.log_event(
-                f'Batter {self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} grounds out.')
+            self.log_event(GameEvent.GROUND_OUT, self.cur_batting_team.cur_batter)
             self.outs += 1
             self.cur_pitching_team.update_stat(self.cur_pitching_team.starting_pitcher,
                                                Stats.PITCHER_GROUNDOUTS, 1.0, self.day)
             self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
                                               Stats.BATTER_GROUNDOUTS, 1.0, self.day)
+            self.count_stat_event(StatEvent.GROUNDOUT)
             self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
                                               Stats.BATTER_AT_BATS, 1.0, self.day)
             if self.outs < self.outs_for_inning:
@@ -611,19 +918,18 @@ class GameState(object):
                                           Stats.BATTER_HITS, 1.0, self.day)
         self.cur_pitching_team.update_stat(self.cur_pitching_team.starting_pitcher,
                                            Stats.PITCHER_HITS_ALLOWED, 1.0, self.day)
-        hit_type = self.generic_model_roll(Ml.HIT_TYPE, pitch_feature_vector)
+        hit_type = self.pitch_model_roll(Ml.HIT_TYPE, pitch_feature_vector)
         # 0 = Single, 1 = Double, 2 = Triple, 3 = HR
         if hit_type == 0:
-            self.log_event(
-                f'Batter {self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} hits a single.')
+            self.log_event(GameEvent.SINGLE, self.cur_batting_team.cur_batter)
             self.advance_all_runners(1, acidic_pitcher_check)
             self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
                                               Stats.BATTER_SINGLES, 1.0, self.day)
+            self.count_stat_event(StatEvent.SINGLE)
             self.attempt_to_advance_runners_on_hit(acidic_pitcher_check)
             self.cur_base_runners[1] = self.cur_batting_team.cur_batter
         if hit_type == 1:
-            self.log_event(
-                f'Batter {self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} hits a double.')
+            self.log_event(GameEvent.DOUBLE, self.cur_batting_team.cur_batter)
             # Check to see if we need to turn on over performing for AA after a double was hit
             if self.cur_batting_team.team_enum in team_pitch_event_map:
                 # Possible event, let's validate
@@ -634,19 +940,19 @@ class GameState(object):
                     batter_id = self.cur_batting_team.cur_batter
                     if PlayerBuff.OVER_PERFORMING not in self.cur_batting_team.player_buffs[batter_id] and \
                             roll <= AA_TRIGGER_PERCENTAGE:
-                        self.log_event(f'AA triggers and turning on over perform.')
+                        self.log_event(GameEvent.AA_OVER_PERFORM)
                         self.cur_batting_team.player_buffs[batter_id][PlayerBuff.OVER_PERFORMING] = 1
 
             self.advance_all_runners(2, acidic_pitcher_check)
             self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
                                               Stats.BATTER_DOUBLES, 1.0, self.day)
+            self.count_stat_event(StatEvent.DOUBLE)
             self.cur_pitching_team.update_stat(self.cur_pitching_team.starting_pitcher,
                                                Stats.PITCHER_XBH_ALLOWED, 1.0, self.day)
             self.attempt_to_advance_runners_on_hit(acidic_pitcher_check)
             self.cur_base_runners[2] = self.cur_batting_team.cur_batter
         if hit_type == 2:
-            self.log_event(
-                f'Batter {self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} hits a triple.')
+            self.log_event(GameEvent.TRIPLE, self.cur_batting_team.cur_batter)
             # Check to see if we need to turn on over performing for AAA after a triple was hit
             if self.cur_batting_team.team_enum in team_pitch_event_map:
                 # Possible event, let's validate
@@ -657,21 +963,22 @@ class GameState(object):
                     batter_id = self.cur_batting_team.cur_batter
                     if PlayerBuff.OVER_PERFORMING not in self.cur_batting_team.player_buffs[batter_id] and \
                             roll <= AAA_TRIGGER_PERCENTAGE:
-                        self.log_event(f'AAA triggers and turning on over perform.')
+                        self.log_event(GameEvent.AAA_OVER_PERFORM)
                         self.cur_batting_team.player_buffs[batter_id][PlayerBuff.OVER_PERFORMING] = 1
             self.advance_all_runners(3, acidic_pitcher_check)
             self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
                                               Stats.BATTER_TRIPLES, 1.0, self.day)
+            self.count_stat_event(StatEvent.TRIPLE)
             self.cur_pitching_team.update_stat(self.cur_pitching_team.starting_pitcher,
                                                Stats.PITCHER_XBH_ALLOWED, 1.0, self.day)
             self.attempt_to_advance_runners_on_hit(acidic_pitcher_check)
             self.cur_base_runners[3] = self.cur_batting_team.cur_batter
         if hit_type == 3:
-            self.log_event(
-                f'Batter {self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} hits a home run.')
+            self.log_event(GameEvent.HOME_RUN, self.cur_batting_team.cur_batter)
             self.advance_all_runners(self.num_bases, acidic_pitcher_check)
             self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
                                               Stats.BATTER_HRS, 1.0, self.day)
+            self.count_stat_event(StatEvent.HOME_RUN)
             # batter scores
             self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter,
                                               Stats.BATTER_RBIS, 1.0, self.day)
@@ -685,16 +992,17 @@ class GameState(object):
                 1.0,
                 self.day
             )
-            run_modifier = Decimal("0.0")
+            # run values are in tenths of a run
+            run_modifier = 0
             if acidic_pitcher_check:
-                run_modifier = Decimal("-0.1")
-            run_val = Decimal("1.0") + run_modifier
+                run_modifier = -1
+            run_val = TENTHS_PER_RUN + run_modifier
             if self.weather == Weather.COFFEE and \
                     PlayerBuff.WIRED in self.cur_batting_team.player_buffs[self.cur_batting_team.cur_batter]:
-                run_val = Decimal("1.5") + run_modifier
+                run_val = 15 + run_modifier
             if self.weather == Weather.COFFEE and \
                     PlayerBuff.TIRED in self.cur_batting_team.player_buffs[self.cur_batting_team.cur_batter]:
-                run_val = Decimal("0.5") + run_modifier
+                run_val = 5 + run_modifier
             if self.weather == Weather.COFFEE2 and \
                     PlayerBuff.COFFEE_RALLY in self.cur_batting_team.player_buffs[self.cur_batting_team.cur_batter]:
                 if self.outs > 0:
@@ -702,11 +1010,10 @@ class GameState(object):
                     del self.cur_batting_team.player_buffs[self.cur_batting_team.cur_batter][PlayerBuff.COFFEE_RALLY]
             if self.stadium.has_big_buckets:
                 if self._random_roll() < BIG_BUCKET_PERCENTAGE:
-                    self.log_event('The home run lands in the big bucket, letting the batter score twice.')
-                    run_val = run_val * Decimal("2.0")
+                    self.log_event(GameEvent.BIG_BUCKET)
+                    run_val = run_val * 2
             self.increase_batting_team_runs(run_val)
-            self.log_event(
-                f'Batter {self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} scores.')
+            self.log_event(GameEvent.BATTER_SCORES, self.cur_batting_team.cur_batter)
             self.log_score()
 
         self.reset_pitch_count()
@@ -726,8 +1033,7 @@ class GameState(object):
                     self.stadium.get_stadium_fv(),
                 )
                 if self.generic_model_roll(Ml.RUNNER_ADV_HIT, base_runner_fv) == 1:
-                    self.log_event(
-                        f'Runner {self.cur_batting_team.get_player_name(self.cur_base_runners[base])} takes an extra base on the hit.')
+                    self.log_event(GameEvent.EXTRA_BASE, self.cur_base_runners[base])
                     self.update_base_runner(base, Stats.GENERIC_ADVANCEMENT, 1, acidic_pitcher_check)
 
         return
@@ -746,8 +1052,7 @@ class GameState(object):
                     self.stadium.get_stadium_fv(),
                 )
                 if self.generic_model_roll(Ml.RUNNER_ADV_OUT, base_runner_fv) == 1:
-                    self.log_event(
-                        f'Runner {self.cur_batting_team.get_player_name(self.cur_base_runners[base])} tags up and advances.')
+                    self.log_event(GameEvent.TAG_UP, self.cur_base_runners[base])
                     self.update_base_runner(base, Stats.GENERIC_ADVANCEMENT, 1, acidic_pitcher_check)
         return
 
@@ -757,7 +1062,7 @@ class GameState(object):
         return
 
     def _random_roll(self) -> float:
-        return random.random()
+        return self.rng.random()
 
     # TEAM BUFF AND WEATHER SPECIFIC MECHANICS
     def resolve_team_pre_pitch_event(self) -> bool:
@@ -766,23 +1071,20 @@ class GameState(object):
             if len(self.cur_base_runners.keys()) > 0:
                 roll = self._random_roll()
                 if roll < FLOODING_TRIGGER_PERCENTAGE:
-                    self.log_event('A surge of Immateria rushes up from Under! Baserunners are swept from play!')
+                    self.log_event(GameEvent.FLOOD)
                     to_clear = []
                     for base in self.cur_base_runners.keys():
                         cur_buff = self.cur_batting_team.player_buffs[self.cur_base_runners[base]]
                         if PlayerBuff.SWIM_BLADDER in cur_buff:
-                            self.log_event(
-                                f'{self.cur_batting_team.get_player_name(self.cur_base_runners[base])} uses FLIPPERS '
-                                f'to swim home.')
-                            self.increase_batting_team_runs(Decimal("1.0"))
+                            self.log_event(GameEvent.FLIPPERS, self.cur_base_runners[base])
+                            self.increase_batting_team_runs(TENTHS_PER_RUN)
                             to_clear.append(base)
                         else:
                             if PlayerBuff.EGO1 in cur_buff or \
                                     PlayerBuff.EGO2 in cur_buff or \
                                     PlayerBuff.EGO3 in cur_buff or \
                                     PlayerBuff.EGO4 in cur_buff:
-                                self.log_event(f'{self.cur_batting_team.get_player_name(self.cur_base_runners[base])}'
-                                               f'\'s EGO keeps them on base.')
+                                self.log_event(GameEvent.EGO, self.cur_base_runners[base])
                             else:
                                 to_clear.append(base)
                     for base in to_clear:
@@ -793,24 +1095,24 @@ class GameState(object):
         # Deal with Coffee Prime
         if self.weather == Weather.COFFEE:
             if self._random_roll() < COFFEE_PRIME_BEAN_PERCENTAGE:
-                self.log_event(f'{self.cur_batting_team.get_cur_batter_name()} is beaned.')
+                self.log_event(GameEvent.BEANED, self.cur_batting_team.cur_batter)
                 if PlayerBuff.TIRED in self.cur_batting_team.player_buffs[self.cur_batting_team.cur_batter]:
-                    self.log_event(f'{self.cur_batting_team.get_cur_batter_name()} loses Tired.')
+                    self.log_event(GameEvent.LOSES_TIRED, self.cur_batting_team.cur_batter)
                     del self.cur_batting_team.player_buffs[self.cur_batting_team.cur_batter][PlayerBuff.TIRED]
                     return True
                 if PlayerBuff.WIRED in self.cur_batting_team.player_buffs[self.cur_batting_team.cur_batter]:
-                    self.log_event(f'{self.cur_batting_team.get_cur_batter_name()} becomes Tired.')
+                    self.log_event(GameEvent.BECOMES_TIRED, self.cur_batting_team.cur_batter)
                     del self.cur_batting_team.player_buffs[self.cur_batting_team.cur_batter][PlayerBuff.WIRED]
                     self.cur_batting_team.player_buffs[self.cur_batting_team.cur_batter][PlayerBuff.TIRED] = 1
                     return True
-                self.log_event(f'{self.cur_batting_team.get_cur_batter_name()} becomes Wired.')
+                self.log_event(GameEvent.BECOMES_WIRED, self.cur_batting_team.cur_batter)
                 self.cur_batting_team.player_buffs[self.cur_batting_team.cur_batter][PlayerBuff.WIRED] = 1
                 return True
 
         # Deal with Coffee2
         if self.weather == Weather.COFFEE2:
             if self._random_roll() < COFFEE_2_PERCENTAGE:
-                self.log_event(f'{self.cur_batting_team.get_cur_batter_name()} is filled up.')
+                self.log_event(GameEvent.FILLED_UP, self.cur_batting_team.cur_batter)
                 self.cur_batting_team.player_buffs[self.cur_batting_team.cur_batter][PlayerBuff.COFFEE_RALLY] = 1
                 return True
 
@@ -818,7 +1120,7 @@ class GameState(object):
         if self.weather == Weather.BIRD and \
             PlayerBuff.FRIEND_OF_CROWS in self.cur_pitching_team.player_buffs[self.cur_pitching_team.starting_pitcher]:
             if self._random_roll() < FRIEND_OF_CROWS_PERCENTAGE:
-                self.log_event(f'{self.cur_batting_team.get_cur_batter_name()} is chased away by crows.  Out.')
+                self.log_event(GameEvent.CROWS, self.cur_batting_team.cur_batter)
                 self.cur_batting_team.update_stat(
                     self.cur_batting_team.cur_batter,
                     Stats.BATTER_PLATE_APPEARANCES,
@@ -831,14 +1133,13 @@ class GameState(object):
                     1.0,
                     self.day
                 )
+                self.count_stat_event(StatEvent.CROWS_OUT)
                 self.cur_batting_team.reset_hit_buffs(self.cur_batting_team.cur_batter)
                 self.outs += 1
                 self.reset_pitch_count()
                 self.cur_batting_team.next_batter()
                 if self.outs < self.outs_for_inning:
-                    self.log_event(
-                        f'{self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} now at bat.'
-                    )
+                    self.log_event(GameEvent.NOW_AT_BAT, self.cur_batting_team.cur_batter)
                 return True
 
 
@@ -857,8 +1158,7 @@ class GameState(object):
                             self.check_blood_requirement(self.cur_pitching_team.starting_pitcher, req_blood):
                         roll = self._random_roll()
                         if roll < CHARM_TRIGGER_PERCENTAGE:
-                            self.log_event(
-                                f'Batter {self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} is charmed into a strikeout.')
+                            self.log_event(GameEvent.CHARM_STRIKEOUT, self.cur_batting_team.cur_batter)
                             self.resolve_strikeout(False)
                             return True
                     return False
@@ -876,8 +1176,7 @@ class GameState(object):
                             self.check_blood_requirement(self.cur_batting_team.cur_batter, req_blood):
                         roll = self._random_roll()
                         if roll < CHARM_TRIGGER_PERCENTAGE:
-                            self.log_event(
-                                f'Batter {self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} charms a walk.')
+                            self.log_event(GameEvent.CHARM_WALK, self.cur_batting_team.cur_batter)
                             self.resolve_walk(1, False)
                             return True
                     return False
@@ -888,8 +1187,7 @@ class GameState(object):
                             self.check_blood_requirement(self.cur_batting_team.cur_batter, req_blood):
                         roll = self._random_roll()
                         if roll < ZAP_TRIGGER_PERCENTAGE:
-                            self.log_event(
-                                f'Batter {self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} zaps a strike.')
+                            self.log_event(GameEvent.ZAP, self.cur_batting_team.cur_batter)
                             self.strikes -= 1
                             return True
                     return False
@@ -957,8 +1255,7 @@ class GameState(object):
                 for num_base in reversed(sorted(cur_base_prior.keys())):
                     total_priors += cur_base_prior[num_base]
                     if roll < total_priors:
-                        self.log_event(
-                            f'Batter {self.cur_batting_team.get_player_name(self.cur_batting_team.cur_batter)} walks and base insticts lets them go to {num_base}.')
+                        self.log_event(GameEvent.BASE_INSTINCTS, self.cur_batting_team.cur_batter, value=num_base)
                         return num_base
         # Not base instincts team or base instincts did not trigger, only walk one base
         return 1
@@ -990,41 +1287,61 @@ class GameState(object):
                     self.stadium.get_stadium_fv(),
                 )
                 if self.generic_model_roll(Ml.SB_ATTEMPT, base_runner_fv) == 1:
-                    self.cur_batting_team.update_stat(base_runner_id, Stats.STOLEN_BASE_ATTEMPTS, 1.0, self.day)
-                    self.cur_pitching_team.update_stat(DEF_ID, Stats.DEFENSE_STOLEN_BASE_ATTEMPTS, 1.0, self.day)
-                    self.cur_pitching_team.update_stat(
-                        self.cur_pitching_team.starting_pitcher,
-                        Stats.DEFENSE_STOLEN_BASE_ATTEMPTS,
-                        1.0,
-                        self.day
-                    )
-                    if self.generic_model_roll(Ml.SB_SUCCESS, base_runner_fv) == 1:
-                        self.cur_batting_team.update_stat(base_runner_id, Stats.STOLEN_BASES, 1.0, self.day)
-                        self.cur_pitching_team.update_stat(DEF_ID, Stats.DEFENSE_STOLEN_BASES, 1.0, self.day)
-                        self.cur_pitching_team.update_stat(
-                            self.cur_pitching_team.starting_pitcher,
-                            Stats.DEFENSE_STOLEN_BASES,
-                            1.0,
-                            self.day
-                        )
-                        self.update_base_runner(base, Stats.STOLEN_BASES)
-                        if PlayerBuff.BLASERUNNING in self.cur_batting_team.player_buffs[base_runner_id]:
-                            self.increase_batting_team_runs(Decimal("0.2"))
-                    else:
-                        self.cur_batting_team.update_stat(base_runner_id, Stats.CAUGHT_STEALINGS, 1.0, self.day)
-                        self.cur_pitching_team.update_stat(DEF_ID, Stats.DEFENSE_CAUGHT_STEALINGS, 1.0, self.day)
-                        self.cur_pitching_team.update_stat(
-                            self.cur_pitching_team.starting_pitcher,
-                            Stats.DEFENSE_CAUGHT_STEALINGS,
-                            1.0,
-                            self.day
-                        )
-                        self.update_base_runner(base, Stats.CAUGHT_STEALINGS)
+                    self.resolve_steal_attempt(base, base_runner_id, base_runner_fv)
                     # runner attempted to steal
                     return True
         # No steal attempt was made by any runner
         return False
 
+    def get_steal_attempt_odds(self) -> List[Tuple[int, str, List[List[float]], float]]:
+        """The runners stolen_base_sim checks in order, with the feature vector and chance of each attempting"""
+        ret_val = []
+        for base in reversed(sorted(self.cur_base_runners.keys())):
+            if base + 1 not in self.cur_base_runners.keys():
+                base_runner_id = self.cur_base_runners[base]
+                base_runner_fv = self.gen_runner_fv(
+                    self.cur_batting_team.get_runner_feature_vector(base_runner_id),
+                    self.cur_pitching_team.get_defense_feature_vector(),
+                    self.cur_pitching_team.get_pitcher_feature_vector(),
+                    self.stadium.get_stadium_fv(),
+                )
+                attempt_chance = float(self.get_model_probs(Ml.SB_ATTEMPT, base_runner_fv)[1])
+                ret_val.append((base, base_runner_id, base_runner_fv, attempt_chance))
+        return ret_val
+
+    def resolve_steal_attempt(self, base: int, base_runner_id: str, base_runner_fv: List[List[float]]) -> None:
+        self.cur_batting_team.update_stat(base_runner_id, Stats.STOLEN_BASE_ATTEMPTS, 1.0, self.day)
+        self.cur_pitching_team.update_stat(DEF_ID, Stats.DEFENSE_STOLEN_BASE_ATTEMPTS, 1.0, self.day)
+        self.cur_pitching_team.update_stat(
+            self.cur_pitching_team.starting_pitcher,
+            Stats.DEFENSE_STOLEN_BASE_ATTEMPTS,
+            1.0,
+            self.day
+        )
+        if self.generic_model_roll(Ml.SB_SUCCESS, base_runner_fv) == 1:
+            self.cur_batting_team.update_stat(base_runner_id, Stats.STOLEN_BASES, 1.0, self.day)
+            self.cur_pitching_team.update_stat(DEF_ID, Stats.DEFENSE_STOLEN_BASES, 1.0, self.day)
+            self.cur_pitching_team.update_stat(
+                self.cur_pitching_team.starting_pitcher,
+                Stats.DEFENSE_STOLEN_BASES,
+                1.0,
+                self.day
+            )
+            self.update_base_runner(base, Stats.STOLEN_BASES)
+            if PlayerBuff.BLASERUNNING in self.cur_batting_team.player_buffs[base_runner_id]:
+                # blaserunning is worth 0.2 runs
+                self.increase_batting_team_runs(2)
+        else:
+            self.cur_batting_team.update_stat(base_runner_id, Stats.CAUGHT_STEALINGS, 1.0, self.day)
+            self.cur_pitching_team.update_stat(DEF_ID, Stats.DEFENSE_CAUGHT_STEALINGS, 1.0, self.day)
+            self.cur_pitching_team.update_stat(
+                self.cur_pitching_team.starting_pitcher,
+                Stats.DEFENSE_CAUGHT_STEALINGS,
+                1.0,
+                self.day
+            )
+            self.update_base_runner(base, Stats.CAUGHT_STEALINGS)
+
     # BASE RUNNING MECHANICS
     def advance_all_runners(self, num_bases_to_advance: int, acidic_pitcher_check: bool = False) -> None:
         for base in reversed(sorted(self.cur_base_runners.keys())):
@@ -1046,8 +1363,7 @@ class GameState(object):
 
     def update_base_runner(self, base: int, action: Stats, num_bases_to_advance: int = 1, is_acidic: bool = False):
         if action == Stats.CAUGHT_STEALINGS:
-            self.log_event(
-                f'Runner {self.cur_batting_team.get_player_name(self.cur_base_runners[base])} caught stealing.')
+            self.log_event(GameEvent.CAUGHT_STEALING, self.cur_base_runners[base])
             self.outs += 1
             del self.cur_base_runners[base]
             return
@@ -1061,13 +1377,13 @@ class GameState(object):
                     1.0,
                     self.day
                 )
-                run_val = Decimal("1.0")
+                run_val = TENTHS_PER_RUN
                 if self.weather == Weather.COFFEE and \
                         PlayerBuff.WIRED in self.cur_batting_team.player_buffs[self.cur_base_runners[base]]:
-                    run_val = Decimal("1.5")
+                    run_val = 15
                 if self.weather == Weather.COFFEE and \
                         PlayerBuff.TIRED in self.cur_batting_team.player_buffs[self.cur_base_runners[base]]:
-                    run_val = Decimal("0.5")
+                    run_val = 5
                 if self.weather == Weather.COFFEE2 and \
                         PlayerBuff.COFFEE_RALLY in self.cur_batting_team.player_buffs[self.cur_base_runners[base]]:
                     if self.outs > 0:
@@ -1077,8 +1393,7 @@ class GameState(object):
                 del self.cur_base_runners[base]
             else:
                 new_base = base + 1
-                self.log_event(
-                    f'Runner {self.cur_batting_team.get_player_name(self.cur_base_runners[base])} steals base {new_base}.')
+                self.log_event(GameEvent.STEAL, self.cur_base_runners[base], value=new_base)
                 assert new_base not in self.cur_base_runners
                 assert new_base < self.num_bases
                 runner_id = self.cur_base_runners[base]
@@ -1087,14 +1402,14 @@ class GameState(object):
             return
         if action == Stats.GENERIC_ADVANCEMENT:
             base_run_value_mod_flt = 0.0
-            base_run_value_mod = Decimal("0.0")
+            # in tenths of a run
+            base_run_value_mod = 0
             if is_acidic:
                 base_run_value_mod_flt = -0.1
-                base_run_value_mod = Decimal("-0.1")
+                base_run_value_mod = -1
             if base >= self.num_bases - num_bases_to_advance:
                 # run scores
-                self.log_event(
-                    f'Runner {self.cur_batting_team.get_player_name(self.cur_base_runners[base])} scores.')
+                self.log_event(GameEvent.RUNNER_SCORES, self.cur_base_runners[base])
                 self.cur_batting_team.update_stat(self.cur_batting_team.cur_batter, Stats.BATTER_RBIS, 1.0, self.day)
                 self.cur_batting_team.update_stat(self.cur_base_runners[base], Stats.BATTER_RUNS_SCORED, 1.0, self.day)
                 self.cur_pitching_team.update_stat(
@@ -1103,13 +1418,13 @@ class GameState(object):
                     1.0 + base_run_value_mod_flt,
                     self.day
                 )
-                run_val = Decimal("1.0") + base_run_value_mod
+                run_val = TENTHS_PER_RUN + base_run_value_mod
                 if self.weather == Weather.COFFEE and \
                         PlayerBuff.WIRED in self.cur_batting_team.player_buffs[self.cur_base_runners[base]]:
-                    run_val = Decimal("1.5") + base_run_value_mod
+                    run_val = 15 + base_run_value_mod
                 if self.weather == Weather.COFFEE and \
                         PlayerBuff.TIRED in self.cur_batting_team.player_buffs[self.cur_base_runners[base]]:
-                    run_val = Decimal("0.5") + base_run_value_mod
+                    run_val = 5 + base_run_value_mod
                 if self.weather == Weather.COFFEE2 and \
                         PlayerBuff.COFFEE_RALLY in self.cur_batting_team.player_buffs[self.cur_base_runners[base]]:
                     if self.outs > 0:
@@ -1131,39 +1446,52 @@ class GameState(object):
     def is_start_of_at_bat(self) -> bool:
         return self.balls == 0 and self.strikes == 0
 
+    def get_model_probs(self, model: Ml, feature_vector: List[List[float]]) -> List[float]:
+        if self.prediction_cache is None:
+            return self.clf[model].predict_proba(feature_vector)[0]
+        return self.prediction_cache.get_probs(model, self.clf[model], feature_vector)
+
     def generic_model_roll(self, model: Ml, feature_vector: List[List[float]]) -> int:
-        probs: List[float] = self.clf[model].predict_proba(feature_vector)[0]
-        # generate random float between 0-1
-        roll = self._random_roll()
-        total = 0.0
-        for i in range(len(probs)):
-            # add the odds of the next outcome to the running total
-            total += probs[i]
-            # if the random roll is less than the new total, return this outcome
-            if roll < total:
-                return i
-
-    def increase_batting_team_runs(self, amt: Decimal) -> None:
+        return self.roll_outcome(self.get_model_probs(model, feature_vector))
+
+    def pitch_model_roll(self, model: Ml, pitch_feature_vector: Optional[List[List[float]]]) -> int:
+        """Roll a model fed by the pitch features, from the current matchup row when no features were built"""
+        if pitch_feature_vector is None:
+            probs = self.matchup_row.probs[model]
+        else:
+            probs = self.get_model_probs(model, pitch_feature_vector)
+        if self.tilt is not None and model in TILT_SCORES and self.is_tilted():
+            tilted_probs, log_ratios = self.tilt.tilt(model, probs)
+            outcome = self.roll_outcome(tilted_probs)
+            self.log_likelihood_ratio += log_ratios[outcome]
+            return outcome
+        return self.roll_outcome(probs)
+
+    def roll_outcome(self, probs: List[float]) -> int:
+        return self.rng.choice(probs)
+
+    def increase_batting_team_runs(self, amt: int) -> None:
+        """Add amt tenths of a run to the batting team's score"""
         if self.half == InningHalf.TOP:
-            self.away_score = self.away_score + amt
-            if self.weather == Weather.SUN2 and self.away_score >= 10.0:
-                self.log_event(f'Sun2 sets a win upon the {self.cur_batting_team.team_enum.name}.')
+            self.away_score_tenths += amt
+            if self.weather == Weather.SUN2 and self.away_score_tenths >= 10 * TENTHS_PER_RUN:
+                self.log_event(GameEvent.SUN2_WIN, value2=self.side_of(self.cur_batting_team))
                 self.cur_batting_team.update_stat(TEAM_ID, Stats.TEAM_SUN2_WINS, 1.0, self.day)
-                self.away_score = self.away_score - Decimal("10.0")
-            if self.weather == Weather.BLACKHOLE and self.away_score >= 10.0:
-                self.log_event(f'Black hole steals a win from {self.cur_pitching_team.team_enum.name}.')
+                self.away_score_tenths -= 10 * TENTHS_PER_RUN
+            if self.weather == Weather.BLACKHOLE and self.away_score_tenths >= 10 * TENTHS_PER_RUN:
+                self.log_event(GameEvent.BLACK_HOLE, value2=self.side_of(self.cur_pitching_team))
                 self.cur_pitching_team.update_stat(TEAM_ID, Stats.TEAM_BLACK_HOLE_CONSUMPTION, 1.0, self.day)
-                self.away_score = self.away_score - Decimal("10.0")
+                self.away_score_tenths -= 10 * TENTHS_PER_RUN
         else:
-            self.home_score = self.home_score + amt
-            if self.weather == Weather.SUN2 and self.home_score >= 10.0:
-                self.log_event(f'Sun2 sets a win upon the {self.cur_batting_team.team_enum.name}.')
+            self.home_score_tenths += amt
+            if self.weather == Weather.SUN2 and self.home_score_tenths >= 10 * TENTHS_PER_RUN:
+                self.log_event(GameEvent.SUN2_WIN, value2=self.side_of(self.cur_batting_team))
                 self.cur_batting_team.update_stat(TEAM_ID, Stats.TEAM_SUN2_WINS, 1.0, self.day)
-                self.home_score = self.home_score - Decimal("10.0")
-            if self.weather == Weather.BLACKHOLE and self.home_score >= 10.0:
-                self.log_event(f'Black hole steals a win from {self.cur_pitching_team.team_enum.name}.')
+                self.home_score_tenths -= 10 * TENTHS_PER_RUN
+            if self.weather == Weather.BLACKHOLE and self.home_score_tenths >= 10 * TENTHS_PER_RUN:
+                self.log_event(GameEvent.BLACK_HOLE, value2=self.side_of(self.cur_pitching_team))
                 self.cur_pitching_team.update_stat(TEAM_ID, Stats.TEAM_BLACK_HOLE_CONSUMPTION, 1.0, self.day)
-                self.home_score = self.home_score - Decimal("10.0")
+                self.home_score_tenths -= 10 * TENTHS_PER_RUN
 
     def attempt_to_advance_inning(self) -> None:
         if self.inning < 9:
@@ -1179,7 +1507,7 @@ class GameState(object):
                 else:
                     self.inning += 1
                     self.half = InningHalf.TOP
-                self.log_event(f'Side retired. {self.half.name} of inning {self.inning}.')
+                self.log_event(GameEvent.SIDE_RETIRED, value=self.inning, value2=self.half.value)
                 self.log_score()
                 self.refresh_game_status()
                 self.reset_inning_counts()
@@ -1189,22 +1517,22 @@ class GameState(object):
                 self.cur_pitching_team.update_stat(self.cur_pitching_team.starting_pitcher,
                                                    Stats.PITCHER_INNINGS_PITCHED, 1.0, self.day)
                 if self.half == InningHalf.TOP:
-                    if self.home_score > self.away_score:
-                        self.log_event(f'Side retired. Game over.')
+                    if self.home_score_tenths > self.away_score_tenths:
+                        self.log_event(GameEvent.GAME_OVER)
                         self.log_score()
                         self.is_game_over = True
                     else:
                         self.half = InningHalf.BOTTOM
                         self.cur_base_runners = {}
                         self.cur_batting_team.runners_aboard = False
-                        self.log_event(f'Side retired. {self.half.name} of inning {self.inning}.')
+                        self.log_event(GameEvent.SIDE_RETIRED, value=self.inning, value2=self.half.value)
                         self.log_score()
                         self.refresh_game_status()
                         self.reset_inning_counts()
                     return
                 if self.half == InningHalf.BOTTOM:
-                    if self.home_score != self.away_score:
-                        self.log_event(f'Side retired. Game over.')
+                    if self.home_score_tenths != self.away_score_tenths:
+                        self.log_event(GameEvent.GAME_OVER)
                         self.log_score()
                         self.is_game_over = True
                     else:
@@ -1212,22 +1540,24 @@ class GameState(object):
                         self.inning += 1
                         self.cur_base_runners = {}
                         self.cur_batting_team.runners_aboard = False
-                        self.log_event(f'Side retired. {self.half.name} of inning {self.inning}.')
+                        self.log_event(GameEvent.SIDE_RETIRED, value=self.inning, value2=self.half.value)
                         self.log_score()
                         self.refresh_game_status()
                         self.reset_inning_counts()
 
-    def get_batting_team_score(self) -> Decimal:
+    def get_batting_team_score(self) -> int:
+        """The batting team's score in tenths of a run"""
         if self.inning == InningHalf.TOP:
-            return self.away_score
+            return self.away_score_tenths
         else:
-            return self.home_score
+            return self.home_score_tenths
 
-    def get_pitching_team_score(self) -> Decimal:
+    def get_pitching_team_score(self) -> int:
+        """The pitching team's score in tenths of a run"""
         if self.inning == InningHalf.TOP:
-            return self.home_score
+            return self.home_score_tenths
         else:
-            return self.away_score
+            return self.away_score_tenths
 
     @classmethod
     def gen_runner_fv(
@@ -0,0 +1,136 @@
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from common import RareEvent, TENTHS_PER_RUN
+from event_log import AWAY_SIDE, HOME_SIDE
+from game_state import GameState
+from sampling import derive_seed, IterationStreams, OutcomeTilt, Seed
+
+DEFAULT_RELATIVE_ERROR = 0.1
+DEFAULT_CHUNK_SIZE = 50
+DEFAULT_MAX_ITERATIONS = 5000
+# a relative error measured on only a few weighted hits is itself too noisy to stop on
+MIN_HITS = 10
+# the tilts of the side's outcomes tried on a pilot run when none is given, from plain sampling, best for an event
+# that isn't rare after all, up to a strong push toward the event
+TILT_CANDIDATES: Dict[RareEvent, List[float]] = {
+    RareEvent.SHUTOUT: [0.0, -0.2, -0.4, -0.6, -0.8],
+    RareEvent.OVER_TEN: [0.0, 0.15, 0.3, 0.45],
+    RareEvent.OVER_TWENTY: [0.0, 0.15, 0.3, 0.45],
+}
+PILOT_ITERATIONS = 50
+TARGET_HIT_RATE = 0.15
+# the odds key of each event, as summarize_simulations and WinProbabilityEngine.solve name them
+RARE_EVENT_KEYS: Dict[RareEvent, str] = {
+    RareEvent.SHUTOUT: "shutout",
+    RareEvent.OVER_TEN: "over_ten",
+    RareEvent.OVER_TWENTY: "over_twenty",
+}
+
+
+def event_happened(event: RareEvent, score_tenths: int) -> bool:
+    if event == RareEvent.SHUTOUT:
+        return score_tenths == 0
+    if event == RareEvent.OVER_TEN:
+        return score_tenths > 10 * TENTHS_PER_RUN
+    return score_tenths > 20 * TENTHS_PER_RUN
+
+
+class RareEventEstimate(object):
+    def __init__(self, game: GameState, side: int, event: RareEvent, seed: Seed, theta: float) -> None:
+        """ The chance of a rare final score for one side of a game by importance sampling.  The side bats under
+        an OutcomeTilt toward the event and every game that ends with it counts for its likelihood ratio, so the
+        mean of those weights over all the games is an unbiased estimate of the untilted chance, with the usual
+        standard error of a mean.  Iteration x rolls from derive_seed(seed, x). """
+        self.game = game
+        self.side = side
+        self.event = event
+        self.tilt = OutcomeTilt(theta)
+        self.streams = IterationStreams(seed)
+        # the likelihood ratio of each game that had the event, 0 for the others
+        self.weights: List[float] = []
+        self.hits = 0
+
+    @property
+    def iterations(self) -> int:
+        return len(self.weights)
+
+    def run(self, num_iterations: int) -> None:
+        self.game.set_outcome_tilt(self.side, self.tilt)
+        start = self.iterations
+        for x in range(start, start + num_iterations):
+            self.game.set_random_stream(self.streams.stream(x))
+            self.game.simulate_game()
+            score = self.game.home_score_tenths if self.side == HOME_SIDE else self.game.away_score_tenths
+            if event_happened(self.event, score):
+                self.weights.append(math.exp(self.game.log_likelihood_ratio))
+                self.hits += 1
+            else:
+                self.weights.append(0.0)
+            self.game.reset_game_state()
+        self.game.set_outcome_tilt(self.side, None)
+
+    def probability(self) -> float:
+        return float(np.mean(self.weights)) if self.weights else 0.0
+
+    def standard_error(self) -> float:
+        if self.iterations < 2:
+            return math.inf
+        return float(np.std(self.weights, ddof=1) / math.sqrt(self.iterations))
+
+    def relative_error(self) -> float:
+        probability = self.probability()
+        return self.standard_error() / probability if probability > 0.0 else math.inf
+
+
+def choose_tilt(game: GameState, side: int, event: RareEvent, seed: Seed,
+                pilot_iterations: int = PILOT_ITERATIONS) -> float:
+    """ Run a short pilot of the candidate tilts of the event, mildest first with candidate i under
+    derive_seed(seed, i), and return the first that has the event in at least TARGET_HIT_RATE of its games, or
+    the strongest.  A stronger tilt than that has more hits but more skewed weights, which makes both the
+    estimate and its measured error less reliable. """
+    candidates = TILT_CANDIDATES[event]
+    for idx, theta in enumerate(candidates):
+        pilot = RareEventEstimate(game, side, event, derive_seed(seed, idx), theta)
+        pilot.run(pilot_iterations)
+        if pilot.hits >= TARGET_HIT_RATE * pilot_iterations:
+            return theta
+    return candidates[-1]
+
+
+def estimate_rare_event(game: GameState, side: int, event: RareEvent, seed: Seed,
+                        relative_error: float = DEFAULT_RELATIVE_ERROR,
+                        max_iterations: int = DEFAULT_MAX_ITERATIONS, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        theta: Optional[float] = None) -> RareEventEstimate:
+    """ Sample a chunk of games at a time until the estimate's relative error is within relative_error.  Without
+    a theta the tilt is picked by choose_tilt and the estimate is sampled under derive_seed(seed, n), after the n
+    candidates' pilots.  The pilot games aren't reused, the chosen one was picked for its hits and would bias the
+    estimate up. """
+    if theta is None:
+        theta = choose_tilt(game, side, event, seed)
+        seed = derive_seed(seed, len(TILT_CANDIDATES[event]))
+    estimate = RareEventEstimate(game, side, event, seed, theta)
+    while estimate.iterations < max_iterations and \
+            (estimate.hits < MIN_HITS or estimate.relative_error() > relative_error):
+        estimate.run(min(chunk_size, max_iterations - estimate.iterations))
+    return estimate
+
+
+def estimate_rare_events(game: GameState, seed: Seed, relative_error: float = DEFAULT_RELATIVE_ERROR,
+                         max_iterations: int = DEFAULT_MAX_ITERATIONS) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """ Every rare event of both teams of a game, keyed like the odds.  Each is sampled on its own, the event of
+    side under derive_seed(seed, side, event). """
+    ret_val: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for team, side in [("home_team", HOME_SIDE), ("away_team", AWAY_SIDE)]:
+        ret_val[team] = {}
+        for event, key in RARE_EVENT_KEYS.items():
+            estimate = estimate_rare_event(game, side, event, derive_seed(seed, side, event.value), relative_error,
+                                           max_iterations)
+            ret_val[team][key] = {
+                "probability": estimate.probability(),
+                "relative_error": estimate.relative_error(),
+                "iterations": estimate.iterations,
+            }
+    return ret_val
@@ -0,0 +1,166 @@
+from typing import Any, Optional
+
+import numpy as np
+
+from common import InferenceBackend
+
+
+class CompiledModel(object):
+    def __init__(self, estimator: Any) -> None:
+        """ Base class for an sklearn classifier flattened into plain numpy arrays """
+        self.classes_ = np.asarray(estimator.classes_)
+        self.n_classes = len(self.classes_)
+        self.n_features = int(estimator.n_features_in_) if hasattr(estimator, "n_features_in_") else None
+
+    def _as_matrix(self, X: Any, dtype=np.float64) -> np.ndarray:
+        X = np.asarray(X, dtype=dtype)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self.n_features is not None and X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+        return X
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        raise NotImplementedError
+
+
+class CompiledLinearModel(CompiledModel):
+    def __init__(self, estimator: Any) -> None:
+        """ A LogisticRegression reduced to its coefficient matrix and intercepts """
+        super().__init__(estimator)
+        self.coef = np.ascontiguousarray(estimator.coef_, dtype=np.float64)
+        intercept = np.asarray(estimator.intercept_, dtype=np.float64)
+        if intercept.ndim == 0 or intercept.size == 1:
+            intercept = np.full(self.coef.shape[0], float(np.ravel(intercept)[0]) if intercept.size else 0.0)
+        self.intercept = intercept
+        self.softmax = self.n_classes > 2 and _uses_softmax(estimator, self)
+
+    def decision_function(self, X: Any) -> np.ndarray:
+        return self._as_matrix(X) @ self.coef.T + self.intercept
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        scores = self.decision_function(X)
+        if self.n_classes <= 2:
+            pos = _expit(scores[:, 0])
+            return np.column_stack((1.0 - pos, pos))
+        if self.softmax:
+            scores = scores - scores.max(axis=1, keepdims=True)
+            probs = np.exp(scores)
+        else:
+            # one vs rest: independent sigmoids renormalized to sum to 1
+            probs = _expit(scores)
+        probs /= probs.sum(axis=1, keepdims=True)
+        return probs
+
+
+class CompiledTreeEnsemble(CompiledModel):
+    def __init__(self, estimator: Any) -> None:
+        """ One or more decision trees packed into shared node arrays (feature, threshold, children, leaf
+        values) so every tree in the ensemble is walked at once """
+        super().__init__(estimator)
+        trees = estimator.estimators_ if hasattr(estimator, "estimators_") else [estimator]
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for tree in trees:
+            t = tree.tree_
+            if t.n_outputs != 1:
+                raise ValueError("Multi-output trees are not supported")
+            is_leaf = t.children_left == -1
+            node_ids = np.arange(t.node_count)
+            # leaves point back at themselves so a fixed number of steps can be taken for every row
+            lefts.append(np.where(is_leaf, node_ids, t.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, t.children_right) + offset)
+            features.append(np.where(is_leaf, 0, t.feature))
+            thresholds.append(np.where(is_leaf, np.inf, t.threshold))
+            value = _align_tree_classes(tree, t.value[:, 0, :], self.classes_)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+            roots.append(offset)
+            offset += t.node_count
+            max_depth = max(max_depth, t.max_depth)
+        self.feature = np.concatenate(features).astype(np.intp)
+        self.threshold = np.concatenate(thresholds).astype(np.float64)
+        self.children_left = np.concatenate(lefts).astype(np.intp)
+        self.children_right = np.concatenate(rights).astype(np.intp)
+        self.value = np.concatenate(values).astype(np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.max_depth = max_depth
+        self.n_trees = len(trees)
+
+    def apply(self, X: Any) -> np.ndarray:
+        """Leaf node index of every (row, tree) pair"""
+        # sklearn compares features as float32 against float64 thresholds
+        X = self._as_matrix(X, np.float32).astype(np.float64)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+        return nodes
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        return self.value[self.apply(X)].mean(axis=1)
+
+
+def _expit(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+# how many random rows a multiclass linear model is probed with, and how closely it must be reproduced on them
+PROBE_ROWS = 8
+PROBE_TOLERANCE = 1e-9
+
+
+def _uses_softmax(estimator: Any, compiled: CompiledLinearModel) -> bool:
+    """ Whether the estimator normalizes its class scores with softmax rather than one vs rest sigmoids.  sklearn
+    changed which it applies to multiclass liblinear models between versions, so probe rows are run through the
+    installed estimator, and a ValueError is raised when neither normalization reproduces its probabilities. """
+    probe = np.random.RandomState(0).uniform(-1.0, 1.0, size=(PROBE_ROWS, compiled.coef.shape[1]))
+    expected = np.asarray(estimator.predict_proba(probe))
+    scores = compiled.decision_function(probe)
+    softmax = np.exp(scores - scores.max(axis=1, keepdims=True))
+    softmax /= softmax.sum(axis=1, keepdims=True)
+    ovr = _expit(scores)
+    ovr /= ovr.sum(axis=1, keepdims=True)
+    if np.abs(expected - softmax).max() <= PROBE_TOLERANCE:
+        return True
+    if np.abs(expected - ovr).max() <= PROBE_TOLERANCE:
+        return False
+    raise ValueError("neither softmax nor one vs rest reproduces the estimator's probabilities")
+
+
+def _align_tree_classes(tree: Any, value: np.ndarray, classes: np.ndarray) -> np.ndarray:
+    tree_classes = getattr(tree, "classes_", classes)
+    if len(tree_classes) == len(classes) and np.all(tree_classes == classes):
+        return value
+    aligned = np.zeros((value.shape[0], len(classes)))
+    for i, c in enumerate(tree_classes):
+        aligned[:, int(np.searchsorted(classes, c))] = value[:, i]
+    return aligned
+
+
+def compile_model(estimator: Any) -> Optional[CompiledModel]:
+    """Flatten a fitted classifier into numpy arrays, or return None when the estimator type is not supported"""
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.tree import DecisionTreeClassifier
+
+    try:
+        if isinstance(estimator, LogisticRegression):
+            return CompiledLinearModel(estimator)
+        if isinstance(estimator, (DecisionTreeClassifier, RandomForestClassifier, ExtraTreesClassifier)):
+            return CompiledTreeEnsemble(estimator)
+    except ValueError:
+        return None
+    return None
+
+
+def build_model(estimator: Any, backend: InferenceBackend) -> Any:
+    """Wrap a loaded estimator for the requested backend, falling back to sklearn when it can't be compiled"""
+    if backend == InferenceBackend.NUMPY:
+        compiled = compile_model(estimator)
+        if compiled is not None:
+            return compiled
+    return estimator
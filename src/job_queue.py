@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from common import JobStatus
+from progress import Progress
+
+JOBS_DIR = os.path.join('..', 'season_sim', 'jobs')
+# the drivers keep their teams in module state, so by default jobs run one at a time
+DEFAULT_JOB_WORKERS = 1
+# a running job writes its progress to disk at most this often, in seconds
+SAVE_INTERVAL = 5.0
+
+JobRunner = Callable[[Dict[str, Any], Progress], Any]
+
+
+class Job(object):
+    def __init__(self, job_id: str, kind: str, params: Dict[str, Any]) -> None:
+        """ A simulation run in the background, with the parameters of the request that submitted it.  The status,
+        progress and the payload or error it finished with are kept on disk as JSON. """
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+        self.status = JobStatus.QUEUED
+        self.done = 0
+        self.total = 0
+        self.eta: Optional[float] = None
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.pid = os.getpid()
+        self.result: Any = None
+        self.error: Optional[str] = None
+
+    def summary(self) -> Dict[str, Any]:
+        """Everything about the job but its payload, for the status endpoint"""
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status.name,
+            "done": self.done,
+            "total": self.total,
+            "eta": self.eta,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "pid": self.pid,
+            "error": self.error,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        ret_val = self.summary()
+        ret_val["result"] = self.result
+        return ret_val
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> 'Job':
+        job = cls(raw["job_id"], raw["kind"], raw["params"])
+        job.status = JobStatus[raw["status"]]
+        job.done = raw["done"]
+        job.total = raw["total"]
+        job.eta = raw["eta"]
+        job.submitted = raw["submitted"]
+        job.started = raw["started"]
+        job.finished = raw["finished"]
+        job.pid = raw["pid"]
+        job.result = raw["result"]
+        job.error = raw["error"]
+        return job
+
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue(object):
+    def __init__(self, directory: str = JOBS_DIR, workers: int = DEFAULT_JOB_WORKERS) -> None:
+        """ Runs submitted jobs on a bounded pool of threads, each job with a runner registered for its kind.  Every
+        job is saved to directory as it changes, so its status and result can be read by any process and survive
+        a restart.  A job left queued or running by a process that is gone is marked failed when a queue opens
+        the directory, to be submitted again. """
+        self.directory = directory
+        self.workers = workers
+        self.runners: Dict[str, JobRunner] = {}
+        self.jobs: Dict[str, Job] = {}
+        self.futures: Dict[str, Future] = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(workers)
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+    def register(self, kind: str, runner: JobRunner) -> None:
+        """Run jobs of kind with runner(params, progress), which returns the job's JSON payload"""
+        self.runners[kind] = runner
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Job:
+        if kind not in self.runners:
+            raise ValueError(f"no runner for {kind} jobs")
+        job = Job(uuid.uuid4().hex, kind, params)
+        with self.lock:
+            self.jobs[job.job_id] = job
+        self._save(job)
+        self.futures[job.job_id] = self.executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """The job from this process, or as last saved by whichever process runs it"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is not None:
+            return job
+        return self._load(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """Block until a job this queue runs has finished"""
+        future = self.futures.get(job_id)
+        if future is not None:
+            future.result(timeout)
+        return self.get(job_id)
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+    def _run(self, job: Job) -> None:
+        job.status = JobStatus.RUNNING
+        job.started = time.time()
+        self._save(job)
+        last_save = [time.time()]
+
+        def on_update(progress: Progress) -> None:
+            job.done = progress.done
+            job.total = progress.total
+            job.eta = progress.eta()
+            if time.time() - last_save[0] >= SAVE_INTERVAL:
+                last_save[0] = time.time()
+                self._save(job)
+
+        try:
+            job.result = self.runners[job.kind](job.params, Progress(on_update))
+            job.status = JobStatus.DONE
+            job.done = job.total
+            job.eta = 0.0
+        except Exception:
+            job.status = JobStatus.FAILED
+            job.error = traceback.format_exc()
+        job.finished = time.time()
+        self._save(job)
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _save(self, job: Job) -> None:
+        # written whole then moved into place, so a reader never sees half a file
+        tmp_path = f"{self._path(job.job_id)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(job.to_dict(), file, default=str)
+        os.replace(tmp_path, self._path(job.job_id))
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        if not job_id.isalnum() or not os.path.exists(self._path(job_id)):
+            return None
+        with open(self._path(job_id), 'r') as file:
+            return Job.from_dict(json.load(file))
+
+    def _recover(self) -> None:
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json"):
+                continue
+            job = self._load(filename[:-len(".json")])
+            if job is None or job.status not in [JobStatus.QUEUED, JobStatus.RUNNING] or process_alive(job.pid):
+                continue
+            job.status = JobStatus.FAILED
+            job.error = "interrupted by a restart"
+            job.finished = time.time()
+            self._save(job)
@@ -0,0 +1,129 @@
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from common import MachineLearnedModel as Ml
+from game_state import GameState
+from prediction_cache import PredictionCache
+
+DEFAULT_LOCKSTEP_LANES = 32
+LOCKSTEP_CACHE_SIZE = 65536
+MAX_PREFETCH_INTERVAL = 64
+PITCH_MODELS = [Ml.PITCH, Ml.HIT_TYPE, Ml.OUT_TYPE]
+RUNNER_MODELS = [Ml.SB_ATTEMPT, Ml.SB_SUCCESS, Ml.RUNNER_ADV_HIT, Ml.RUNNER_ADV_OUT]
+
+
+class LockstepLane(object):
+    def __init__(self, game: GameState, source: GameState, iterations: int) -> None:
+        """ One copy of a game being advanced by the lockstep engine """
+        self.game = game
+        self.source = source
+        self.iterations = iterations
+        self.scores: List[Tuple[Decimal, Decimal]] = []
+        # what the lane last requested, so features are only rebuilt when the batter or runners change
+        self.last_batter: Optional[Tuple[str, str]] = None
+        self.last_runners: Optional[Tuple[str, ...]] = None
+
+
+class LockstepSimulation(object):
+    def __init__(
+        self,
+        games: List[GameState],
+        iterations: int = 1,
+        lanes: int = DEFAULT_LOCKSTEP_LANES,
+        prediction_cache: Optional[PredictionCache] = None,
+    ) -> None:
+        """ Advances many games one step at a time.  Before each step the feature rows every game is about to need
+        are scored together, one predict_proba call per model, so the games themselves only read cached
+        probabilities.  The game rules are GameState's own step logic.  Each game is played iterations times,
+        split across up to lanes copies of it.  All games must use the same model set. """
+        self.games = games
+        self.iterations = iterations
+        self.prediction_cache = prediction_cache if prediction_cache is not None \
+            else PredictionCache(LOCKSTEP_CACHE_SIZE)
+        self.lanes: List[LockstepLane] = []
+        for game in games:
+            game.prediction_cache = self.prediction_cache
+            num_lanes = max(1, min(lanes, iterations))
+            for lane_idx in range(num_lanes):
+                lane_iterations = iterations // num_lanes + (1 if lane_idx < iterations % num_lanes else 0)
+                lane_game = game if lane_idx == 0 else game.clone()
+                self.lanes.append(LockstepLane(lane_game, game, lane_iterations))
+        self.steps = 0
+        self.batches = 0
+        self.prefetch_interval = 1
+
+    def prefetch(self, lanes: List[LockstepLane]) -> int:
+        """Batch score the rows the lanes are about to need, returning how many were not already cached"""
+        features: Dict[Ml, List[List[float]]] = {}
+        clf = lanes[0].game.clf
+        for lane in lanes:
+            game = lane.game
+            batting, pitching = game.cur_batting_team, game.cur_pitching_team
+            batter = (batting.cur_batter, pitching.starting_pitcher)
+            if game.is_start_of_at_bat() or batter != lane.last_batter:
+                lane.last_batter = batter
+                pitch_fv = game.gen_pitch_fv(
+                    batting.get_cur_batter_feature_vector(),
+                    pitching.get_pitcher_feature_vector(),
+                    pitching.get_defense_feature_vector(),
+                    game.stadium.get_stadium_fv(),
+                )[0]
+                for model in PITCH_MODELS:
+                    features.setdefault(model, []).append(pitch_fv)
+            runners = tuple(game.cur_base_runners.values())
+            if runners != lane.last_runners:
+                lane.last_runners = runners
+                for runner_id in runners:
+                    runner_fv = game.gen_runner_fv(
+                        batting.get_runner_feature_vector(runner_id),
+                        pitching.get_defense_feature_vector(),
+                        pitching.get_pitcher_feature_vector(),
+                        game.stadium.get_stadium_fv(),
+                    )[0]
+                    for model in RUNNER_MODELS:
+                        features.setdefault(model, []).append(runner_fv)
+        num_scored = 0
+        for model, rows in features.items():
+            if model in clf:
+                num_rows = self.prediction_cache.prefetch(model, clf[model], rows)
+                if num_rows > 0:
+                    self.batches += 1
+                    num_scored += num_rows
+        return num_scored
+
+    def run(self) -> List[List[Tuple[Decimal, Decimal]]]:
+        """Play every game and return the (home score, away score) of each iteration, grouped by game"""
+        active = [lane for lane in self.lanes if lane.iterations > 0]
+        next_prefetch = 0
+        round_idx = 0
+        while len(active) > 0:
+            if round_idx >= next_prefetch:
+                # once the cache is warm most rounds find nothing new to score, so back off on building the
+                # feature rows and let the rare miss be scored on its own
+                if self.prefetch(active) > 0:
+                    self.prefetch_interval = 1
+                else:
+                    self.prefetch_interval = min(self.prefetch_interval * 2, MAX_PREFETCH_INTERVAL)
+                next_prefetch = round_idx + self.prefetch_interval
+            round_idx += 1
+            still_active = []
+            for lane in active:
+                game = lane.game
+                game.step()
+                self.steps += 1
+                if game.is_game_over:
+                    home_score, away_score, _ = game.finalize_game()
+                    lane.scores.append((home_score, away_score))
+                    game.reset_game_state()
+                    lane.last_batter, lane.last_runners = None, None
+                    if len(lane.scores) >= lane.iterations:
+                        continue
+                still_active.append(lane)
+            active = still_active
+        results: Dict[int, List[Tuple[Decimal, Decimal]]] = {id(game): [] for game in self.games}
+        for lane in self.lanes:
+            if lane.game is not lane.source:
+                lane.source.home_team.merge_stats(lane.game.home_team)
+                lane.source.away_team.merge_stats(lane.game.away_team)
+            results[id(lane.source)].extend(lane.scores)
+        return [results[id(game)] for game in self.games]
@@ -0,0 +1,97 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from common import MachineLearnedModel as Ml
+from common import PlayerBuff
+from team_state import TeamState
+
+MATCHUP_MODELS = [Ml.PITCH, Ml.HIT_TYPE, Ml.OUT_TYPE]
+
+
+class MatchupRow(object):
+    def __init__(self, signature: Tuple, probs: Dict[Ml, Any]) -> None:
+        """ The PITCH, HIT_TYPE and OUT_TYPE distributions of one batter against the opposing pitcher """
+        self.signature = signature
+        self.probs = probs
+
+
+class MatchupTable(object):
+    def __init__(self, clf: Dict[Ml, Any], stadium_fv: List[float]) -> None:
+        """ Per lineup slot outcome distributions for both teams of a game.  The stadium, starting pitchers and
+        defenses are fixed for a game, so a row only has to be rebuilt when the batter in the slot, the pitcher,
+        the day or the additives of either side change. """
+        self.clf = clf
+        self.stadium_fv = stadium_fv
+        self.rows: Dict[Tuple[bool, int], MatchupRow] = {}
+        self.hits = 0
+        self.builds = 0
+
+    @classmethod
+    def signature(cls, batting: TeamState, pitching: TeamState, batter_id: str) -> Tuple:
+        pitcher_id = pitching.starting_pitcher
+        return (
+            batter_id,
+            batting.additive_version,
+            batting.player_additive_versions.get(batter_id, 0),
+            batting.day,
+            pitcher_id,
+            pitching.additive_version,
+            pitching.player_additive_versions.get(pitcher_id, 0),
+            pitching.day,
+        )
+
+    @classmethod
+    def is_cacheable(cls, batting: TeamState, batter_id: str) -> bool:
+        # haunted batters draw a random feature vector on every pitch
+        return PlayerBuff.HAUNTED not in batting.player_buffs[batter_id]
+
+    def prepare(self, home_team: TeamState, away_team: TeamState) -> None:
+        """Build every stale row of both lineups with one batched call per model"""
+        pending: List[Tuple[Tuple[bool, int], Tuple, List[float]]] = []
+        for batting, pitching in [(home_team, away_team), (away_team, home_team)]:
+            for slot, batter_id in batting.lineup.items():
+                if not self.is_cacheable(batting, batter_id):
+                    continue
+                key = (batting.is_home, slot)
+                signature = self.signature(batting, pitching, batter_id)
+                row = self.rows.get(key)
+                if row is None or row.signature != signature:
+                    pending.append((key, signature, self.feature_vector(batting, pitching, batter_id)))
+        self._build_rows(pending)
+
+    def get_row(self, batting: TeamState, pitching: TeamState) -> Optional[MatchupRow]:
+        """Get the row for the current batter, rebuilding it if its inputs changed, or None if it can't be cached"""
+        batter_id = batting.cur_batter
+        if not self.is_cacheable(batting, batter_id):
+            return None
+        key = (batting.is_home, batting.cur_batter_pos)
+        signature = self.signature(batting, pitching, batter_id)
+        row = self.rows.get(key)
+        if row is not None and row.signature == signature:
+            self.hits += 1
+            return row
+        self._build_rows([(key, signature, self.feature_vector(batting, pitching, batter_id))])
+        return self.rows[key]
+
+    def feature_vector(self, batting: TeamState, pitching: TeamState, batter_id: str) -> List[float]:
+        ret_val = batting.get_batter_feature_vector(batter_id)
+        ret_val.extend(pitching.get_pitcher_feature_vector())
+        ret_val.extend(pitching.get_defense_feature_vector())
+        ret_val.extend(self.stadium_fv)
+        return ret_val
+
+    def _build_rows(self, pending: List[Tuple[Tuple[bool, int], Tuple, List[float]]]) -> None:
+        if len(pending) == 0:
+            return
+        features = [feature_vector for _, _, feature_vector in pending]
+        all_probs = {model: self.clf[model].predict_proba(features) for model in MATCHUP_MODELS}
+        for idx, (key, signature, _) in enumerate(pending):
+            self.rows[key] = MatchupRow(signature, {model: all_probs[model][idx] for model in MATCHUP_MODELS})
+        self.builds += len(pending)
+
+    def copy(self) -> 'MatchupTable':
+        table = MatchupTable(self.clf, self.stadium_fv)
+        table.rows = dict(self.rows)
+        return table
+
+    def invalidate(self) -> None:
+        self.rows = {}
@@ -0,0 +1,168 @@
+from typing import Any, Dict, List, Optional, Tuple
+from joblib import load
+
+import os
+import threading
+import time
+
+from common import InferenceBackend
+from common import MachineLearnedModel as Ml
+from inference import build_model
+
+
+model_file_prefix_map: Dict[Ml, str] = {
+    Ml.PITCH: "pitch",
+    Ml.HIT_TYPE: "hit_type",
+    Ml.RUNNER_ADV_OUT: "runner_advanced_on_out",
+    Ml.RUNNER_ADV_HIT: "extra_base_on_hit",
+    Ml.SB_ATTEMPT: "sba",
+    Ml.SB_SUCCESS: "sb_success",
+    Ml.OUT_TYPE: "out_type",
+}
+
+GAME_MODELS: List[Ml] = [
+    Ml.PITCH,
+    Ml.HIT_TYPE,
+    Ml.RUNNER_ADV_OUT,
+    Ml.RUNNER_ADV_HIT,
+    Ml.SB_ATTEMPT,
+    Ml.SB_SUCCESS,
+    Ml.OUT_TYPE,
+]
+EVAL_MODELS: List[Ml] = [Ml.PITCH, Ml.HIT_TYPE, Ml.OUT_TYPE]
+
+
+class ModelSet(object):
+    def __init__(
+        self,
+        name: str,
+        directory: str,
+        version: str,
+        models: Optional[List[Ml]] = None,
+        version_overrides: Optional[Dict[Ml, str]] = None,
+    ) -> None:
+        """ A versioned directory of joblib model artifacts, one file per model """
+        self.name = name
+        self.directory = directory
+        self.version = version
+        self.models: List[Ml] = models if models is not None else GAME_MODELS
+        self.version_overrides: Dict[Ml, str] = version_overrides if version_overrides is not None else {}
+
+    def get_version(self, model: Ml) -> str:
+        return self.version_overrides.get(model, self.version)
+
+    def get_path(self, model: Ml) -> str:
+        return os.path.join(self.directory, f"{model_file_prefix_map[model]}_{self.get_version(model)}.joblib")
+
+    def __repr__(self) -> str:
+        return f"ModelSet({self.name}, {self.directory}, {self.version})"
+
+
+CURRENT_MODEL_SET = ModelSet("current", os.path.join("..", "season_sim", "models"), "v6")
+OLD_MODEL_SET = ModelSet(
+    "s_14_backup",
+    os.path.join("..", "season_sim", "models", "s_14_backup"),
+    "v2",
+    version_overrides={Ml.PITCH: "v3"},
+)
+EVAL_MODEL_SET = ModelSet("eval", os.path.join("..", "season_sim", "models"), "v22", EVAL_MODELS)
+SHIPPED_MODEL_SET = ModelSet("shipped", os.path.join("..", "models"), "v0")
+
+
+def get_model_set(old_models: Optional[bool] = None) -> ModelSet:
+    """Map the legacy old_models flag onto a model set"""
+    if old_models == True:
+        return OLD_MODEL_SET
+    return CURRENT_MODEL_SET
+
+
+class ModelRegistry(object):
+    def __init__(self) -> None:
+        """ A process wide cache of loaded models.  Every artifact is loaded once and then shared read-only
+        between all of the GameState and Eval objects that ask for it. """
+        self._models: Dict[str, Any] = {}
+        self._built: Dict[Tuple[str, InferenceBackend], Any] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+        self.load_time = 0.0
+
+    def get_model(self, model_set: ModelSet, model: Ml) -> Any:
+        # artifacts are keyed on their resolved path so equivalent model sets share the same objects
+        cache_key = os.path.abspath(model_set.get_path(model))
+        clf = self._models.get(cache_key)
+        if clf is not None:
+            with self._lock:
+                self.hits += 1
+            return clf
+        with self._lock:
+            # another thread may have finished the load while we waited on the lock
+            clf = self._models.get(cache_key)
+            if clf is None:
+                t1 = time.time()
+                clf = load(model_set.get_path(model))
+                self.load_time += time.time() - t1
+                self.loads += 1
+                self._models[cache_key] = clf
+            else:
+                self.hits += 1
+        return clf
+
+    def get_backend_model(self, model_set: ModelSet, model: Ml, backend: InferenceBackend) -> Any:
+        """Get a classifier converted for an inference backend, building it on first use"""
+        if backend == InferenceBackend.SKLEARN:
+            return self.get_model(model_set, model)
+        cache_key = (os.path.abspath(model_set.get_path(model)), backend)
+        built = self._built.get(cache_key)
+        if built is None:
+            clf = self.get_model(model_set, model)
+            with self._lock:
+                built = self._built.get(cache_key)
+                if built is None:
+                    built = build_model(clf, backend)
+                    self._built[cache_key] = built
+        return built
+
+    def get_models(self, model_set: ModelSet, backend: InferenceBackend = InferenceBackend.SKLEARN) -> Dict[Ml, Any]:
+        """Get the classifiers for a model set, loading any that are not yet in memory"""
+        return {model: self.get_backend_model(model_set, model, backend) for model in model_set.models}
+
+    def warmup(
+        self,
+        model_sets: Optional[List[ModelSet]] = None,
+        backend: InferenceBackend = InferenceBackend.SKLEARN,
+    ) -> None:
+        """Eagerly load model sets so the first simulated game does not pay for the disk reads"""
+        if model_sets is None:
+            model_sets = [CURRENT_MODEL_SET]
+        for model_set in model_sets:
+            self.get_models(model_set, backend)
+
+    def unload(self, model_set: Optional[ModelSet] = None) -> None:
+        """Drop a model set from memory, or every model set when none is given"""
+        with self._lock:
+            if model_set is None:
+                self._models = {}
+                self._built = {}
+                return
+            for model in model_set.models:
+                path = os.path.abspath(model_set.get_path(model))
+                self._models.pop(path, None)
+                for backend in InferenceBackend:
+                    self._built.pop((path, backend), None)
+
+    def is_loaded(self, model_set: ModelSet) -> bool:
+        return all(os.path.abspath(model_set.get_path(model)) in self._models for model in model_set.models)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded_models": len(self._models),
+            "built_models": len(self._built),
+            "loaded_paths": sorted(self._models.keys()),
+            "loads": self.loads,
+            "hits": self.hits,
+            "load_time": self.load_time,
+        }
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,75 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from common import BlaseballStatistics as Stats
+from game_state import GameState
+from sampling import derive_seed, root_seed, Seed
+
+# what is recorded of each iteration, the batting stats of a side read from the opposing starter's line
+PAIRED_METRICS = ["home_win", "home_score", "away_score", "home_strikeouts", "away_strikeouts",
+                  "home_home_runs", "away_home_runs"]
+
+
+def _pitching_totals(game: GameState) -> List[float]:
+    return [game.away_team.stats_table.total(Stats.PITCHER_STRIKEOUTS),
+            game.home_team.stats_table.total(Stats.PITCHER_STRIKEOUTS),
+            game.away_team.stats_table.total(Stats.PITCHER_HRS_ALLOWED),
+            game.home_team.stats_table.total(Stats.PITCHER_HRS_ALLOWED)]
+
+
+class PairedSimulation(object):
+    def __init__(self, games: List[GameState], seed: Optional[Seed] = None) -> None:
+        """ Plays two or more set ups of a game, the scenarios, on common random numbers.  Iteration x of every
+        scenario rolls under derive_seed(seed, x), each plate appearance from its own stream of that, so the
+        scenarios differ only by their set up and their paired differences are much less noisy than the
+        difference of independent runs.  The first game is the baseline the others are compared to. """
+        self.games = games
+        self.seed = root_seed(seed)
+        self.samples: List[Dict[str, List[float]]] = [{metric: [] for metric in PAIRED_METRICS} for _ in games]
+
+    @property
+    def iterations(self) -> int:
+        return len(self.samples[0]["home_win"])
+
+    def run(self, iterations: int) -> None:
+        start = self.iterations
+        for x in range(start, start + iterations):
+            for game, samples in zip(self.games, self.samples):
+                game.set_common_random_numbers(derive_seed(self.seed, x))
+                before = _pitching_totals(game)
+                home_score, away_score, _ = game.simulate_game()
+                after = _pitching_totals(game)
+                samples["home_win"].append(1.0 if home_score > away_score else 0.0)
+                samples["home_score"].append(float(home_score))
+                samples["away_score"].append(float(away_score))
+                for metric, value in zip(PAIRED_METRICS[3:], np.subtract(after, before).tolist()):
+                    samples[metric].append(value)
+                game.reset_game_state()
+        for game in self.games:
+            game.set_common_random_numbers(None)
+
+    def summary(self) -> Dict[str, Any]:
+        """ The mean of each metric for each scenario, and for each scenario after the first its paired difference
+        from the first with the standard error of that difference.  The standard error two independent runs of the
+        same size would have is given alongside for comparison. """
+        n = self.iterations
+        arrays = [{metric: np.array(values) for metric, values in samples.items()} for samples in self.samples]
+        ret_val: Dict[str, Any] = {
+            "iterations": n,
+            "scenarios": [{metric: float(values.mean()) for metric, values in scenario.items()} for scenario in arrays],
+            "differences": [],
+        }
+        baseline = arrays[0]
+        for scenario in arrays[1:]:
+            differences = {}
+            for metric in PAIRED_METRICS:
+                paired = scenario[metric] - baseline[metric]
+                differences[metric] = {
+                    "mean": float(paired.mean()),
+                    "standard_error": float(paired.std(ddof=1) / np.sqrt(n)),
+                    "unpaired_standard_error": float(np.sqrt((scenario[metric].var(ddof=1) +
+                                                              baseline[metric].var(ddof=1)) / n)),
+                }
+            ret_val["differences"].append(differences)
+        return ret_val
@@ -0,0 +1,95 @@
+import multiprocessing
+import os
+from concurrent.futures import as_completed, ProcessPoolExecutor
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from adaptive_sim import AdaptiveGame
+from common import InferenceBackend, RandomSource
+from game_state import GameState
+from model_registry import model_registry, ModelSet
+from sampling import Seed
+from stats_table import StatsTable
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def pool_context() -> multiprocessing.context.BaseContext:
+    """ Fork where the platform has it, so workers start with the parent's loaded models and state already in
+    memory, shared copy on write, and spawn elsewhere """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+
+def warm_worker(model_sets: Optional[List[ModelSet]], inference_backend: InferenceBackend) -> None:
+    """Load the models once as a worker starts, a no-op for a forked worker that inherited them"""
+    if model_sets:
+        model_registry.warmup(model_sets, inference_backend)
+
+
+def run_longest_first(fn: Callable[..., Any], jobs: Sequence[Tuple], costs: Sequence[float],
+                      workers: Optional[int] = None, initializer: Optional[Callable[..., None]] = None,
+                      initargs: Tuple = (), on_done: Optional[Callable[[int], None]] = None) -> List[Any]:
+    """ Run fn(*job) for every job on a pool of worker processes and return the results in job order.  The jobs
+    are handed out by expected cost, longest first, so the workers that free up take the shorter ones and the
+    run doesn't wait on one long job started last.  on_done is called here with the index of each job that
+    finishes. """
+    order = sorted(range(len(jobs)), key=lambda idx: costs[idx], reverse=True)
+    with ProcessPoolExecutor(workers if workers is not None else default_workers(), mp_context=pool_context(),
+                             initializer=initializer, initargs=initargs) as executor:
+        futures = {idx: executor.submit(fn, *jobs[idx]) for idx in order}
+        if on_done is not None:
+            indices = {future: idx for idx, future in futures.items()}
+            for future in as_completed(indices):
+                on_done(indices[future])
+        return [futures[idx].result() for idx in range(len(jobs))]
+
+
+def play_chunk(game: GameState, seed: Seed, random_source: RandomSource, start: int,
+               num_iterations: int) -> Tuple[List[Decimal], List[Decimal], StatsTable, StatsTable]:
+    """Play iterations start to start + num_iterations of a game in a worker and return its scores and stats"""
+    chunk = AdaptiveGame(game, seed, random_source)
+    chunk.run(num_iterations, start)
+    return chunk.home_scores, chunk.away_scores, game.home_team.stats_table, game.away_team.stats_table
+
+
+class GamePool(object):
+    def __init__(self, workers: Optional[int] = None, inference_backend: InferenceBackend = InferenceBackend.SKLEARN,
+                 model_sets: Optional[List[ModelSet]] = None) -> None:
+        """ Worker processes that play chunks of iterations of AdaptiveGames.  The models of the games made before
+        the pool, and of model_sets, are loaded before the workers start, so forked workers hold them from the
+        start.  Every chunk plays on its own copy of the game at its start, from the same iteration streams the
+        game would use itself, and the chunk's stats are merged back into the game's teams.  Every iteration starts
+        from the teams as set up, see AdaptiveGame, so the results are the ones a serial run gets. """
+        self.workers = workers if workers is not None else default_workers()
+        warm_worker(model_sets, inference_backend)
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=pool_context(), initializer=warm_worker,
+                                            initargs=(model_sets, inference_backend))
+
+    def __enter__(self) -> 'GamePool':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+    def run_chunks(self, chunks: Sequence[Tuple[AdaptiveGame, int]]) -> None:
+        """Play the chunks at once, several chunks of one game taking its next iterations in the order given"""
+        queued: Dict[int, int] = {}
+        futures = []
+        for game, num_iterations in chunks:
+            start = game.iterations + queued.get(id(game), 0)
+            queued[id(game)] = queued.get(id(game), 0) + num_iterations
+            futures.append((game, self.executor.submit(play_chunk, game.start_copy(), game.seed,
+                                                       game.random_source, start, num_iterations)))
+        # the results are taken in submission order, so each game's chunks are recorded in iteration order
+        for game, future in futures:
+            home_scores, away_scores, home_stats, away_stats = future.result()
+            game.record(home_scores, away_scores)
+            game.game.home_team.stats_table.merge(home_stats)
+            game.game.away_team.stats_table.merge(away_stats)
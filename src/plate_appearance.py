@@ -0,0 +1,162 @@
+from bisect import bisect_right
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from common import PlateAppearanceOutcome as Pa
+
+# 0 = ball, 1 = strike_swinging, 2 = foul, 3 = in_play_hit, 4 = in_play_out, 5 = strike_looking
+BALL, STRIKE_SWINGING, FOUL, IN_PLAY_HIT, IN_PLAY_OUT, STRIKE_LOOKING = range(6)
+# per pitch counters tracked through the chain: pitches, balls thrown, strikes thrown, foul balls
+PITCHES, BALLS_THROWN, STRIKES_THROWN, FOUL_BALLS = range(4)
+
+
+class PlateAppearanceExit(object):
+    def __init__(self, outcome: Pa, balls: int, strikes: int, probability: float, pitch_counts: np.ndarray) -> None:
+        """ One way the count can end: the outcome, the count it ends on and the expected per pitch counters of
+        the counts that end this way """
+        self.outcome = outcome
+        self.balls = balls
+        self.strikes = strikes
+        self.probability = probability
+        self.pitches = float(pitch_counts[PITCHES])
+        self.balls_thrown = float(pitch_counts[BALLS_THROWN])
+        self.strikes_thrown = float(pitch_counts[STRIKES_THROWN])
+        self.foul_balls = float(pitch_counts[FOUL_BALLS])
+
+
+class PlateAppearanceChain(object):
+    def __init__(
+        self,
+        pitch_probs: List[float],
+        balls_for_walk: int,
+        strikes_for_out: int,
+        fiery_chance: float = 0.0,
+        flinch: bool = False,
+        steal_chance: float = 0.0,
+    ) -> None:
+        """ The count of a plate appearance as an absorbing Markov chain over (balls, strikes).  Each pitch moves
+        the count by the PITCH model distribution and the count rules of GameState.pitch_sim, including fiery
+        double strikes and flinch.  Between pitches a steal attempt interrupts the count with steal_chance, which
+        ends the chain with a STEAL_ATTEMPT exit on the count it was interrupted at. """
+        self.balls_for_walk = balls_for_walk
+        self.strikes_for_out = strikes_for_out
+        total = float(sum(pitch_probs))
+        probs = [float(prob) / total for prob in pitch_probs]
+        strike = probs[STRIKE_SWINGING] + probs[STRIKE_LOOKING]
+
+        states = [(balls, strikes) for balls in range(balls_for_walk) for strikes in range(strikes_for_out)]
+        self.index = {state: idx for idx, state in enumerate(states)}
+        num_states = len(states)
+        # every pitch as (from state, to state or exit, probability, counters of the pitch)
+        moves: List[Tuple[int, Tuple, float, Tuple[int, int, int, int]]] = []
+        for balls, strikes in states:
+            src = self.index[(balls, strikes)]
+            if balls + 1 == balls_for_walk:
+                moves.append((src, (Pa.WALK, balls + 1, strikes), probs[BALL], (1, 1, 0, 0)))
+            else:
+                moves.append((src, (balls + 1, strikes), probs[BALL], (1, 1, 0, 0)))
+            for num_strikes, chance in [(1, 1.0 - fiery_chance), (2, fiery_chance)]:
+                if strikes + num_strikes >= strikes_for_out:
+                    target = (Pa.STRIKEOUT, balls, strikes_for_out)
+                else:
+                    target = (balls, strikes + num_strikes)
+                moves.append((src, target, strike * chance, (1, 0, num_strikes, 0)))
+            if strikes < strikes_for_out - 2:
+                moves.append((src, (balls, strikes + 2), probs[FOUL] * fiery_chance, (1, 0, 0, 2)))
+                moves.append((src, (balls, strikes + 1), probs[FOUL] * (1.0 - fiery_chance), (1, 0, 0, 1)))
+            elif strikes < strikes_for_out - 1:
+                moves.append((src, (balls, strikes + 1), probs[FOUL], (1, 0, 0, 1)))
+            else:
+                moves.append((src, (balls, strikes), probs[FOUL], (1, 0, 0, 1)))
+            for pitch, outcome in [(IN_PLAY_HIT, Pa.HIT), (IN_PLAY_OUT, Pa.OUT)]:
+                if flinch and strikes == 0:
+                    moves.append((src, (balls, 1), probs[pitch], (1, 0, 1, 0)))
+                else:
+                    moves.append((src, (outcome, balls, strikes), probs[pitch], (1, 0, 0, 0)))
+        if steal_chance > 0.0:
+            # a pitch that leaves the count going is followed by the steal check of the next step
+            interrupted = []
+            for src, target, prob, counters in moves:
+                if target in self.index:
+                    interrupted.append((src, (Pa.STEAL_ATTEMPT,) + target, prob * steal_chance, counters))
+                    interrupted.append((src, target, prob * (1.0 - steal_chance), counters))
+                else:
+                    interrupted.append((src, target, prob, counters))
+            moves = interrupted
+
+        self.exit_keys: Dict[Tuple[Pa, int, int], int] = {}
+        for _, target, prob, _ in moves:
+            if target not in self.index and target not in self.exit_keys and prob > 0.0:
+                self.exit_keys[target] = len(self.exit_keys)
+        num_exits = len(self.exit_keys)
+        # transition probabilities between states and into exits, and the same weighted by the pitch counters
+        transitions = np.zeros((num_states, num_states))
+        self.exit_matrix = np.zeros((num_states, num_exits))
+        self.rewards = np.zeros((4, num_states, num_states))
+        self.exit_rewards = np.zeros((4, num_states, num_exits))
+        for src, target, prob, counters in moves:
+            if prob <= 0.0:
+                continue
+            if target in self.index:
+                dst = self.index[target]
+                transitions[src, dst] += prob
+                matrix = self.rewards
+            else:
+                dst = self.exit_keys[target]
+                self.exit_matrix[src, dst] += prob
+                matrix = self.exit_rewards
+            for counter, value in enumerate(counters):
+                if value:
+                    matrix[counter, src, dst] += prob * value
+        # expected visits to each state from each starting count, and the chance of reaching each exit from each
+        # state
+        self.visits = np.linalg.inv(np.eye(num_states) - transitions)
+        self.absorption = self.visits @ self.exit_matrix
+        self._exits: Dict[Tuple[int, int], Tuple[List[PlateAppearanceExit], List[float]]] = {}
+
+    def exits(self, balls: int = 0, strikes: int = 0) -> List[PlateAppearanceExit]:
+        """Every way the count can end from the given count"""
+        return self._get_exits(balls, strikes)[0]
+
+    def _get_exits(self, balls: int, strikes: int) -> Tuple[List[PlateAppearanceExit], List[float]]:
+        if (balls, strikes) in self._exits:
+            return self._exits[(balls, strikes)]
+        start_visits = self.visits[self.index[(balls, strikes)]]
+        probabilities = start_visits @ self.exit_matrix
+        # E[counters; exit] over every pitch before the last, plus the last pitch itself
+        joint = (start_visits @ self.rewards) @ self.absorption + start_visits @ self.exit_rewards
+        exits: List[PlateAppearanceExit] = []
+        for (outcome, end_balls, end_strikes), idx in self.exit_keys.items():
+            if probabilities[idx] <= 0.0:
+                continue
+            exits.append(PlateAppearanceExit(
+                outcome, end_balls, end_strikes, float(probabilities[idx]), joint[:, idx] / probabilities[idx]
+            ))
+        cumulative = list(np.cumsum([pa_exit.probability for pa_exit in exits]))
+        self._exits[(balls, strikes)] = (exits, cumulative)
+        return exits, cumulative
+
+    def outcome_probs(self, balls: int = 0, strikes: int = 0) -> Dict[Pa, float]:
+        """The chance of each way the count can end from the given count"""
+        ret_val = {outcome: 0.0 for outcome in Pa}
+        for pa_exit in self.exits(balls, strikes):
+            ret_val[pa_exit.outcome] += pa_exit.probability
+        return ret_val
+
+    def expected_pitches(self, balls: int = 0, strikes: int = 0) -> float:
+        return sum(pa_exit.probability * pa_exit.pitches for pa_exit in self.exits(balls, strikes))
+
+    def exit_probability(self, pa_exit: PlateAppearanceExit, balls: int = 0, strikes: int = 0) -> float:
+        """The chance from the given count of ending the way pa_exit, possibly of another chain, does"""
+        for own_exit in self.exits(balls, strikes):
+            if (own_exit.outcome, own_exit.balls, own_exit.strikes) == (pa_exit.outcome, pa_exit.balls,
+                                                                        pa_exit.strikes):
+                return own_exit.probability
+        return 0.0
+
+    def sample(self, roll: float, balls: int = 0, strikes: int = 0) -> PlateAppearanceExit:
+        """Pick how the count ends from a uniform roll"""
+        exits, cumulative = self._get_exits(balls, strikes)
+        idx = bisect_right(cumulative, roll * cumulative[-1])
+        return exits[min(idx, len(exits) - 1)]
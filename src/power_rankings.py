@@ -3,7 +3,7 @@ import os
 import random
 import time
 from decimal import Decimal
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 
 import requests
 from requests import Timeout
@@ -11,8 +11,13 @@ from requests import Timeout
 from common import enabled_player_buffs, blaseball_weather_pretty_print_map
 from common import ForbiddenKnowledge as FK
 from common import BlaseballStatistics as Stats, blood_name_map
-from common import BloodType, Team, blood_id_map, fk_key, PlayerBuff, Weather
+from common import BloodType, InferenceBackend, RandomSource, SimulationEngine, StatProfile, Team, blood_id_map, fk_key, PlayerBuff, Weather
 from game_state import GameState, InningHalf
+from lockstep_sim import DEFAULT_LOCKSTEP_LANES, LockstepSimulation
+from model_registry import model_registry
+from parallel_sim import run_longest_first
+from progress import Progress
+from sampling import derive_seed, IterationStreams, root_seed, RandomStream, Seed
 from stadium import Stadium
 from team_state import TeamState, DEF_ID, TEAM_ID
 
@@ -28,6 +33,11 @@ names_by_team: Dict[str, Dict[str, str]] = {}
 blood_by_team: Dict[str, Dict[str, BloodType]] = {}
 team_states: Dict[Team, TeamState] = {}
 starting_pitchers: Dict[str, str] = {}
+# seconds per iteration each matchup took on its last run, which orders the longest matchups first next time
+JOB_TIMES_PATH = os.path.join('..', 'season_sim', 'bprm', 'job_times.json')
+ALL_WEATHERS = [Weather.SUN2, Weather.ECLIPSE, Weather.BLOODDRAIN, Weather.PEANUTS, Weather.BIRD, Weather.FEEDBACK,
+                Weather.REVERB, Weather.BLACKHOLE, Weather.COFFEE, Weather.COFFEE2, Weather.COFFEE3,
+                Weather.FLOODING, Weather.SALMON, Weather.GLITTER]
 default_stadium: Stadium = Stadium(
     "team_id",
     "stadium_id",
@@ -218,8 +228,8 @@ def load_all_state(season: int):
         team_states[team] = team_state
 
 
-def pick_weather():
-    pick = random.randint(1, 1188)
+def pick_weather(rng: Optional[RandomStream] = None):
+    pick = int(rng.random() * 1188) + 1 if rng is not None else random.randint(1, 1188)
     if pick <= 226:
         return Weather.SALMON
     if pick <= 338:
@@ -250,7 +260,12 @@ def pick_weather():
         return Weather.GLITTER
 
 
-def run_single_bprm(team_id, o_team, iterations, all_weathers, count):
+def run_single_bprm(team_id, o_team, iterations, all_weathers, count, inference_backend=InferenceBackend.SKLEARN,
+                    engine=SimulationEngine.MONTE_CARLO, seed: Optional[Seed] = None,
+                    random_source: RandomSource = RandomSource.PSEUDO, states: Optional[Dict[str, TeamState]] = None):
+    """Play a matchup half at each team's park, with the team states of states or else the shared team_states"""
+    if states is None:
+        states = team_states
     pitchers = {team_id: [], o_team: []}
     results = {team_id: {"wins": 0, "losses": 0}, o_team: {"wins": 0, "losses": 0}}
     half = round(iterations / 2)
@@ -258,33 +273,90 @@ def run_single_bprm(team_id, o_team, iterations, all_weathers, count):
     t1 = round(time.time())
     print(f"{count} Running {iterations} sims of {team_id} vs {o_team}. st: {t1}")
 
-    home_team_state = team_states[team_id]
-    away_team_state = team_states[o_team]
+    home_team_state = states[team_id]
+    away_team_state = states[o_team]
     home_team_state.cur_pitcher_pos = 1
     away_team_state.cur_pitcher_pos = 1
     home_team_state.reset_team_state()
     away_team_state.reset_team_state()
-    run_iters(results, home_team_state, away_team_state, half, pitchers, all_weathers)
+    seed = root_seed(seed)
+    run_iters(results, home_team_state, away_team_state, half, pitchers, all_weathers, inference_backend, engine,
+              derive_seed(seed, 0), random_source)
 
-    away_team_state = team_states[team_id]
-    home_team_state = team_states[o_team]
-    run_iters(results, home_team_state, away_team_state, half, pitchers, all_weathers)
+    away_team_state = states[team_id]
+    home_team_state = states[o_team]
+    run_iters(results, home_team_state, away_team_state, half, pitchers, all_weathers, inference_backend, engine,
+              derive_seed(seed, 1), random_source)
 
     t2 = round(time.time())
     print(f"{team_id} vs {o_team} complete at {t2}. elapsed: {t2-t1}")
     return results, pitchers
 
 
-def run_iters(results, home_team, away_team, half, pitchers, all_weathers):
-    for day in range(half):
-        day = day % 99
+def init_bprm_worker(season: int, inference_backend: InferenceBackend) -> None:
+    """Set up a worker's team states, which a forked worker already has from the parent"""
+    if not team_states:
+        load_all_state(season)
+    model_registry.warmup(backend=inference_backend)
+
+
+def run_bprm_job(team_id, o_team, iterations, count, inference_backend, engine, seed, random_source) -> Tuple:
+    """ Play one matchup on its own copies of the two teams, returning its results and pitchers with the weathers
+    it picked and how long it took """
+    t1 = time.perf_counter()
+    states = {team_id: team_states[team_id].copy_for_game(), o_team: team_states[o_team].copy_for_game()}
+    weathers = {weather: 0 for weather in ALL_WEATHERS}
+    result, pitchers = run_single_bprm(team_id, o_team, iterations, weathers, count, inference_backend, engine, seed,
+                                       random_source, states)
+    return result, pitchers, weathers, time.perf_counter() - t1
+
+
+def job_key(team_id: str, o_team: str) -> str:
+    return f"{team_id}|{o_team}"
+
+
+def load_job_times() -> Dict[str, float]:
+    if not os.path.exists(JOB_TIMES_PATH):
+        return {}
+    with open(JOB_TIMES_PATH, 'r') as file:
+        return json.load(file)
+
+
+def record_bprm_result(results, home_team, away_team, home_score, away_score):
+    if home_score > away_score:
+        results[home_team.team_id]["wins"] += 1
+        results[away_team.team_id]["losses"] += 1
+    else:
+        results[away_team.team_id]["wins"] += 1
+        results[home_team.team_id]["losses"] += 1
+
+
+def run_lockstep_iters(results, home_team, away_team, games):
+    for game_sim, scores in zip(games, LockstepSimulation(games, 1).run()):
+        home_score, away_score = scores[0]
+        record_bprm_result(results, home_team, away_team, home_score, away_score)
+        home_team.merge_stats(game_sim.home_team)
+        away_team.merge_stats(game_sim.away_team)
+
+
+def run_iters(results, home_team, away_team, half, pitchers, all_weathers, inference_backend=InferenceBackend.SKLEARN,
+              engine=SimulationEngine.MONTE_CARLO, seed: Optional[Seed] = None,
+              random_source: RandomSource = RandomSource.PSEUDO):
+    seed = root_seed(seed)
+    # monte carlo games roll from the stream of random_source at (iteration, 1), the weather stays pseudo-random
+    streams = IterationStreams(seed, random_source)
+    lockstep_games = []
+    for iteration in range(half):
+        day = iteration % 99
+        # the weather and the game roll from separate streams under the iteration's seed
+        iteration_seed = derive_seed(seed, iteration)
 
         home_team.day = day
         away_team.day = day
         pitchers[home_team.team_id].append(home_team.player_names[home_team.starting_pitcher])
         pitchers[away_team.team_id].append(away_team.player_names[away_team.starting_pitcher])
 
-        weather = pick_weather()
+        weather = pick_weather(RandomStream(derive_seed(iteration_seed, 0)))
         if weather:
             all_weathers[weather] += 1
         else:
@@ -306,18 +378,28 @@ def run_iters(results, home_team, away_team, half, pitchers, all_weathers):
             balls=0,
             weather=weather,
             old_models=False,
+            inference_backend=inference_backend,
+            seed=derive_seed(iteration_seed, 1),
+            headless=True,
+            # the rankings only count wins and losses
+            stat_profile=StatProfile.WINS_ONLY,
         )
-        game_sim.simulate_game()
-        if game_sim.home_score > game_sim.away_score:
-            results[home_team.team_id]["wins"] += 1
-            results[away_team.team_id]["losses"] += 1
+        if engine == SimulationEngine.LOCKSTEP:
+            # every day is its own game, so each one gets a copy of the teams as they are set up for that day
+            lockstep_games.append(game_sim.clone())
+            if len(lockstep_games) >= DEFAULT_LOCKSTEP_LANES:
+                run_lockstep_iters(results, home_team, away_team, lockstep_games)
+                lockstep_games = []
         else:
-            results[away_team.team_id]["wins"] += 1
-            results[home_team.team_id]["losses"] += 1
+            game_sim.set_random_stream(streams.stream(iteration, 1))
+            game_sim.simulate_game()
+            record_bprm_result(results, home_team, away_team, game_sim.home_score, game_sim.away_score)
         home_team.next_pitcher()
         home_team.reset_team_state()
         away_team.next_pitcher()
         away_team.reset_team_state()
+    if len(lockstep_games) > 0:
+        run_lockstep_iters(results, home_team, away_team, lockstep_games)
 
 
 team_name_map: Dict[str, str] = {
@@ -348,29 +430,23 @@ team_name_map: Dict[str, str] = {
 }
 
 
-def run_sim(season, iterations):
+def run_sim(season, iterations, inference_backend=InferenceBackend.SKLEARN, engine=SimulationEngine.MONTE_CARLO,
+            seed: Optional[Seed] = None, random_source: RandomSource = RandomSource.PSEUDO,
+            workers: Optional[int] = None, progress: Optional[Progress] = None):
+    """ Play every matchup of matches.json, each on its own copies of the two teams.  With more than one worker
+    the matchups are spread over worker processes, longest first by the time they took on the last run, and the
+    results are put together in the same order a serial run makes them, so they are the same for any number of
+    workers. """
     t1 = round(time.time())
+    seed = root_seed(seed)
     with open(os.path.join('..', 'season_sim', 'bprm', 'matches.json'), 'r') as file:
         matchups = json.load(file)
     count = 0
     all_pitchers = {}
-    all_weathers = {
-        Weather.SUN2: 0,
-        Weather.ECLIPSE: 0,
-        Weather.BLOODDRAIN: 0,
-        Weather.PEANUTS: 0,
-        Weather.BIRD: 0,
-        Weather.FEEDBACK: 0,
-        Weather.REVERB: 0,
-        Weather.BLACKHOLE: 0,
-        Weather.COFFEE: 0,
-        Weather.COFFEE2: 0,
-        Weather.COFFEE3: 0,
-        Weather.FLOODING: 0,
-        Weather.SALMON: 0,
-        Weather.GLITTER: 0,
-    }
+    all_weathers = {weather: 0 for weather in ALL_WEATHERS}
     results = {}
+    jobs = []
+    job_names = []
     for team in matchups:
         team_id = team["team_id"]
         team_name = team["team_name"]
@@ -391,17 +467,42 @@ def run_sim(season, iterations):
             if already_run:
                 continue
             count += 1
-            result, pitchers = run_single_bprm(team_id, o_team, iterations, all_weathers, count)
-            all_pitchers[team_id].append(pitchers[team_id])
-            all_pitchers[o_team].append(pitchers[o_team])
-            results[team_name][o_team_name] = result
-            results[o_team_name][team_name] = result
+            jobs.append((team_id, o_team, iterations, count, inference_backend, engine, derive_seed(seed, count),
+                         random_source))
+            job_names.append((team_name, o_team_name))
+
+    job_times = load_job_times()
+    progress = progress or Progress()
+    progress.add_total(len(jobs) * iterations)
+    if workers is not None and workers > 1:
+        # a matchup not timed yet is taken to be as long as the slowest one that was
+        slowest = max(job_times.values(), default=1.0)
+        costs = [job_times.get(job_key(job[0], job[1]), slowest) for job in jobs]
+        outcomes = run_longest_first(run_bprm_job, jobs, costs, workers, init_bprm_worker, (season, inference_backend),
+                                     lambda _: progress.advance(iterations))
+    else:
+        # played the same way as on a worker, so the results don't depend on the number of workers
+        outcomes = []
+        for job in jobs:
+            outcomes.append(run_bprm_job(*job))
+            progress.advance(iterations)
+    for (team_id, o_team, *_), (team_name, o_team_name), (result, pitchers, weathers, elapsed) in \
+            zip(jobs, job_names, outcomes):
+        all_pitchers[team_id].append(pitchers[team_id])
+        all_pitchers[o_team].append(pitchers[o_team])
+        results[team_name][o_team_name] = result
+        results[o_team_name][team_name] = result
+        for weather, weather_count in weathers.items():
+            all_weathers[weather] += weather_count
+        job_times[job_key(team_id, o_team)] = elapsed / max(iterations, 1)
     with open(os.path.join('..', 'season_sim', 'bprm', f'{season}_{iterations}_iter_results.json'), 'w') as file:
         json.dump(results, file)
     with open(os.path.join('..', 'season_sim', 'bprm', f'{season}_{iterations}_iter_all_pitchers.json'), 'w') as file:
         json.dump(all_pitchers, file)
     with open(os.path.join('..', 'season_sim', 'bprm', 'weathers.json'), 'w') as file:
         json.dump(convert_keys(all_weathers), file)
+    with open(JOB_TIMES_PATH, 'w') as file:
+        json.dump(job_times, file)
     t2 = round(time.time())
     print(f"finished run in {round(t2-t1)} seconds. {count} total team v team sims.")
 
@@ -443,13 +544,17 @@ def convert_keys(obj, convert=str):
     return ret_dict
 
 
-def run_power_ranking_sim(season, iterations):
+def run_power_ranking_sim(season, iterations, inference_backend=InferenceBackend.SKLEARN,
+                          engine=SimulationEngine.MONTE_CARLO, seed: Optional[Seed] = None,
+                          random_source: RandomSource = RandomSource.PSEUDO, workers: Optional[int] = None,
+                          progress: Optional[Progress] = None):
     print(f"running power rank sim with {iterations} iterations.")
     t1 = round(time.time())
     load_all_state(season)
+    model_registry.warmup(backend=inference_backend)
     t2 = round(time.time())
     print(f"State set up complete in {t2 - t1}")
-    run_sim(season, iterations)
+    run_sim(season, iterations, inference_backend, engine, seed, random_source, workers, progress)
     team_id_name_map: Dict[str, str] = {
             "lovers": "b72f3061-f573-40d7-832a-5ad475bd7909",
             "tacos": "878c1bf6-0d21-4659-bfee-916c8314d69c",
@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from common import MachineLearnedModel as Ml
+
+DEFAULT_PREDICTION_CACHE_SIZE = 4096
+
+
+class PredictionCache(object):
+    def __init__(self, max_size: int = DEFAULT_PREDICTION_CACHE_SIZE, precision: Optional[int] = None) -> None:
+        """ A bounded LRU cache of model outcome probabilities keyed on the feature vector.  With no precision
+        the key is the exact feature vector, otherwise features are rounded to that many decimal places first.
+        A cache must only be shared between games that use the same model set. """
+        self.max_size = max_size
+        self.precision = precision
+        self._probs: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.prefetched = 0
+
+    def make_key(self, model: Ml, feature_vector: List[List[float]]) -> Tuple[Ml, Tuple[float, ...]]:
+        features = feature_vector[0]
+        if self.precision is not None:
+            return model, tuple(round(feature, self.precision) for feature in features)
+        return model, tuple(features)
+
+    def get_probs(self, model: Ml, clf: Any, feature_vector: List[List[float]]) -> List[float]:
+        """Get the outcome probabilities for a feature vector, only running the model on a miss"""
+        key = self.make_key(model, feature_vector)
+        probs = self._probs.get(key)
+        if probs is not None:
+            self.hits += 1
+            self._probs.move_to_end(key)
+            return probs
+        self.misses += 1
+        if self.precision is not None:
+            feature_vector = [list(key[1])]
+        probs = clf.predict_proba(feature_vector)[0]
+        self._probs[key] = probs
+        if len(self._probs) > self.max_size:
+            self._probs.popitem(last=False)
+            self.evictions += 1
+        return probs
+
+    def prefetch(self, model: Ml, clf: Any, features: List[List[float]]) -> int:
+        """Score every feature row that is not already cached with a single batched predict_proba call"""
+        missing: Dict[Tuple[Ml, Tuple[float, ...]], List[float]] = {}
+        for row in features:
+            key = self.make_key(model, [row])
+            if key not in self._probs and key not in missing:
+                missing[key] = list(key[1]) if self.precision is not None else row
+        if len(missing) == 0:
+            return 0
+        all_probs = clf.predict_proba(list(missing.values()))
+        for key, probs in zip(missing.keys(), all_probs):
+            self._probs[key] = probs
+        while len(self._probs) > self.max_size:
+            self._probs.popitem(last=False)
+            self.evictions += 1
+        self.prefetched += len(missing)
+        return len(missing)
+
+    def clear(self) -> None:
+        self._probs.clear()
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._probs),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "prefetched": self.prefetched,
+            "hit_rate": self.hit_rate(),
+        }
+
+    def __len__(self) -> int:
+        return len(self._probs)
@@ -0,0 +1,31 @@
+import time
+from typing import Callable, Optional
+
+
+class Progress(object):
+    def __init__(self, on_update: Optional[Callable[['Progress'], None]] = None) -> None:
+        """ How many of a run's games are done out of how many it will play.  The drivers add to the total as
+        they learn it and advance as games finish, and on_update, when given, is called after every change. """
+        self.on_update = on_update
+        self.done = 0
+        self.total = 0
+        self.started = time.time()
+
+    def add_total(self, num_games: int) -> None:
+        self.total += num_games
+        self._updated()
+
+    def advance(self, num_games: int = 1) -> None:
+        self.done += num_games
+        self._updated()
+
+    def eta(self) -> Optional[float]:
+        """Seconds left at the pace so far, None until a game is done"""
+        if self.done == 0:
+            return None
+        elapsed = time.time() - self.started
+        return max(0.0, elapsed * (self.total - self.done) / self.done)
+
+    def _updated(self) -> None:
+        if self.on_update is not None:
+            self.on_update(self)
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from job_queue import process_alive
+from model_registry import get_model_set, ModelSet
+
+DATA_DIR = os.path.join('..', 'season_sim')
+CACHE_DIR = os.path.join(DATA_DIR, 'cache')
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# how often, in seconds, a request waiting on another process's run of the same inputs checks if it is done
+LOCK_POLL_INTERVAL = 1.0
+# request parameters that change how a run is spread over processes, or whether it is cached, but not its result
+UNKEYED_PARAMS = frozenset(['workers', 'cache'])
+
+
+def season_input_files(data_dir: str, params: Dict[str, Any]) -> List[str]:
+    season = int(params['season'])
+    schedule = os.path.join(data_dir, 'season_data', f"season{season + 1}.json")
+    if params.get('future', True):
+        stlats = [os.path.join(data_dir, 'stlats', f"s{season}_preseason_stlats.json")]
+    else:
+        stlats = [os.path.join(data_dir, 'stlats', f"s{season}_d{day}_stlats.json") for day in range(0, 99)]
+    return stlats + [schedule]
+
+
+def power_ranking_input_files(data_dir: str, params: Dict[str, Any]) -> List[str]:
+    return [os.path.join(data_dir, 'stlats', f"bprm_s{int(params['season'])}_stlats.json"),
+            os.path.join(data_dir, 'bprm', 'matches.json')]
+
+
+# the files under the data directory each endpoint's runs read their players and schedule from, a daily run's
+# inputs are fetched live instead, see live_data_version
+INPUT_FILES: Dict[str, Callable[[str, Dict[str, Any]], List[str]]] = {
+    'seasonsim': season_input_files,
+    'fullseasonsim': season_input_files,
+    'powerrankings': power_ranking_input_files,
+}
+
+
+def data_version(endpoint: str, params: Dict[str, Any], data_dir: str = DATA_DIR) -> Optional[str]:
+    """ A hash of the contents of the stlats and schedule files a run of endpoint reads, None when any is missing
+    since then what the run plays is only known once it fetches them """
+    files = INPUT_FILES[endpoint](data_dir, params)
+    if not files or not all(os.path.exists(filename) for filename in files):
+        return None
+    digest = hashlib.sha256()
+    for filename in files:
+        digest.update(os.path.basename(filename).encode('utf8'))
+        with open(filename, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def live_data_version(live_data: Any) -> str:
+    """A hash of inputs a run fetched before it starts, like the day's games of a daily run"""
+    raw = json.dumps(live_data, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf8')).hexdigest()
+
+
+def model_version(model_set: Optional[ModelSet] = None) -> str:
+    model_set = model_set if model_set is not None else get_model_set()
+    versions = ",".join(f"{model.name}={model_set.get_version(model)}" for model in model_set.models)
+    return f"{model_set.name}:{versions}"
+
+
+class ResultCache(object):
+    def __init__(self, directory: str = CACHE_DIR, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES, data_dir: str = DATA_DIR) -> None:
+        """ The payloads of simulation requests on disk, one JSON file per key.  A key is the hash of the endpoint,
+        its parameters and seed, the data version of its input files and the model version.  Entries older than
+        ttl seconds are misses, and the least recently used are deleted while the cache is over max_bytes.  A
+        request for a key being computed waits for that run instead of starting its own, in this process through
+        a shared future and across processes through a lock file. """
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.data_dir = data_dir
+        self.lock = threading.Lock()
+        self.in_flight: Dict[str, Future] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(endpoint: str, params: Dict[str, Any], data: str, models: str) -> str:
+        keyed_params = {name: value for name, value in params.items() if name not in UNKEYED_PARAMS}
+        raw = json.dumps([endpoint, keyed_params, params.get('seed'), data, models], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _lock_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.lock")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The entry of key, as {"payload": ...}, or None when it is missing or expired"""
+        path = self._path(key)
+        try:
+            # an entry's modified time is when it was written, its access time when it was last used
+            written = os.stat(path).st_mtime
+            if time.time() - written > self.ttl:
+                self._remove(path)
+                return None
+            with open(path, 'r') as file:
+                entry = json.load(file)
+            os.utime(path, (time.time(), written))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return entry
+
+    def put(self, key: str, payload: Any) -> None:
+        tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump({"created": time.time(), "payload": payload}, file, default=str)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete expired entries, then the least recently used until the cache fits in max_bytes"""
+        entries = []
+        now = time.time()
+        for filename in os.listdir(self.directory):
+            if not filename.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                self._remove(path)
+            else:
+                entries.append((max(stat.st_atime, stat.st_mtime), stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def get_or_compute(self, endpoint: str, params: Dict[str, Any], compute: Callable[[], Any],
+                       live_data: Any = None) -> Any:
+        """ The cached payload of a request, or compute() stored under its key.  The data version is the hash of
+        live_data when given, else of the endpoint's input files.  Requests whose input files aren't on disk yet,
+        or with cache set to false, are computed without the cache. """
+        if live_data is not None:
+            data: Optional[str] = live_data_version(live_data)
+        else:
+            data = data_version(endpoint, params, self.data_dir)
+        if data is None or not params.get('cache', True):
+            return compute()
+        key = self.key(endpoint, params, data, model_version())
+        with self.lock:
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self.in_flight[key] = future
+        if not leader:
+            return future.result()
+        try:
+            payload = self._compute_once(key, compute)
+            future.set_result(payload)
+            return payload
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+
+    def _compute_once(self, key: str, compute: Callable[[], Any]) -> Any:
+        while True:
+            entry = self.get(key)
+            if entry is not None:
+                return entry["payload"]
+            if self._acquire(key):
+                break
+            time.sleep(LOCK_POLL_INTERVAL)
+        try:
+            # another process may have finished between the miss and taking the lock
+            entry = self.get(key)
+            if entry is not None:
+                return entry["payload"]
+            payload = compute()
+            # a run that gave up, like a daily sim that couldn't reach the sim data, is tried again next time
+            if payload is not None:
+                self.put(key, payload)
+            return payload
+        finally:
+            self._remove(self._lock_path(key))
+
+    def _acquire(self, key: str) -> bool:
+        """Take the lock file of key, breaking it when the process that took it is gone"""
+        lock_path = self._lock_path(key)
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                with open(lock_path, 'r') as file:
+                    pid = int(file.read() or 0)
+            except (FileNotFoundError, ValueError):
+                return False
+            if pid and not process_alive(pid):
+                self._remove(lock_path)
+            return False
+        with os.fdopen(fd, 'w') as file:
+            file.write(str(os.getpid()))
+        return True
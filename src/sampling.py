@@ -0,0 +1,174 @@
+import math
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from scipy.stats import qmc
+
+from common import MachineLearnedModel as Ml
+from common import RandomSource
+
+DEFAULT_BLOCK_SIZE = 4096
+# a step on common random numbers only takes a few rolls before its stream is replaced
+COMMON_BLOCK_SIZE = 16
+# a game takes around 400 to 750 rolls, so this covers all but the longest with the Sobol point
+SOBOL_DIMENSIONS = 1024
+# the Sobol points are drawn in powers of two, which keeps their balance, starting from this many
+SOBOL_MIN_POINTS = 64
+# the largest roll below 1, so an antithetic roll stays in [0, 1)
+MAX_ROLL = float(np.nextafter(1.0, 0.0))
+
+# how far a tilt of 1 pushes each outcome toward runs for the batting side, in the order the models roll them
+TILT_SCORES: Dict[Ml, List[float]] = {
+    # ball, strike swinging, foul, in play hit, in play out, strike looking
+    Ml.PITCH: [0.5, -1.0, 0.0, 1.0, -1.0, -1.0],
+    # single, double, triple, home run
+    Ml.HIT_TYPE: [0.0, 1.0, 2.0, 3.0],
+}
+
+Seed = Union[int, np.random.SeedSequence]
+
+
+def root_seed(seed: Optional[Seed] = None) -> np.random.SeedSequence:
+    """The root seed of a run, fresh entropy when no seed is given"""
+    return seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+
+
+def derive_seed(root: Seed, *key: int) -> np.random.SeedSequence:
+    """The seed of the child stream at key under root.  A key always derives the same stream no matter which
+    other streams were made first, so work split across games, iterations or processes replays identically."""
+    root = root_seed(root)
+    return np.random.SeedSequence(root.entropy, spawn_key=tuple(root.spawn_key) + tuple(key))
+
+
+class RandomStream(object):
+    def __init__(self, seed: Optional[Seed] = None, block_size: int = DEFAULT_BLOCK_SIZE, antithetic: bool = False,
+                 prefix: Optional[np.ndarray] = None) -> None:
+        """ Uniform rolls for one game, drawn from its own NumPy Generator a block at a time so a single roll is
+        a list lookup.  Categorical outcomes are sampled by a search of the cumulative probabilities, scaled by
+        their total so a distribution that sums to slightly less than 1 still always picks an outcome.
+
+        An antithetic stream rolls 1 - u for every roll u of the plain stream of the same seed.  The rolls of
+        prefix, a quasi-random point, are used up before any are drawn from the generator. """
+        self.seed_sequence = root_seed(seed)
+        self.generator = np.random.default_rng(self.seed_sequence)
+        self.block_size = block_size
+        self.antithetic = antithetic
+        self._block: List[float] = [] if prefix is None else prefix.tolist()
+        self._pos = 0
+
+    def _refill(self) -> None:
+        rolls = self.generator.random(self.block_size)
+        if self.antithetic:
+            rolls = np.minimum(1.0 - rolls, MAX_ROLL)
+        self._block = rolls.tolist()
+        self._pos = 0
+
+    def random(self) -> float:
+        """A uniform roll in [0, 1)"""
+        if self._pos >= len(self._block):
+            self._refill()
+        roll = self._block[self._pos]
+        self._pos += 1
+        return roll
+
+    def uniforms(self, size: int) -> np.ndarray:
+        """size uniform rolls, taken from the current block first so the stream stays in order"""
+        ret_val = np.empty(size)
+        filled = 0
+        while filled < size:
+            if self._pos >= len(self._block):
+                self._refill()
+            num_rolls = min(size - filled, len(self._block) - self._pos)
+            ret_val[filled:filled + num_rolls] = self._block[self._pos:self._pos + num_rolls]
+            self._pos += num_rolls
+            filled += num_rolls
+        return ret_val
+
+    def choice(self, probs: Any) -> int:
+        """Sample the index of one outcome from its probabilities"""
+        # summing python floats is much faster than iterating numpy scalars
+        if isinstance(probs, np.ndarray):
+            probs = probs.tolist()
+        cumulative = list(accumulate(probs))
+        idx = bisect_right(cumulative, self.random() * cumulative[-1])
+        # a roll can only land past the end through rounding in the scaled roll
+        return min(idx, len(cumulative) - 1)
+
+    def choices(self, probs: np.ndarray) -> np.ndarray:
+        """Sample one outcome index for each row of a [rows, outcomes] probability matrix"""
+        cumulative = np.cumsum(probs, axis=1)
+        rolls = self.uniforms(cumulative.shape[0]) * cumulative[:, -1]
+        idx = (cumulative <= rolls[:, None]).sum(axis=1)
+        return np.minimum(idx, cumulative.shape[1] - 1)
+
+    def reseed(self, seed: Seed) -> None:
+        """Restart the stream from seed in place, so everything holding it rolls from the new stream"""
+        self.seed_sequence = root_seed(seed)
+        self.generator = np.random.default_rng(self.seed_sequence)
+        self._block = []
+        self._pos = 0
+
+    def child(self, *key: int) -> 'RandomStream':
+        """The independent stream at key under this one, see derive_seed"""
+        return RandomStream(derive_seed(self.seed_sequence, *key), self.block_size, self.antithetic)
+
+    def spawn(self) -> 'RandomStream':
+        """The next independent stream under this one, for a copy of the game.  Spawned streams take the keys
+        0, 1, 2, ... in order, so they don't depend on how many rolls this stream has used."""
+        return RandomStream(self.seed_sequence.spawn(1)[0], self.block_size, self.antithetic)
+
+
+class IterationStreams(object):
+    def __init__(self, seed: Seed, source: RandomSource = RandomSource.PSEUDO,
+                 dimensions: int = SOBOL_DIMENSIONS) -> None:
+        """ The random stream of each iteration of a Monte Carlo run.  Plain pseudo-random iterations roll from
+        derive_seed(seed, x, *key), the same streams the drivers have always used.  Antithetic iterations come in
+        pairs, the odd one rolling 1 - u of its even partner's stream, so the pair's errors partly cancel.  Sobol
+        iterations take their first dimensions rolls from point x of a scrambled Sobol sequence, which spreads
+        the early rolls of a run evenly over the unit cube, and the rest from their pseudo-random stream. """
+        self.seed = root_seed(seed)
+        self.source = source
+        self.dimensions = dimensions
+        self._sobol: Optional[qmc.Sobol] = None
+        self._points = np.empty((0, dimensions))
+
+    def _sobol_point(self, x: int) -> np.ndarray:
+        if self._sobol is None:
+            # the scrambling rolls from the root seed itself, whose stream no iteration uses
+            self._sobol = qmc.Sobol(self.dimensions, scramble=True, rng=np.random.default_rng(self.seed))
+        while x >= len(self._points):
+            num_points = max(SOBOL_MIN_POINTS, len(self._points))
+            self._points = np.concatenate([self._points, self._sobol.random(num_points)])
+        return self._points[x]
+
+    def stream(self, x: int, *key: int) -> RandomStream:
+        """The stream of iteration x, or of its child at key when the iteration rolls from several"""
+        if self.source == RandomSource.ANTITHETIC:
+            return RandomStream(derive_seed(self.seed, x - x % 2, *key), antithetic=x % 2 == 1)
+        if self.source == RandomSource.SOBOL:
+            return RandomStream(derive_seed(self.seed, x, *key), prefix=self._sobol_point(x))
+        return RandomStream(derive_seed(self.seed, x, *key))
+
+
+class OutcomeTilt(object):
+    def __init__(self, theta: float) -> None:
+        """ An exponential tilt of the PITCH and HIT_TYPE outcomes for importance sampling.  Outcome k of
+        probability p_k is rolled with probability q_k, proportional to p_k * exp(theta * TILT_SCORES[k]), so a
+        positive theta makes big innings more likely and a negative one shutouts.  Each tilted roll returns
+        log(p_k / q_k), and the sum of those over a game is the log likelihood ratio that reweights it. """
+        self.theta = theta
+        self.factors = {model: [math.exp(theta * score) for score in scores] for model, scores in TILT_SCORES.items()}
+        self.log_factors = {model: [theta * score for score in scores] for model, scores in TILT_SCORES.items()}
+
+    def tilt(self, model: Ml, probs: Any) -> Tuple[List[float], List[float]]:
+        """The tilted probabilities of a model's outcomes and the log likelihood ratio of each"""
+        if isinstance(probs, np.ndarray):
+            probs = probs.tolist()
+        total = sum(probs)
+        weighted = [prob * factor for prob, factor in zip(probs, self.factors[model])]
+        normalizer = sum(weighted) / total
+        log_normalizer = math.log(normalizer)
+        return [prob / normalizer for prob in weighted], [log_normalizer - log_factor
+                                                          for log_factor in self.log_factors[model]]
@@ -1,7 +1,7 @@
 import re
 from decimal import Decimal
 from os import path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Optional
 import os
 import json
 import time
@@ -9,11 +9,16 @@ import time
 from common import get_stlats_for_season, blood_name_map, PlayerBuff, enabled_player_buffs, convert_keys
 from common import BlaseballStatistics as Stats
 from common import ForbiddenKnowledge as FK
-from common import BloodType, Team, team_id_map, blood_id_map, fk_key, Weather, team_name_map
+from common import BloodType, InferenceBackend, RandomSource, SimulationEngine, Team, team_id_map, blood_id_map, fk_key, Weather, team_name_map
 from daily_sim import retry_request
 from stadium import Stadium
 from team_state import TeamState, DEF_ID, TEAM_ID
 from game_state import GameState, InningHalf
+from lockstep_sim import LockstepSimulation
+from model_registry import model_registry
+from parallel_sim import run_longest_first
+from progress import Progress
+from sampling import derive_seed, IterationStreams, root_seed, Seed
 
 lineups_by_team: Dict[str, Dict[int, str]] = {}
 stlats_by_team: Dict[str, Dict[str, Dict[FK, float]]] = {}
@@ -47,13 +52,46 @@ day_rotations = {}
 stadiums = {}
 
 
-def setup_season(season:int, stats_segment_size:int, iterations:int, s_day:int, file_id:str):
-    with open(os.path.join('..', 'season_sim', 'season_data', f"season{season + 1}.json"), 'r', encoding='utf8') as json_file:
-        raw_season_data = json.load(json_file)
+def record_game_result(team_records, game_state: GameState, game, home_wins: int, away_wins: int):
+    home_team, away_team = game["homeTeam"], game["awayTeam"]
+    home_win = home_wins > away_wins
+    away_win = home_wins < away_wins
+    team_records[home_team]["days"].append({
+        "pitcher": game_state.home_team.player_names[game_state.home_team.starting_pitcher],
+        "opponent": game["awayTeamName"],
+        "opponent_pitcher": game_state.away_team.player_names[game_state.away_team.starting_pitcher],
+        "weather": game["weather"],
+        "win": home_win
+    })
+    team_records[away_team]["days"].append({
+        "pitcher": game_state.away_team.player_names[game_state.away_team.starting_pitcher],
+        "opponent": game["homeTeamName"],
+        "opponent_pitcher": game_state.home_team.player_names[game_state.home_team.starting_pitcher],
+        "weather": game["weather"],
+        "win": away_win
+    })
+    if home_win:
+        team_records[home_team]["wins"] += 1
+        team_records[away_team]["losses"] += 1
+    else:
+        team_records[away_team]["wins"] += 1
+        team_records[home_team]["losses"] += 1
+
+
+def setup_season(season:int, stats_segment_size:int, iterations:int, s_day:int, file_id:str,
+                 inference_backend: InferenceBackend = InferenceBackend.SKLEARN,
+                 engine: SimulationEngine = SimulationEngine.MONTE_CARLO, seed: Optional[Seed] = None,
+                 random_source: RandomSource = RandomSource.PSEUDO, progress: Optional[Progress] = None):
+    seed = root_seed(seed)
+    raw_season_data = load_season_data(season)
+    progress = progress or Progress()
+    progress.add_total(iterations * games_on_day(raw_season_data, s_day))
     failed = 0
     team_records = {}
     last_day = 0
-    for game in raw_season_data:
+    # with the lockstep engine the whole day's games are simulated together once they are all set up
+    lockstep_games = []
+    for game_idx, game in enumerate(raw_season_data):
         home_team_name = game["homeTeamName"]
         away_team_name = game["awayTeamName"]
         day = int(game["day"])
@@ -101,53 +139,48 @@ def setup_season(season:int, stats_segment_size:int, iterations:int, s_day:int,
             outs=0,
             strikes=0,
             balls=0,
-            weather=weather
+            weather=weather,
+            inference_backend=inference_backend,
+            seed=derive_seed(seed, game_idx),
+            headless=True,
         )
+        if engine == SimulationEngine.LOCKSTEP:
+            lockstep_games.append((game_state, game))
+            continue
         home_wins, away_wins = 0, 0
+        streams = IterationStreams(derive_seed(seed, game_idx), random_source)
         for x in range(0, iterations):
-            home_score, away_score = game_state.simulate_game()
+            game_state.set_random_stream(streams.stream(x))
+            home_score, away_score, _ = game_state.simulate_game()
             if home_score > away_score:
                 home_wins += 1
             else:
                 away_wins += 1
             game_state.reset_game_state()
+        progress.advance(iterations)
 
         home_odds_str = round(home_odds * 1000) / 10
         away_odds_str = round(away_odds * 1000) / 10
-        home_win = home_wins > away_wins
-        away_win = home_wins < away_wins
-        team_records[home_team]["days"].append({
-            "pitcher": game_state.home_team.player_names[game_state.home_team.starting_pitcher],
-            "opponent": away_team_name,
-            "opponent_pitcher": game_state.away_team.player_names[game_state.away_team.starting_pitcher],
-            "weather": game["weather"],
-            "win": home_win
-        })
-        team_records[away_team]["days"].append({
-            "pitcher": game_state.away_team.player_names[game_state.away_team.starting_pitcher],
-            "opponent": home_team_name,
-            "opponent_pitcher": game_state.home_team.player_names[game_state.home_team.starting_pitcher],
-            "weather": game["weather"],
-            "win": away_win
-        })
-        if home_win:
-            team_records[home_team]["wins"] += 1
-            team_records[away_team]["losses"] += 1
-        else:
-            team_records[away_team]["wins"] += 1
-            team_records[home_team]["losses"] += 1
+        record_game_result(team_records, game_state, game, home_wins, away_wins)
+
+    if len(lockstep_games) > 0:
+        all_scores = LockstepSimulation([game_state for game_state, _ in lockstep_games], iterations).run()
+        for (game_state, game), scores in zip(lockstep_games, all_scores):
+            home_wins = sum(1 for home_score, away_score in scores if home_score > away_score)
+            record_game_result(team_records, game_state, game, home_wins, len(scores) - home_wins)
+        progress.advance(iterations * len(lockstep_games))
 
     all_stats = {}
     for cur_team in team_states.keys():
-        for player in team_states[cur_team].game_stats.keys():
+        team_stats = team_states[cur_team].game_stats
+        for player, player_stats in team_stats.items():
             all_stats[player] = {}
-            for stat in team_states[cur_team].game_stats[player]:
-                all_stats[player][stat] = team_states[cur_team].game_stats[player][stat] / float(iterations)
+            for stat, value in player_stats.items():
+                all_stats[player][stat] = value / float(iterations)
     res_dir = f"{file_id}_season_sim_stats"
-    if not os.path.exists(os.path.join('..', "season_sim", "results", res_dir)):
-        os.makedirs(os.path.join('..', "season_sim", "results", res_dir))
-        os.makedirs(os.path.join('..', "season_sim", "results", res_dir, "team_records"))
-        os.makedirs(os.path.join('..', "season_sim", "results", res_dir, "player_stats"))
+    # the days of a season can be written at once by several workers
+    os.makedirs(os.path.join('..', "season_sim", "results", res_dir, "team_records"), exist_ok=True)
+    os.makedirs(os.path.join('..', "season_sim", "results", res_dir, "player_stats"), exist_ok=True)
     seg_stats_file = os.path.join("..", "season_sim", "results", res_dir, "player_stats", f"day{s_day}.json")
     seg_stats_pretty = convert_keys(all_stats)
     with open(seg_stats_file, 'w') as f:
@@ -159,6 +192,16 @@ def setup_season(season:int, stats_segment_size:int, iterations:int, s_day:int,
     return team_records
 
 
+def load_season_data(season: int) -> List[Dict[str, Any]]:
+    with open(os.path.join('..', 'season_sim', 'season_data', f"season{season + 1}.json"), 'r', encoding='utf8') as json_file:
+        return json.load(json_file)
+
+
+def games_on_day(raw_season_data: List[Dict[str, Any]], day: int) -> int:
+    """How many games setup_season plays on day, none on day 99"""
+    return 0 if day == 99 else sum(1 for game in raw_season_data if int(game["day"]) == day)
+
+
 def get_current_stlats(season):
     stlats_json = {}
     pitchers = {}
@@ -377,6 +420,7 @@ def update_team_states(season: int, day: int, team: str, starting_pitcher: str,
             starting_pitcher = day_rotations[day][team][1]
         team_states[team_id_map[team]] = TeamState(
             team_id=team,
+            name=team_name_map[team_id_map[team]],
             season=season,
             day=day,
             stadium=stadium,
@@ -430,10 +474,11 @@ def print_leaders(iterations, season):
     all_segmented_stats = {}
     all_stats = {}
     for cur_team in team_states.keys():
-        for player in team_states[cur_team].game_stats.keys():
+        team_stats = team_states[cur_team].game_stats
+        for player, player_stats in team_stats.items():
             all_stats[player] = {}
-            for stat in team_states[cur_team].game_stats[player]:
-                all_stats[player][stat] = team_states[cur_team].game_stats[player][stat] / float(iterations)
+            for stat, value in player_stats.items():
+                all_stats[player][stat] = value / float(iterations)
         #     if Stats.PITCHER_STRIKEOUTS in team_states[cur_team].game_stats[player]:
         #         player_name = team_states[cur_team].player_names[player]
         #         value = team_states[cur_team].game_stats[player][Stats.PITCHER_STRIKEOUTS] / float(iterations)
@@ -489,10 +534,63 @@ def print_leaders(iterations, season):
         file.write(leader_msg)
 
 
-def run_season_sim(season: int, day: int, file_id: str, iterations: int = 250,  stats_segment_size: int = 3, future=False):
+def run_season_sim(season: int, day: int, file_id: str, iterations: int = 250,  stats_segment_size: int = 3, future=False,
+                   inference_backend: InferenceBackend = InferenceBackend.SKLEARN,
+                   engine: SimulationEngine = SimulationEngine.MONTE_CARLO, seed: Optional[Seed] = None,
+                   random_source: RandomSource = RandomSource.PSEUDO, progress: Optional[Progress] = None):
     print(f"running season {season} sim with {iterations} iterations.")
     load_all_state(season, future)
-    setup_season(season, stats_segment_size, iterations, day, file_id)
+    setup_season(season, stats_segment_size, iterations, day, file_id, inference_backend, engine, seed, random_source,
+                 progress)
+    return {"success": "true"}
+
+def init_season_worker(season: int, future: bool, inference_backend: InferenceBackend) -> None:
+    """Set up a worker's per day state, which a forked worker already shares with the parent"""
+    if not day_lineup:
+        load_all_state(season, future)
+    model_registry.warmup(backend=inference_backend)
+
+
+def run_season_day(season: int, day: int, file_id: str, iterations: int, stats_segment_size: int,
+                   inference_backend: InferenceBackend, engine: SimulationEngine, seed: Seed,
+                   random_source: RandomSource) -> int:
+    """Simulate one day of the season from fresh team states, as a run_season_sim call for the day would"""
+    team_states.clear()
+    setup_season(season, stats_segment_size, iterations, day, file_id, inference_backend, engine, seed, random_source)
+    return day
+
+
+def run_full_season_sim(season: int, file_id: str, iterations: int = 250, stats_segment_size: int = 3,
+                        future=False, inference_backend: InferenceBackend = InferenceBackend.SKLEARN,
+                        engine: SimulationEngine = SimulationEngine.MONTE_CARLO, seed: Optional[Seed] = None,
+                        random_source: RandomSource = RandomSource.PSEUDO, workers: Optional[int] = None,
+                        days: Optional[Iterable[int]] = None, progress: Optional[Progress] = None):
+    """ Simulate every day of the season, writing the same team_records/dayN.json and player_stats/dayN.json a
+    run_season_sim call per day writes.  The stlats of all days are loaded once, and with more than one worker
+    the days are simulated on forked worker processes that share them with this one copy on write. """
+    print(f"running full season {season} sim with {iterations} iterations.")
+    t1 = round(time.time())
+    # every game seeds from its index in the season data, so a day replays the same on any worker
+    seed = root_seed(seed)
+    days = list(range(0, 99) if days is None else days)
+    load_all_state(season, future)
+    model_registry.warmup(backend=inference_backend)
+    raw_season_data = load_season_data(season)
+    progress = progress or Progress()
+    progress.add_total(sum(iterations * games_on_day(raw_season_data, day) for day in days))
+    jobs = [(season, day, file_id, iterations, stats_segment_size, inference_backend, engine, seed, random_source)
+            for day in days]
+    if workers is not None and workers > 1:
+        # the days all play about as many games, so they are handed out in order
+        run_longest_first(run_season_day, jobs, [1.0] * len(jobs), workers, init_season_worker,
+                          (season, future, inference_backend),
+                          lambda idx: progress.advance(iterations * games_on_day(raw_season_data, days[idx])))
+    else:
+        for day, job in zip(days, jobs):
+            run_season_day(*job)
+            progress.advance(iterations * games_on_day(raw_season_data, day))
+    t2 = round(time.time())
+    print(f"finished {len(days)} days in {t2 - t1} seconds.")
     return {"success": "true"}
 
 # for day in range(3, 4):
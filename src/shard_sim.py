@@ -0,0 +1,273 @@
+import json
+from decimal import Decimal
+from fractions import Fraction
+from functools import reduce
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from adaptive_sim import AdaptiveGame
+from common import RandomSource, TENTHS_PER_RUN, to_tenths
+from game_state import GameState
+from parallel_sim import run_longest_first
+from sampling import root_seed, Seed
+from stats_table import StatsTable
+
+
+Exact = Union[int, Fraction]
+
+
+def exact(value: float) -> Exact:
+    """value exactly, as an int when it is a whole number"""
+    return int(value) if value.is_integer() else Fraction(value)
+
+
+def exact_to_json(value: Exact) -> Union[int, List[int]]:
+    """An int as it is, a fraction as [numerator, denominator]"""
+    if isinstance(value, Fraction):
+        return value.numerator if value.denominator == 1 else [value.numerator, value.denominator]
+    return value
+
+
+def exact_from_json(raw: Union[int, List[int]]) -> Exact:
+    return Fraction(raw[0], raw[1]) if isinstance(raw, list) else raw
+
+
+class ExactStats(object):
+    def __init__(self) -> None:
+        """ The sums of a team's stats table counters over iterations, kept exactly.  Most counters are whole
+        counts and sum as ints, but at plate appearance granularity the pitch counts are expected values, which
+        sum as fractions so the sums don't depend on the order they were added in.  These sums only round once,
+        when exported as a StatsTable. """
+        self.players: List[str] = []
+        self.days: List[int] = []
+        self.totals: Dict[Tuple[str, int], Exact] = {}
+        self.by_day: Dict[Tuple[int, str, int], Exact] = {}
+
+    def _see(self, players: Sequence[str], days: Sequence[int]) -> None:
+        # players and days keep the order they were first seen in, like the rows of a StatsTable
+        self.players.extend(player_id for player_id in players if player_id not in self.players)
+        self.days.extend(day for day in days if day not in self.days)
+
+    def add_table(self, table: StatsTable) -> None:
+        """Add the counters of a table, only its nonzero ones are looked at"""
+        self._see(table.players, table.days)
+        num_players, num_days = len(table.players), len(table.days)
+        for row, column in zip(*np.nonzero(table.totals[:num_players])):
+            key = (table.players[row], int(column))
+            self.totals[key] = self.totals.get(key, 0) + exact(float(table.totals[row, column]))
+        for slot, row, column in zip(*np.nonzero(table.by_day[:num_days, :num_players])):
+            key = (table.days[slot], table.players[row], int(column))
+            self.by_day[key] = self.by_day.get(key, 0) + exact(float(table.by_day[slot, row, column]))
+
+    def merge(self, other: 'ExactStats') -> None:
+        self._see(other.players, other.days)
+        for key, value in other.totals.items():
+            self.totals[key] = self.totals.get(key, 0) + value
+        for key, value in other.by_day.items():
+            self.by_day[key] = self.by_day.get(key, 0) + value
+
+    def table(self) -> StatsTable:
+        """The sums as a StatsTable, each the float nearest its exact value"""
+        table = StatsTable()
+        for player_id in self.players:
+            table.player_row(player_id)
+        for day in self.days:
+            table.day_slot(day)
+        for (player_id, column), value in self.totals.items():
+            table.totals[table.player_index[player_id], column] = float(value)
+        for (day, player_id, column), value in self.by_day.items():
+            table.by_day[table.day_index[day], table.player_index[player_id], column] = float(value)
+        return table
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "players": list(self.players),
+            "days": list(self.days),
+            "totals": [[player_id, column, exact_to_json(value)]
+                       for (player_id, column), value in sorted(self.totals.items())],
+            "by_day": [[day, player_id, column, exact_to_json(value)]
+                       for (day, player_id, column), value in sorted(self.by_day.items())],
+        }
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> 'ExactStats':
+        stats = cls()
+        stats.players = list(raw["players"])
+        stats.days = list(raw["days"])
+        stats.totals = {(player_id, column): exact_from_json(value) for player_id, column, value in raw["totals"]}
+        stats.by_day = {(day, player_id, column): exact_from_json(value)
+                        for day, player_id, column, value in raw["by_day"]}
+        return stats
+
+
+class ScoreTotals(object):
+    def __init__(self) -> None:
+        """ The scores of one side over a run's iterations, as the sum, the sum of squares and a histogram of
+        scores in whole tenths of a run.  Every total is an integer, so merging is exact in any order. """
+        self.score_sum = 0
+        self.score_squares = 0
+        self.histogram: Dict[int, int] = {}
+
+    def add(self, score: Decimal) -> None:
+        tenths = to_tenths(score)
+        self.score_sum += tenths
+        self.score_squares += tenths * tenths
+        self.histogram[tenths] = self.histogram.get(tenths, 0) + 1
+
+    def merge(self, other: 'ScoreTotals') -> None:
+        self.score_sum += other.score_sum
+        self.score_squares += other.score_squares
+        for tenths, count in other.histogram.items():
+            self.histogram[tenths] = self.histogram.get(tenths, 0) + count
+
+    def mean(self, iterations: int) -> float:
+        return self.score_sum / TENTHS_PER_RUN / iterations if iterations > 0 else 0.0
+
+    def variance(self, iterations: int) -> float:
+        """The sample variance of the score in runs"""
+        if iterations < 2:
+            return 0.0
+        mean_tenths = self.score_sum / iterations
+        return (self.score_squares - self.score_sum * mean_tenths) / (iterations - 1) / TENTHS_PER_RUN ** 2
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"score_sum": self.score_sum, "score_squares": self.score_squares,
+                "histogram": {str(tenths): count for tenths, count in sorted(self.histogram.items())}}
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> 'ScoreTotals':
+        totals = cls()
+        totals.score_sum = raw["score_sum"]
+        totals.score_squares = raw["score_squares"]
+        totals.histogram = {int(tenths): count for tenths, count in raw["histogram"].items()}
+        return totals
+
+
+class GameAccumulator(object):
+    def __init__(self) -> None:
+        """ Everything a run of a game's iterations adds up: the iteration and win counts, the score totals of
+        each side and the exact sums of each team's stats.  Accumulators of separate shards of the iterations
+        merge into exactly the accumulator of the whole run, in any grouping. """
+        self.iterations = 0
+        self.home_wins = 0
+        self.home_scores = ScoreTotals()
+        self.away_scores = ScoreTotals()
+        self.home_stats = ExactStats()
+        self.away_stats = ExactStats()
+
+    def add(self, home_scores: Sequence[Decimal], away_scores: Sequence[Decimal], home_stats: StatsTable,
+            away_stats: StatsTable) -> None:
+        """ Add the scores of some iterations and the stats the teams recorded over them.  The stats of each
+        iteration are added on their own, so a run's sums don't depend on how its iterations were shared out. """
+        for home_score, away_score in zip(home_scores, away_scores):
+            self.iterations += 1
+            if home_score > away_score:
+                self.home_wins += 1
+            self.home_scores.add(home_score)
+            self.away_scores.add(away_score)
+        self.home_stats.add_table(home_stats)
+        self.away_stats.add_table(away_stats)
+
+    def merge(self, other: 'GameAccumulator') -> 'GameAccumulator':
+        """Add the totals of another accumulator into this one and return it"""
+        self.iterations += other.iterations
+        self.home_wins += other.home_wins
+        self.home_scores.merge(other.home_scores)
+        self.away_scores.merge(other.away_scores)
+        self.home_stats.merge(other.home_stats)
+        self.away_stats.merge(other.away_stats)
+        return self
+
+    def win_probability(self) -> float:
+        return self.home_wins / self.iterations if self.iterations > 0 else 0.0
+
+    def average_stats(self, stats: ExactStats) -> Dict[str, Dict[Any, float]]:
+        """A team's game stats per iteration, the way the drivers divide the totals by the iteration count"""
+        return {player_id: {stat: value / float(self.iterations) for stat, value in player_stats.items()}
+                for player_id, player_stats in stats.table().game_stats().items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "iterations": self.iterations,
+            "home_wins": self.home_wins,
+            "home_scores": self.home_scores.to_dict(),
+            "away_scores": self.away_scores.to_dict(),
+            "home_stats": self.home_stats.to_dict(),
+            "away_stats": self.away_stats.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> 'GameAccumulator':
+        accumulator = cls()
+        accumulator.iterations = raw["iterations"]
+        accumulator.home_wins = raw["home_wins"]
+        accumulator.home_scores = ScoreTotals.from_dict(raw["home_scores"])
+        accumulator.away_scores = ScoreTotals.from_dict(raw["away_scores"])
+        accumulator.home_stats = ExactStats.from_dict(raw["home_stats"])
+        accumulator.away_stats = ExactStats.from_dict(raw["away_stats"])
+        return accumulator
+
+
+def split_shards(iterations: int, num_shards: int) -> List[Tuple[int, int]]:
+    """(start, num_iterations) of each of num_shards nearly equal shards of iterations"""
+    num_shards = max(1, min(num_shards, iterations))
+    size, extra = divmod(iterations, num_shards)
+    shards = []
+    start = 0
+    for shard in range(num_shards):
+        num_iterations = size + (1 if shard < extra else 0)
+        shards.append((start, num_iterations))
+        start += num_iterations
+    return shards
+
+
+def run_shard(game: GameState, seed: Seed, random_source: RandomSource, start: int,
+              num_iterations: int) -> GameAccumulator:
+    """ Play iterations start to start + num_iterations of a game on a copy of it.  Iteration x rolls from the
+    same stream in every shard, see IterationStreams, so the shards of a run together play the iterations one
+    run of them all plays. """
+    accumulator = GameAccumulator()
+    game = game.clone()
+    shard = AdaptiveGame(game, seed, random_source)
+    for x in range(start, start + num_iterations):
+        shard.run(1, x)
+        accumulator.add(shard.home_scores[-1:], shard.away_scores[-1:], game.home_team.stats_table,
+                        game.away_team.stats_table)
+        for team in [game.home_team, game.away_team]:
+            team.stats_table.reset(team.stats_table.players)
+    return accumulator
+
+
+def run_sharded(game: GameState, seed: Optional[Seed], iterations: int, num_shards: int,
+                random_source: RandomSource = RandomSource.PSEUDO, workers: Optional[int] = None) -> GameAccumulator:
+    """ Split iterations of a game into shards, play them on worker processes when there is more than one worker
+    and merge them.  Every iteration starts from the teams as given, see AdaptiveGame, so the result is the one a
+    single shard of every iteration gets. """
+    seed = root_seed(seed)
+    jobs = [(game, seed, random_source, start, num_iterations)
+            for start, num_iterations in split_shards(iterations, num_shards)]
+    if workers is not None and workers > 1:
+        shards = run_longest_first(run_shard, jobs, [job[4] for job in jobs], workers)
+    else:
+        shards = [run_shard(*job) for job in jobs]
+    return reduce_shards(shards)
+
+
+def reduce_shards(shards: Sequence[GameAccumulator]) -> GameAccumulator:
+    return reduce(lambda total, shard: total.merge(shard), shards, GameAccumulator())
+
+
+def write_shard(accumulator: GameAccumulator, filename: str) -> None:
+    """Save a shard's accumulator, to be merged with shards run somewhere else"""
+    with open(filename, 'w') as file:
+        json.dump(accumulator.to_dict(), file)
+
+
+def read_shard(filename: str) -> GameAccumulator:
+    with open(filename, 'r') as file:
+        return GameAccumulator.from_dict(json.load(file))
+
+
+def reduce_shard_files(filenames: Sequence[str]) -> GameAccumulator:
+    return reduce_shards([read_shard(filename) for filename in filenames])
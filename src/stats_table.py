@@ -0,0 +1,210 @@
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple
+
+import numpy as np
+
+from common import BlaseballStatistics as Stats
+from common import StatEvent, StatProfile
+
+NUM_STAT_COLUMNS = max(stat.value for stat in Stats) + 1
+# counted events sit after the stats, a block of batter columns then a block of pitcher columns
+NUM_EVENT_SLOTS = max(event.value for event in StatEvent) + 1
+BATTER_EVENT_BASE = NUM_STAT_COLUMNS
+PITCHER_EVENT_BASE = NUM_STAT_COLUMNS + NUM_EVENT_SLOTS
+NUM_COLUMNS = NUM_STAT_COLUMNS + 2 * NUM_EVENT_SLOTS
+INITIAL_PLAYERS = 16
+INITIAL_DAYS = 4
+
+TEAM_TOTAL_STATS = frozenset(stat for stat in Stats if stat.name.startswith(("TEAM_", "DEFENSE_")))
+PITCHER_STATS = frozenset(stat for stat in Stats if stat.name.startswith("PITCHER_"))
+PROFILE_STATS: Dict[StatProfile, FrozenSet[Stats]] = {
+    StatProfile.WINS_ONLY: frozenset([Stats.TEAM_WINS, Stats.TEAM_LOSSES]),
+    StatProfile.TEAM_TOTALS: TEAM_TOTAL_STATS,
+    StatProfile.PITCHER_LINES: TEAM_TOTAL_STATS | PITCHER_STATS,
+    StatProfile.FULL: frozenset(Stats),
+}
+
+
+_HIT = (Stats.BATTER_PLATE_APPEARANCES, Stats.BATTER_AT_BATS, Stats.BATTER_HITS)
+_HIT_ALLOWED = (Stats.PITCHER_BATTERS_FACED, Stats.PITCHER_HITS_ALLOWED)
+# the stats each event adds one to, for the batter and for the pitcher
+BATTER_EVENT_STATS: Dict[StatEvent, Tuple[Stats, ...]] = {
+    StatEvent.SINGLE: _HIT + (Stats.BATTER_SINGLES,),
+    StatEvent.DOUBLE: _HIT + (Stats.BATTER_DOUBLES,),
+    StatEvent.TRIPLE: _HIT + (Stats.BATTER_TRIPLES,),
+    StatEvent.HOME_RUN: _HIT + (Stats.BATTER_HRS,),
+    StatEvent.FLYOUT: (Stats.BATTER_PLATE_APPEARANCES, Stats.BATTER_AT_BATS, Stats.BATTER_FLYOUTS),
+    StatEvent.GROUNDOUT: (Stats.BATTER_PLATE_APPEARANCES, Stats.BATTER_AT_BATS, Stats.BATTER_GROUNDOUTS),
+    StatEvent.CROWS_OUT: (Stats.BATTER_PLATE_APPEARANCES,),
+}
+PITCHER_EVENT_STATS: Dict[StatEvent, Tuple[Stats, ...]] = {
+    StatEvent.SINGLE: _HIT_ALLOWED,
+    StatEvent.DOUBLE: _HIT_ALLOWED + (Stats.PITCHER_XBH_ALLOWED,),
+    StatEvent.TRIPLE: _HIT_ALLOWED + (Stats.PITCHER_XBH_ALLOWED,),
+    StatEvent.HOME_RUN: _HIT_ALLOWED + (Stats.PITCHER_HRS_ALLOWED,),
+    StatEvent.FLYOUT: (Stats.PITCHER_BATTERS_FACED, Stats.PITCHER_FLYOUTS),
+    StatEvent.GROUNDOUT: (Stats.PITCHER_BATTERS_FACED, Stats.PITCHER_GROUNDOUTS),
+    StatEvent.CROWS_OUT: (Stats.PITCHER_BATTERS_FACED,),
+}
+DERIVED_STATS = frozenset(stat for event_stats in [BATTER_EVENT_STATS, PITCHER_EVENT_STATS]
+                          for stats in event_stats.values() for stat in stats)
+
+
+def _event_deltas() -> np.ndarray:
+    deltas = np.zeros((NUM_COLUMNS - NUM_STAT_COLUMNS, NUM_STAT_COLUMNS))
+    for base, event_stats in [(BATTER_EVENT_BASE, BATTER_EVENT_STATS), (PITCHER_EVENT_BASE, PITCHER_EVENT_STATS)]:
+        for event, stats in event_stats.items():
+            for stat in stats:
+                deltas[base + event.value - NUM_STAT_COLUMNS, stat.value] += 1.0
+    return deltas
+
+
+# [event column, stat] the stats implied by one count of each event
+EVENT_STAT_DELTAS = _event_deltas()
+
+
+def profile_mask(profile: StatProfile, event_counts: bool = False) -> List[bool]:
+    """ Whether each column is recorded under profile, indexed by column.  When counting events the stats they
+    imply are not recorded themselves, and an event is counted when the profile keeps its stats.  Profiles keep
+    whole families of stats, so an event's stats are either all kept or all dropped. """
+    kept = PROFILE_STATS[profile]
+    mask = [False] * NUM_COLUMNS
+    for stat in kept:
+        mask[stat.value] = not (event_counts and stat in DERIVED_STATS)
+    if event_counts:
+        for base, event_stats in [(BATTER_EVENT_BASE, BATTER_EVENT_STATS), (PITCHER_EVENT_BASE, PITCHER_EVENT_STATS)]:
+            for event, stats in event_stats.items():
+                mask[base + event.value] = kept.issuperset(stats)
+    return mask
+
+
+class StatsTable(object):
+    def __init__(self) -> None:
+        """ Accumulated stats of a team as counter arrays indexed by player and column, the totals as
+        [player, column] and the segmented stats with a day axis in front.  The columns are the stat values
+        followed by the counted events.  Players and days are given rows the first time they are seen, and the
+        dict shapes the rest of the sim uses are only built on export, with the stats the events imply added. """
+        self.player_index: Dict[str, int] = {}
+        self.players: List[str] = []
+        self.day_index: Dict[int, int] = {}
+        self.days: List[int] = []
+        self.totals = np.zeros((INITIAL_PLAYERS, NUM_COLUMNS))
+        self.by_day = np.zeros((INITIAL_DAYS, INITIAL_PLAYERS, NUM_COLUMNS))
+        self._make_views()
+
+    def _make_views(self) -> None:
+        # single increments go through flat memoryviews of the arrays, indexing a numpy array with a tuple costs
+        # a few times as much as the whole rest of add
+        self._totals_view = memoryview(self.totals.reshape(-1))
+        self._by_day_view = memoryview(self.by_day.reshape(-1))
+        self._day_stride = self.totals.size
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        del state["_totals_view"], state["_by_day_view"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._make_views()
+
+    def player_row(self, player_id: str) -> int:
+        row = self.player_index.get(player_id)
+        if row is None:
+            row = len(self.players)
+            if row == self.totals.shape[0]:
+                self.totals = np.concatenate([self.totals, np.zeros_like(self.totals)])
+                self.by_day = np.concatenate([self.by_day, np.zeros_like(self.by_day)], axis=1)
+                self._make_views()
+            self.players.append(player_id)
+            self.player_index[player_id] = row
+        return row
+
+    def day_slot(self, day: int) -> int:
+        slot = self.day_index.get(day)
+        if slot is None:
+            slot = len(self.days)
+            if slot == self.by_day.shape[0]:
+                self.by_day = np.concatenate([self.by_day, np.zeros_like(self.by_day)])
+                self._make_views()
+            self.days.append(day)
+            self.day_index[day] = slot
+        return slot
+
+    def add(self, player_id: str, column: int, value: float, day: int) -> None:
+        """Add value to a column, the value of a stat or the column of a counted event"""
+        row = self.player_index.get(player_id)
+        if row is None:
+            row = self.player_row(player_id)
+        slot = self.day_index.get(day)
+        if slot is None:
+            slot = self.day_slot(day)
+        idx = row * NUM_COLUMNS + column
+        self._totals_view[idx] += value
+        self._by_day_view[slot * self._day_stride + idx] += value
+
+    def get(self, player_id: str, stat_id: Stats) -> float:
+        row = self.player_index.get(player_id)
+        return 0.0 if row is None else float(self.derive_stats(self.totals[row:row + 1])[0, stat_id.value])
+
+    def total(self, stat_id: Stats) -> float:
+        """A stat summed over every player"""
+        return float(self.derive_stats(self.totals[:len(self.players)])[:, stat_id.value].sum())
+
+    def reset(self, player_ids: Iterable[str]) -> None:
+        """Zero every counter and drop the day axis, making sure the given players have rows"""
+        self.totals[:] = 0.0
+        self.by_day[:] = 0.0
+        self.day_index = {}
+        self.days = []
+        for player_id in player_ids:
+            self.player_row(player_id)
+
+    def merge(self, other: 'StatsTable') -> None:
+        """Add the counters of another table, which may have its players and days in a different order"""
+        rows = np.array([self.player_row(player_id) for player_id in other.players], dtype=int)
+        slots = np.array([self.day_slot(day) for day in other.days], dtype=int)
+        num_players = len(other.players)
+        self.totals[rows] += other.totals[:num_players]
+        if len(slots) > 0:
+            self.by_day[np.ix_(slots, rows)] += other.by_day[:len(slots), :num_players]
+
+    def load(self, game_stats: Dict[str, Dict[Stats, float]],
+             segmented_stats: Dict[int, Dict[str, Dict[Stats, float]]]) -> None:
+        """Add stats given in the dict shapes returned by game_stats and segmented_stats"""
+        for player_id, stats in game_stats.items():
+            row = self.player_row(player_id)
+            for stat_id, value in stats.items():
+                self.totals[row, stat_id.value] += value
+        for day, day_stats in segmented_stats.items():
+            slot = self.day_slot(day)
+            for player_id, stats in day_stats.items():
+                row = self.player_row(player_id)
+                for stat_id, value in stats.items():
+                    self.by_day[slot, row, stat_id.value] += value
+
+    @staticmethod
+    def derive_stats(counts: np.ndarray) -> np.ndarray:
+        """The [..., stat] stats of [..., column] counts, the recorded stats plus the stats the events imply"""
+        stats = counts[..., :NUM_STAT_COLUMNS].copy()
+        stats += counts[..., NUM_STAT_COLUMNS:] @ EVENT_STAT_DELTAS
+        return stats
+
+    @staticmethod
+    def _row_dict(row: np.ndarray) -> Dict[Stats, float]:
+        values = row.tolist()
+        return {stat: values[stat.value] for stat in Stats}
+
+    def game_stats(self) -> Dict[str, Dict[Stats, float]]:
+        """Totals as {player_id: {stat: value}}, with every stat for every player the table has seen"""
+        totals = self.derive_stats(self.totals)
+        return {player_id: self._row_dict(totals[row]) for player_id, row in self.player_index.items()}
+
+    def segmented_stats(self) -> Dict[int, Dict[str, Dict[Stats, float]]]:
+        """Stats by day as {day: {player_id: {stat: value}}}, leaving out players with nothing recorded that day"""
+        ret_val: Dict[int, Dict[str, Dict[Stats, float]]] = {}
+        for day, slot in self.day_index.items():
+            day_counts = self.derive_stats(self.by_day[slot])
+            recorded = np.any(day_counts[:len(self.players)] != 0.0, axis=1)
+            ret_val[day] = {player_id: self._row_dict(day_counts[row])
+                            for player_id, row in self.player_index.items() if recorded[row]}
+        return ret_val
@@ -1,6 +1,5 @@
 import copy
-from decimal import Decimal
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import json
 import logging
 import random
@@ -9,9 +8,11 @@ import statistics
 from common import BlaseballStatistics as Stats
 from common import ForbiddenKnowledge as FK
 from common import AdditiveTypes, BloodType, calc_vibes, GameEventTeamBuff, PlayerBuff, \
-    season_based_event_map, SeasonEventTeamBuff, Team, team_game_event_map, time_based_event_map, \
-    TimeEventTeamBuff, team_id_map, Weather
+    season_based_event_map, SeasonEventTeamBuff, StatProfile, Team, team_game_event_map, time_based_event_map, \
+    TimeEventTeamBuff, team_id_map, TENTHS_PER_RUN, Weather
+from sampling import RandomStream
 from stadium import Stadium
+from stats_table import profile_mask, StatsTable
 
 DEF_ID = "DEFENSE"
 TEAM_ID = "TEAM"
@@ -69,29 +70,40 @@ class TeamState(object):
         self.stlats: Dict[str, Dict[FK, float]] = stlats
         self.add_default_haunted_stats()
         self.player_buffs: Dict[str, Dict[PlayerBuff, int]] = buffs
-        self.game_stats: Dict[str, Dict[Stats, float]] = game_stats
-        self.segmented_stats: Dict[int, Dict[str, Dict[Stats, float]]] = segmented_stats
+        self.stats_table: StatsTable = StatsTable()
+        self.stats_table.load(game_stats, segmented_stats)
+        self.set_stat_profile(StatProfile.FULL)
         self.segment_size = segment_size
         self.blood: Dict[str, BloodType] = blood
         self.player_names: Dict[str, str] = player_names
         self.cur_batter_pos: int = cur_batter_pos
+        # batters sent up this game, the key of a plate appearance when games share random numbers
+        self.plate_appearances = 0
         self.cur_batter: str = lineup[cur_batter_pos]
         self.batting_addition: float = 1.0
         self.pitching_addition: float = 1.0
         self.defense_addition: float = 1.0
         self.base_running_addition: float = 1.0
+        # bumped whenever the team additions or a player's additives change so cached model inputs can be invalidated
+        self.additive_version: int = 0
+        self.player_additive_versions: Dict[str, int] = {}
         self.player_additives = self.pre_load_additives()
+        # the random stream of the game being played, set by GameState
+        self.rng: Optional[RandomStream] = None
         self.calc_additives()
         self.apply_season_buffs()
         self._calculate_defense()
 
-    def validate_game_state_additives(self, cur_runs: Decimal, stadium: Stadium):
+    def validate_game_state_additives(self, cur_runs: int, stadium: Stadium):
+        """cur_runs is the team's score in tenths of a run"""
         if self.team_enum in team_game_event_map:
             buff, start_season, end_season, req_weather = team_game_event_map[self.team_enum]
             if buff == GameEventTeamBuff.PRESSURE and \
                     self.season >= start_season and \
                     req_weather == self.weather and \
                     self.runners_aboard:
+                if self.batting_addition != 1.25:
+                    self.mark_additives_changed()
                 self.batting_addition = 1.25
                 self.pitching_addition = 1.25
                 self.defense_addition = 1.25
@@ -100,6 +112,8 @@ class TeamState(object):
                     self.season >= start_season and \
                     req_weather == self.weather and \
                     not self.runners_aboard:
+                if self.batting_addition != 1.0:
+                    self.mark_additives_changed()
                 self.batting_addition = 1.0
                 self.pitching_addition = 1.0
                 self.defense_addition = 1.0
@@ -108,37 +122,41 @@ class TeamState(object):
         for player_id in self.player_buffs.keys():
             cur_buffs = self.player_buffs[player_id]
             for cur_mod in cur_buffs.keys():
-                if cur_mod == PlayerBuff.UNDER_OVER and cur_buffs[cur_mod] == 2 and cur_runs > 5:
+                if cur_mod == PlayerBuff.UNDER_OVER and cur_buffs[cur_mod] == 2 and cur_runs > 5 * TENTHS_PER_RUN:
                     # turn off the buff
                     self.player_buffs[player_id][cur_mod] = 1
                     self.player_additives[player_id][AdditiveTypes.BATTING] *= 1.0/1.2
                     self.player_additives[player_id][AdditiveTypes.PITCHING] *= 1.0/1.2
                     self.player_additives[player_id][AdditiveTypes.DEFENSE] *= 1.0/1.2
                     self.player_additives[player_id][AdditiveTypes.BASE_RUNNING] *= 1.0/1.2
+                    self.mark_additives_changed(player_id)
                     continue
-                if cur_mod == PlayerBuff.UNDER_OVER and cur_buffs[cur_mod] == 1 and cur_runs < 5:
+                if cur_mod == PlayerBuff.UNDER_OVER and cur_buffs[cur_mod] == 1 and cur_runs < 5 * TENTHS_PER_RUN:
                     # turn on the buff
                     self.player_buffs[player_id][cur_mod] = 2
                     self.player_additives[player_id][AdditiveTypes.BATTING] *= 1.2
                     self.player_additives[player_id][AdditiveTypes.PITCHING] *= 1.2
                     self.player_additives[player_id][AdditiveTypes.DEFENSE] *= 1.2
                     self.player_additives[player_id][AdditiveTypes.BASE_RUNNING] *= 1.2
+                    self.mark_additives_changed(player_id)
                     continue
-                if cur_mod == PlayerBuff.OVER_UNDER and cur_buffs[cur_mod] == 1 and cur_runs > 5:
+                if cur_mod == PlayerBuff.OVER_UNDER and cur_buffs[cur_mod] == 1 and cur_runs > 5 * TENTHS_PER_RUN:
                     # turn on the debuff
                     self.player_buffs[player_id][cur_mod] = 2
                     self.player_additives[player_id][AdditiveTypes.BATTING] *= 1.0/1.2
                     self.player_additives[player_id][AdditiveTypes.PITCHING] *= 1.0/1.2
                     self.player_additives[player_id][AdditiveTypes.DEFENSE] *= 1.0/1.2
                     self.player_additives[player_id][AdditiveTypes.BASE_RUNNING] *= 1.0/1.2
+                    self.mark_additives_changed(player_id)
                     continue
-                if cur_mod == PlayerBuff.OVER_UNDER and cur_buffs[cur_mod] == 2 and cur_runs <= 5:
+                if cur_mod == PlayerBuff.OVER_UNDER and cur_buffs[cur_mod] == 2 and cur_runs <= 5 * TENTHS_PER_RUN:
                     # turn off the debuff
                     self.player_buffs[player_id][cur_mod] = 1
                     self.player_additives[player_id][AdditiveTypes.BATTING] *= 1.2
                     self.player_additives[player_id][AdditiveTypes.PITCHING] *= 1.2
                     self.player_additives[player_id][AdditiveTypes.DEFENSE] *= 1.2
                     self.player_additives[player_id][AdditiveTypes.BASE_RUNNING] *= 1.2
+                    self.mark_additives_changed(player_id)
                     continue
                 if cur_mod == PlayerBuff.OVER_PERFORMING and \
                         cur_buffs[cur_mod] == 1:
@@ -148,6 +166,7 @@ class TeamState(object):
                     self.player_additives[player_id][AdditiveTypes.PITCHING] *= 1.2
                     self.player_additives[player_id][AdditiveTypes.DEFENSE] *= 1.2
                     self.player_additives[player_id][AdditiveTypes.BASE_RUNNING] *= 1.2
+                    self.mark_additives_changed(player_id)
                     continue
                 if cur_mod == PlayerBuff.SUPER_YUMMY and \
                         cur_buffs[cur_mod] == 1 and \
@@ -158,6 +177,7 @@ class TeamState(object):
                     self.player_additives[player_id][AdditiveTypes.PITCHING] *= 1.2
                     self.player_additives[player_id][AdditiveTypes.DEFENSE] *= 1.2
                     self.player_additives[player_id][AdditiveTypes.BASE_RUNNING] *= 1.2
+                    self.mark_additives_changed(player_id)
                     continue
                 if cur_mod == PlayerBuff.SUPER_YUMMY and \
                         cur_buffs[cur_mod] == 2 and \
@@ -168,6 +188,7 @@ class TeamState(object):
                     self.player_additives[player_id][AdditiveTypes.PITCHING] *= 1.0/1.2
                     self.player_additives[player_id][AdditiveTypes.DEFENSE] *= 1.0/1.2
                     self.player_additives[player_id][AdditiveTypes.BASE_RUNNING] *= 1.0/1.2
+                    self.mark_additives_changed(player_id)
                     continue
                 if cur_mod == PlayerBuff.PRESSURE and \
                         self.weather == Weather.FLOODING and \
@@ -179,6 +200,7 @@ class TeamState(object):
                     self.player_additives[player_id][AdditiveTypes.PITCHING] *= 1.25
                     self.player_additives[player_id][AdditiveTypes.DEFENSE] *= 1.25
                     self.player_additives[player_id][AdditiveTypes.BASE_RUNNING] *= 1.25
+                    self.mark_additives_changed(player_id)
                     continue
                 if cur_mod == PlayerBuff.PRESSURE and \
                         self.weather == Weather.FLOODING and \
@@ -190,6 +212,7 @@ class TeamState(object):
                     self.player_additives[player_id][AdditiveTypes.PITCHING] *= 1.0/1.25
                     self.player_additives[player_id][AdditiveTypes.DEFENSE] *= 1.0/1.25
                     self.player_additives[player_id][AdditiveTypes.BASE_RUNNING] *= 1.0/1.25
+                    self.mark_additives_changed(player_id)
                     continue
 
 
@@ -201,11 +224,13 @@ class TeamState(object):
                 if self.player_buffs[player_id][PlayerBuff.SPICY] == 3:
                     self.player_buffs[player_id][PlayerBuff.SPICY] += 1
                     self.player_additives[player_id][AdditiveTypes.BATTING] *= 1.4
+                    self.mark_additives_changed(player_id)
 
     def reset_hit_buffs(self, player_id: str):
         if PlayerBuff.SPICY in self.player_buffs[player_id]:
             if self.player_buffs[player_id][PlayerBuff.SPICY] == 4:
                 self.player_additives[player_id][AdditiveTypes.BATTING] *= 1.0/1.4
+                self.mark_additives_changed(player_id)
             self.player_buffs[player_id][PlayerBuff.SPICY] = 1
 
     def pre_load_additives(self) -> Dict[str, Dict[AdditiveTypes, float]]:
@@ -250,6 +275,14 @@ class TeamState(object):
 
     def reset_preload_additives(self) -> None:
         self.player_additives = self.pre_load_additives()
+        self.mark_additives_changed()
+
+    def mark_additives_changed(self, player_id: Optional[str] = None) -> None:
+        """Record that a player's additives changed, or the whole team's when no player is given"""
+        if player_id is None:
+            self.additive_version += 1
+        else:
+            self.player_additive_versions[player_id] = self.player_additive_versions.get(player_id, 0) + 1
 
     def _calculate_defense(self):
         """Calculate the average team defense and store it in the stlats dict under DEF_ID"""
@@ -291,6 +324,7 @@ class TeamState(object):
         self.stlats[DEF_ID][FK.TENACIOUSNESS] = def_tenaciousness
         self.stlats[DEF_ID][FK.WATCHFULNESS] = def_watchfulness
         self.stlats[DEF_ID][FK.VIBES] = def_vibes
+        self.mark_additives_changed()
 
     def reset_team_state(self, game_stat_reset=False, lineup_changed=True) -> None:
         if game_stat_reset:
@@ -298,6 +332,7 @@ class TeamState(object):
         self.apply_season_buffs()
         self.cur_batter_pos = 1
         self.cur_batter = self.lineup[self.cur_batter_pos]
+        self.plate_appearances = 0
         # we have to reset the state of the starting pitcher back to the pitcher pos and call update to
         # reapply the shelled bugging
         self.starting_pitcher = self.rotation[self.cur_pitcher_pos]
@@ -307,17 +342,49 @@ class TeamState(object):
             self.calc_additives()
         self._calculate_defense()
 
+    @property
+    def game_stats(self) -> Dict[str, Dict[Stats, float]]:
+        """The accumulated stats as {player_id: {stat: value}}, built from the stats table on each access"""
+        return self.stats_table.game_stats()
+
+    @property
+    def segmented_stats(self) -> Dict[int, Dict[str, Dict[Stats, float]]]:
+        """The accumulated stats as {day: {player_id: {stat: value}}}, built from the stats table on each access"""
+        return self.stats_table.segmented_stats()
+
+    def set_stat_profile(self, profile: StatProfile, event_counts: bool = False) -> None:
+        """Record only the stats of profile from now on, update_stat drops the rest.  With event_counts the stats
+        implied by a counted event are dropped too and derived from the event counts when exported."""
+        self.stat_profile = profile
+        self.event_counts = event_counts
+        self.stat_mask: List[bool] = profile_mask(profile, event_counts)
+
     def reset_game_stats(self) -> None:
-        self.game_stats = {}
-        self.segmented_stats = {}
-        new_dict: Dict[Stats, float] = {}
-        for k in Stats:
-            new_dict[k] = 0.0
-        for p_key in self.lineup.keys():
-            self.game_stats[self.lineup[p_key]] = copy.deepcopy(new_dict)
-        self.game_stats[self.starting_pitcher] = copy.deepcopy(new_dict)
-        self.game_stats[DEF_ID] = copy.deepcopy(new_dict)
-        self.game_stats[TEAM_ID] = copy.deepcopy(new_dict)
+        self.stats_table.reset(list(self.lineup.values()) + [self.starting_pitcher, DEF_ID, TEAM_ID])
+
+    def copy_for_game(self) -> 'TeamState':
+        """Copy the team for an independent game, starting with empty stats.  Player stlats, names and blood are
+        only read during a game so they are shared, everything a game mutates is copied."""
+        team = copy.copy(self)
+        team.stlats = dict(self.stlats)
+        team.player_buffs = {player_id: dict(buffs) for player_id, buffs in self.player_buffs.items()}
+        team.player_additives = {player_id: dict(additives) for player_id, additives in self.player_additives.items()}
+        team.player_additive_versions = dict(self.player_additive_versions)
+        team.lineup = dict(self.lineup)
+        team.rotation = dict(self.rotation)
+        team.stats_table = StatsTable()
+        return team
+
+    def restore_game_start(self, start: 'TeamState') -> None:
+        """Put back what a game changes on the team from a copy_for_game taken before it, like the buffs it gave"""
+        self.stlats = dict(start.stlats)
+        self.player_buffs = {player_id: dict(buffs) for player_id, buffs in start.player_buffs.items()}
+        self.lineup = dict(start.lineup)
+        self.rotation = dict(start.rotation)
+
+    def merge_stats(self, other: 'TeamState') -> None:
+        """Add the game and segmented stats accumulated by another copy of this team"""
+        self.stats_table.merge(other.stats_table)
 
     def update_player_names(self, new_names: Dict[str, str]):
         for id in new_names:
@@ -533,6 +600,7 @@ class TeamState(object):
         else:
             self.cur_batter_pos += 1
         self.cur_batter = self.lineup[self.cur_batter_pos]
+        self.plate_appearances += 1
 
     def next_pitcher(self) -> int:
         if len(self.rotation) == self.cur_pitcher_pos:
@@ -565,21 +633,15 @@ class TeamState(object):
             self.starting_pitcher = self.rotation[self.cur_pitcher_pos]
 
     def update_stat(self, player_id: str, stat_id: Stats, value: float, day: int) -> None:
-        if player_id not in self.game_stats:
-            self.game_stats[player_id] = {}
-        if stat_id in self.game_stats[player_id]:
-            self.game_stats[player_id][stat_id] += value
-        else:
-            self.game_stats[player_id][stat_id] = value
-
-        if day not in self.segmented_stats:
-            self.segmented_stats[day] = {}
-        if player_id not in self.segmented_stats[day]:
-            self.segmented_stats[day][player_id] = {}
-        if stat_id in self.segmented_stats[day][player_id]:
-            self.segmented_stats[day][player_id][stat_id] += value
-        else:
-            self.segmented_stats[day][player_id][stat_id] = value
+        # _value_ skips the enum's value property, this is called several times a pitch
+        column = stat_id._value_
+        if self.stat_mask[column]:
+            self.stats_table.add(player_id, column, value, day)
+
+    def count_event(self, player_id: str, column: int, day: int) -> None:
+        """Count an event at its batter or pitcher column, see stats_table.BATTER_EVENT_BASE"""
+        if self.stat_mask[column]:
+            self.stats_table.add(player_id, column, 1.0, day)
 
     def get_defense_feature_vector(self) -> List[float]:
         ret_val: List[float] = [
@@ -690,6 +752,7 @@ class TeamState(object):
                     self.balls_for_walk = 3
 
     def calc_additives(self):
+        self.mark_additives_changed()
         self.reset_team_additives()
         if self.team_enum in time_based_event_map:
             buff, start_season, end_season, start_day, end_day = time_based_event_map[self.team_enum]
@@ -764,4 +827,6 @@ class TeamState(object):
         self.stlats[HAUNTED_ID][FK.UNTHWACKABILITY] = 0.451664863064749
 
     def _random_roll(self) -> float:
+        if self.rng is not None:
+            return self.rng.random()
         return random.random()
@@ -0,0 +1,37 @@
+import unittest
+
+from adaptive_sim import AdaptiveGame, run_adaptive, win_interval
+from common import IntervalMethod, Weather
+from sampling import derive_seed
+from sim_fixtures import make_game
+
+
+class TestAdaptiveSim(unittest.TestCase):
+    def test_win_intervals(self):
+        low, high = win_interval(50, 100)
+        self.assertAlmostEqual(low, 0.4038, places=4)
+        self.assertAlmostEqual(high, 0.5962, places=4)
+        low, high = win_interval(50, 100, IntervalMethod.JEFFREYS)
+        self.assertAlmostEqual(low, 0.4032, places=3)
+        self.assertAlmostEqual(high, 0.5968, places=3)
+        self.assertEqual(win_interval(0, 0), (0.0, 1.0))
+        self.assertEqual(win_interval(0, 20, IntervalMethod.JEFFREYS)[0], 0.0)
+        self.assertGreater(win_interval(20, 20)[0], 0.8)
+
+    def test_adaptive_games_replay_the_fixed_run_and_share_the_budget(self):
+        fixed = AdaptiveGame(make_game(Weather.SUN2, seed=1, headless=True), derive_seed(9, 0))
+        fixed.run(30)
+        games = [AdaptiveGame(make_game(weather, seed=1, headless=True), derive_seed(9, game_idx))
+                 for game_idx, weather in enumerate([Weather.SUN2, Weather.ECLIPSE, Weather.COFFEE])]
+        run_adaptive(games, 0.25, 40, 100, chunk_size=10)
+        self.assertEqual(games[0].home_scores[:30], fixed.home_scores)
+        # the blowouts stop early and the close game is given what they saved
+        self.assertEqual([game.iterations for game in games], [60, 30, 30])
+        for game in games:
+            self.assertLessEqual(game.width(), 0.25)
+            self.assertEqual(game.home_wins, sum(1 for home, away in zip(game.home_scores, game.away_scores)
+                                                 if home > away))
+
+
+if __name__ == '__main__':
+    unittest.main()
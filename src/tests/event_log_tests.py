@@ -0,0 +1,37 @@
+import unittest
+
+from event_log import AWAY_SIDE, EVENT_DTYPE, EventLog, HOME_SIDE, render_events
+from sim_fixtures import make_game
+from common import GameEvent
+
+
+class TestEventLog(unittest.TestCase):
+    def test_renders_play_by_play(self):
+        game = make_game()
+        log = EventLog(capacity=2)
+        log.append(GameEvent.HALF_START, value=3, value2=HOME_SIDE)
+        log.append(GameEvent.AT_BAT, "home_1", "away_9")
+        log.append(GameEvent.STEAL, "home_1", value=2)
+        log.append(GameEvent.SCORE, value=17, value2=-3)
+        log.append(GameEvent.SUN2_WIN, value2=AWAY_SIDE)
+        log.append(GameEvent.ON_BASE, "missing", base=2)
+        self.assertEqual(render_events(log, game.home_team, game.away_team), [
+            "\nBottom of the 3, home batting.",
+            "home_1 at bat. away_9 pitching.",
+            "Runner home_1 steals base 2.",
+            "away: 1.7  home: -0.3.",
+            "Sun2 sets a win upon the TACOS.",
+            "Unknown Player (missing) is on base 2.",
+        ])
+        self.assertEqual(log.players, ["home_1", "away_9", "missing"])
+
+    def test_game_records_compact_events(self):
+        game = make_game(seed=2)
+        _, _, game_log = game.simulate_game()
+        self.assertEqual(game_log[:2], ["Play ball.", "\nTop of the 1, away batting."])
+        self.assertEqual(len(game_log), game.events.size)
+        self.assertEqual(game.events.nbytes(), game.events.size * EVENT_DTYPE.itemsize)
+        kept = game.events.copy()
+        game.reset_game_state()
+        self.assertEqual(game.game_log, game_log[:3])
+        self.assertEqual(render_events(kept, game.home_team, game.away_team), game_log)
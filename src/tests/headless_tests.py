@@ -0,0 +1,22 @@
+import unittest
+
+from sim_fixtures import make_game
+from common import BlaseballStatistics as Stats
+
+
+class TestHeadlessGame(unittest.TestCase):
+    def test_plays_the_same_game_without_a_log(self):
+        logged = make_game(seed=3)
+        headless = make_game(seed=3, headless=True)
+        for _ in range(5):
+            logged_scores = logged.simulate_game()[:2]
+            headless_scores = headless.simulate_game()[:2]
+            self.assertEqual(logged_scores, headless_scores)
+            self.assertGreater(len(logged.game_log), 100)
+            self.assertEqual(headless.game_log, ["Play ball."])
+            logged.reset_game_state()
+            headless.reset_game_state()
+        for logged_team, headless_team in [(logged.home_team, headless.home_team),
+                                           (logged.away_team, headless.away_team)]:
+            for player_id, stats in logged_team.game_stats.items():
+                self.assertEqual(stats.get(Stats.BATTER_HITS), headless_team.game_stats[player_id].get(Stats.BATTER_HITS))
@@ -0,0 +1,66 @@
+import math
+import unittest
+
+import numpy as np
+
+from common import MachineLearnedModel as Ml
+from common import RareEvent, SimulationGranularity, Weather
+from event_log import AWAY_SIDE, HOME_SIDE
+from importance_sim import estimate_rare_event, event_happened, RareEventEstimate
+from sampling import IterationStreams, OutcomeTilt
+from sim_fixtures import make_game
+
+
+class TestImportanceSim(unittest.TestCase):
+    def test_tilt_reweights_to_the_model_probabilities(self):
+        probs = [0.3, 0.2, 0.15, 0.1, 0.2, 0.05]
+        tilted, log_ratios = OutcomeTilt(0.4).tilt(Ml.PITCH, np.array(probs))
+        self.assertAlmostEqual(sum(tilted), 1.0)
+        self.assertGreater(tilted[3], probs[3])
+        self.assertLess(tilted[4], probs[4])
+        for prob, tilted_prob, log_ratio in zip(probs, tilted, log_ratios):
+            self.assertAlmostEqual(tilted_prob * math.exp(log_ratio), prob)
+        self.assertEqual(OutcomeTilt(0.0).tilt(Ml.HIT_TYPE, [0.5, 0.3, 0.1, 0.1]),
+                         ([0.5, 0.3, 0.1, 0.1], [0.0, 0.0, 0.0, 0.0]))
+
+    def test_untilted_games_are_unchanged(self):
+        for granularity in [SimulationGranularity.PITCH, SimulationGranularity.PLATE_APPEARANCE]:
+            scores = []
+            for tilt in [None, OutcomeTilt(0.0)]:
+                game = make_game(Weather.ECLIPSE, seed=3, headless=True, granularity=granularity,
+                                 use_matchup_table=True)
+                game.set_outcome_tilt(HOME_SIDE, tilt)
+                scores.append(game.simulate_game()[:2])
+                self.assertEqual(game.log_likelihood_ratio, 0.0)
+            self.assertEqual(scores[0], scores[1])
+
+    def test_weighted_games_estimate_the_plain_chance(self):
+        for granularity in [SimulationGranularity.PITCH, SimulationGranularity.PLATE_APPEARANCE]:
+            game = make_game(Weather.ECLIPSE, seed=3, headless=True, granularity=granularity,
+                             use_matchup_table=True)
+            streams = IterationStreams(4)
+            plain = []
+            for x in range(200):
+                game.set_random_stream(streams.stream(x))
+                game.simulate_game()
+                plain.append(1.0 if event_happened(RareEvent.OVER_TEN, game.home_score_tenths) else 0.0)
+                game.reset_game_state()
+            estimate = RareEventEstimate(game, HOME_SIDE, RareEvent.OVER_TEN, 5, 0.15)
+            estimate.run(200)
+            self.assertGreater(estimate.hits, sum(plain))
+            plain_error = np.std(plain, ddof=1) / math.sqrt(len(plain))
+            self.assertLess(abs(estimate.probability() - np.mean(plain)),
+                            3.0 * math.hypot(plain_error, estimate.standard_error()))
+            self.assertIsNone(game.tilt)
+
+    def test_estimates_stop_at_the_relative_error(self):
+        game = make_game(Weather.ECLIPSE, seed=3, headless=True)
+        estimate = estimate_rare_event(game, AWAY_SIDE, RareEvent.OVER_TEN, 6, relative_error=0.05)
+        self.assertLessEqual(estimate.relative_error(), 0.05)
+        # the away side scores over ten most games, so it isn't tilted at all
+        self.assertEqual(estimate.tilt.theta, 0.0)
+        self.assertEqual(estimate.weights.count(1.0), estimate.hits)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+import numpy as np
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from common import InferenceBackend
+from inference import build_model, CompiledLinearModel, CompiledTreeEnsemble
+from model_registry import model_registry, SHIPPED_MODEL_SET
+
+TOLERANCE = 1e-9
+
+
+class TestInference(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.RandomState(1234)
+
+    def assert_parity(self, estimator, compiled, X):
+        expected = estimator.predict_proba(X)
+        np.testing.assert_allclose(compiled.predict_proba(X), expected, rtol=0, atol=TOLERANCE)
+        # single rows are passed the same way generic_model_roll passes them
+        for row in X[:25]:
+            np.testing.assert_allclose(
+                compiled.predict_proba([list(row)])[0], estimator.predict_proba([row])[0], rtol=0, atol=TOLERANCE
+            )
+
+
+class TestShippedModels(TestInference):
+    def test_shipped_model_parity(self):
+        for model in SHIPPED_MODEL_SET.models:
+            estimator = model_registry.get_model(SHIPPED_MODEL_SET, model)
+            compiled = model_registry.get_backend_model(SHIPPED_MODEL_SET, model, InferenceBackend.NUMPY)
+            self.assertIsNot(estimator, compiled)
+            X = self.rng.uniform(-0.5, 1.5, size=(500, estimator.n_features_in_))
+            self.assert_parity(estimator, compiled, X)
+
+    def test_backend_cached(self):
+        first = model_registry.get_models(SHIPPED_MODEL_SET, InferenceBackend.NUMPY)
+        second = model_registry.get_models(SHIPPED_MODEL_SET, InferenceBackend.NUMPY)
+        for model in SHIPPED_MODEL_SET.models:
+            self.assertIs(first[model], second[model])
+        sklearn_models = model_registry.get_models(SHIPPED_MODEL_SET)
+        for model in SHIPPED_MODEL_SET.models:
+            self.assertIs(sklearn_models[model], model_registry.get_model(SHIPPED_MODEL_SET, model))
+
+
+class TestEstimatorTypes(TestInference):
+    def make_data(self, num_classes):
+        X = self.rng.uniform(0, 1, size=(400, 8))
+        y = np.digitize(X[:, 0] + 0.3 * X[:, 1] + self.rng.normal(0, 0.1, 400), np.linspace(0.2, 1.1, num_classes - 1))
+        return X, y
+
+    def test_logistic_regression(self):
+        # without intercepts every class scores the same on a row of zeros, so that can't tell the normalizations apart
+        for num_classes, solver, fit_intercept in [(2, "liblinear", True), (2, "lbfgs", True), (5, "lbfgs", True),
+                                                   (5, "lbfgs", False)]:
+            X, y = self.make_data(num_classes)
+            estimator = LogisticRegression(solver=solver, fit_intercept=fit_intercept).fit(X, y)
+            compiled = build_model(estimator, InferenceBackend.NUMPY)
+            self.assertIsInstance(compiled, CompiledLinearModel)
+            self.assert_parity(estimator, compiled, X)
+
+    def test_trees(self):
+        for num_classes in [2, 4]:
+            X, y = self.make_data(num_classes)
+            for estimator in [
+                DecisionTreeClassifier(max_depth=6, random_state=0),
+                RandomForestClassifier(n_estimators=15, max_depth=7, random_state=0),
+                ExtraTreesClassifier(n_estimators=15, random_state=0),
+            ]:
+                estimator.fit(X, y)
+                compiled = build_model(estimator, InferenceBackend.NUMPY)
+                self.assertIsInstance(compiled, CompiledTreeEnsemble)
+                self.assert_parity(estimator, compiled, X)
+
+    def test_unsupported_falls_back(self):
+        from sklearn.naive_bayes import GaussianNB
+        X, y = self.make_data(3)
+        estimator = GaussianNB().fit(X, y)
+        self.assertIs(build_model(estimator, InferenceBackend.NUMPY), estimator)
+        self.assertIs(build_model(estimator, InferenceBackend.SKLEARN), estimator)
@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+import unittest
+
+from common import JobStatus
+from job_queue import JobQueue
+
+
+def count_games(params, progress):
+    progress.add_total(params["games"])
+    for _ in range(params["games"]):
+        progress.advance()
+    return {"games": params["games"]}
+
+
+def fail(params, progress):
+    raise ValueError("no stlats")
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def make_queue(self):
+        queue = JobQueue(self.directory.name)
+        queue.register("count", count_games)
+        queue.register("fail", fail)
+        self.addCleanup(queue.close)
+        return queue
+
+    def test_jobs_report_progress_and_results(self):
+        queue = self.make_queue()
+        job = queue.wait(queue.submit("count", {"games": 7}).job_id)
+        self.assertEqual(job.status, JobStatus.DONE)
+        self.assertEqual((job.done, job.total, job.eta), (7, 7, 0.0))
+        self.assertEqual(job.result, {"games": 7})
+        failed = queue.wait(queue.submit("fail", {}).job_id)
+        self.assertEqual(failed.status, JobStatus.FAILED)
+        self.assertIn("no stlats", failed.error)
+        with self.assertRaises(ValueError):
+            queue.submit("powerrankings", {})
+
+    def test_finished_jobs_survive_a_restart(self):
+        queue = self.make_queue()
+        job_id = queue.submit("count", {"games": 3}).job_id
+        queue.wait(job_id)
+        restarted = self.make_queue()
+        self.assertEqual(restarted.get(job_id).status, JobStatus.DONE)
+        self.assertEqual(restarted.get(job_id).result, {"games": 3})
+        self.assertIsNone(restarted.get("missing"))
+
+    def test_jobs_of_a_gone_process_are_failed(self):
+        queue = self.make_queue()
+        job = queue.wait(queue.submit("count", {"games": 1}).job_id)
+        raw = job.to_dict()
+        # a pid no process can have
+        raw.update({"job_id": "orphan", "status": JobStatus.RUNNING.name, "pid": 2 ** 22 + 1})
+        with open(os.path.join(self.directory.name, "orphan.json"), 'w') as file:
+            json.dump(raw, file)
+        orphan = self.make_queue().get("orphan")
+        self.assertEqual(orphan.status, JobStatus.FAILED)
+        self.assertEqual(orphan.error, "interrupted by a restart")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import random
+import unittest
+
+from lockstep_sim import LockstepSimulation
+from sim_fixtures import make_game
+from team_state import TEAM_ID
+from common import BlaseballStatistics as Stats
+from common import Weather
+
+
+class TestLockstepSimulation(unittest.TestCase):
+    def test_single_lane_matches_sequential(self):
+        random.seed(7)
+        game = make_game()
+        expected = []
+        for _ in range(5):
+            home_score, away_score, _ = game.simulate_game()
+            expected.append((home_score, away_score))
+            game.reset_game_state()
+        random.seed(7)
+        game = make_game()
+        self.assertEqual(LockstepSimulation([game], 5, lanes=1).run(), [expected])
+
+    def test_lanes_merge_stats(self):
+        random.seed(11)
+        games = [make_game(), make_game(Weather.SUN2)]
+        sim = LockstepSimulation(games, 20, lanes=8)
+        all_scores = sim.run()
+        self.assertEqual([len(scores) for scores in all_scores], [20, 20])
+        self.assertEqual(len(sim.lanes), 16)
+        self.assertGreater(sim.batches, 0)
+        for game, scores in zip(games, all_scores):
+            home_wins = sum(1 for home_score, away_score in scores if home_score > away_score)
+            self.assertEqual(game.home_team.game_stats[TEAM_ID][Stats.TEAM_WINS], home_wins)
+            self.assertEqual(game.away_team.game_stats[TEAM_ID][Stats.TEAM_LOSSES], home_wins)
+            self.assertEqual(game.home_team.game_stats[game.home_team.starting_pitcher][Stats.PITCHER_GAMES_APPEARED],
+                             20)
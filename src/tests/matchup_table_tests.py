@@ -0,0 +1,59 @@
+import random
+import unittest
+
+import numpy as np
+
+from common import MachineLearnedModel as Ml
+from common import AdditiveTypes, PlayerBuff
+from sim_fixtures import make_game
+
+
+class TestMatchupTable(unittest.TestCase):
+    def setUp(self):
+        self.game = make_game(use_matchup_table=True)
+        self.table = self.game.matchup_table
+
+    def test_rows_match_model(self):
+        self.assertEqual(len(self.table.rows), 18)
+        batting, pitching = self.game.away_team, self.game.home_team
+        row = self.table.get_row(batting, pitching)
+        features = [self.table.feature_vector(batting, pitching, batting.cur_batter)]
+        for model in [Ml.PITCH, Ml.HIT_TYPE, Ml.OUT_TYPE]:
+            np.testing.assert_allclose(row.probs[model], self.game.clf[model].predict_proba(features)[0], atol=1e-12)
+
+    def test_row_invalidation(self):
+        batting, pitching = self.game.away_team, self.game.home_team
+        row = self.table.get_row(batting, pitching)
+        self.assertIs(self.table.get_row(batting, pitching), row)
+        builds = self.table.builds
+        batting.player_additives[batting.cur_batter][AdditiveTypes.BATTING] *= 1.2
+        batting.mark_additives_changed(batting.cur_batter)
+        new_row = self.table.get_row(batting, pitching)
+        self.assertIsNot(new_row, row)
+        self.assertEqual(self.table.builds, builds + 1)
+        self.assertFalse(np.allclose(new_row.probs[Ml.PITCH], row.probs[Ml.PITCH]))
+        # only the changed batter's row is rebuilt
+        self.table.prepare(self.game.home_team, self.game.away_team)
+        self.assertEqual(self.table.builds, builds + 1)
+        # a team wide change invalidates the team's own batters and every batter facing its pitcher
+        pitching.mark_additives_changed()
+        self.table.prepare(self.game.home_team, self.game.away_team)
+        self.assertEqual(self.table.builds, builds + 1 + 18)
+
+    def test_haunted_not_cached(self):
+        batting, pitching = self.game.away_team, self.game.home_team
+        batting.player_buffs[batting.cur_batter][PlayerBuff.HAUNTED] = 1
+        self.assertIsNone(self.table.get_row(batting, pitching))
+
+    def test_same_games_as_model_rolls(self):
+        results = []
+        for use_matchup_table in [False, True]:
+            random.seed(3)
+            game = make_game(use_matchup_table=use_matchup_table)
+            scores = []
+            for _ in range(10):
+                home_score, away_score, _ = game.simulate_game()
+                scores.append((home_score, away_score))
+                game.reset_game_state()
+            results.append(scores)
+        self.assertEqual(results[0], results[1])
@@ -0,0 +1,55 @@
+import threading
+import unittest
+
+from common import InferenceBackend
+from common import MachineLearnedModel as Ml
+from model_registry import ModelRegistry, ModelSet, SHIPPED_MODEL_SET
+
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        # a registry of its own, so the counts don't see what other tests loaded
+        self.registry = ModelRegistry()
+
+    def test_models_are_loaded_once(self):
+        first = self.registry.get_model(SHIPPED_MODEL_SET, Ml.PITCH)
+        self.assertIs(self.registry.get_model(SHIPPED_MODEL_SET, Ml.PITCH), first)
+        # another model set naming the same file shares the loaded model
+        same_files = ModelSet("copy", SHIPPED_MODEL_SET.directory, SHIPPED_MODEL_SET.version)
+        self.assertIs(self.registry.get_model(same_files, Ml.PITCH), first)
+        built = self.registry.get_backend_model(SHIPPED_MODEL_SET, Ml.PITCH, InferenceBackend.NUMPY)
+        self.assertIs(self.registry.get_backend_model(SHIPPED_MODEL_SET, Ml.PITCH, InferenceBackend.NUMPY), built)
+        self.assertIs(self.registry.get_backend_model(SHIPPED_MODEL_SET, Ml.PITCH, InferenceBackend.SKLEARN), first)
+
+    def test_warmup_loads_every_model(self):
+        self.assertFalse(self.registry.is_loaded(SHIPPED_MODEL_SET))
+        self.registry.warmup([SHIPPED_MODEL_SET])
+        self.assertTrue(self.registry.is_loaded(SHIPPED_MODEL_SET))
+        self.assertEqual(self.registry.stats()["loaded_models"], len(SHIPPED_MODEL_SET.models))
+
+    def test_unload(self):
+        self.registry.warmup([SHIPPED_MODEL_SET], InferenceBackend.NUMPY)
+        first = self.registry.get_model(SHIPPED_MODEL_SET, Ml.PITCH)
+        self.registry.unload(SHIPPED_MODEL_SET)
+        self.assertFalse(self.registry.is_loaded(SHIPPED_MODEL_SET))
+        self.assertEqual(self.registry.stats()["built_models"], 0)
+        self.assertIsNot(self.registry.get_model(SHIPPED_MODEL_SET, Ml.PITCH), first)
+        self.registry.unload()
+        self.assertEqual(self.registry.stats()["loaded_models"], 0)
+
+    def test_stats_count_loads_and_hits(self):
+        self.registry.get_model(SHIPPED_MODEL_SET, Ml.PITCH)
+        self.registry.get_model(SHIPPED_MODEL_SET, Ml.HIT_TYPE)
+        threads = [threading.Thread(target=lambda: [self.registry.get_model(SHIPPED_MODEL_SET, Ml.PITCH)
+                                                    for _ in range(100)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = self.registry.stats()
+        self.assertEqual((stats["loads"], stats["hits"]), (2, 400))
+        self.assertEqual(len(stats["loaded_paths"]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from common import ForbiddenKnowledge as FK
+from common import Weather
+from paired_sim import PAIRED_METRICS, PairedSimulation
+from sim_fixtures import make_game
+
+
+def boost_home_batting(game):
+    for player_id in game.home_team.lineup.values():
+        game.home_team.stlats[player_id] = dict(game.home_team.stlats[player_id])
+        game.home_team.stlats[player_id][FK.DIVINITY] *= 1.3
+        game.home_team.stlats[player_id][FK.MOXIE] *= 1.3
+    return game
+
+
+class TestPairedSimulation(unittest.TestCase):
+    def test_identical_scenarios_have_no_difference(self):
+        paired = PairedSimulation([make_game(Weather.ECLIPSE, headless=True) for _ in range(2)], seed=3)
+        paired.run(10)
+        summary = paired.summary()
+        self.assertEqual(summary["iterations"], 10)
+        self.assertEqual(summary["scenarios"][0], summary["scenarios"][1])
+        for metric in PAIRED_METRICS:
+            self.assertEqual(summary["differences"][0][metric]["mean"], 0.0)
+            self.assertEqual(summary["differences"][0][metric]["standard_error"], 0.0)
+        self.assertGreater(summary["differences"][0]["home_score"]["unpaired_standard_error"], 0.0)
+
+    def test_pairing_reduces_the_standard_error(self):
+        summaries = []
+        for _ in range(2):
+            paired = PairedSimulation([make_game(Weather.ECLIPSE, headless=True),
+                                       boost_home_batting(make_game(Weather.ECLIPSE, headless=True))], seed=4)
+            paired.run(30)
+            summaries.append(paired.summary())
+        self.assertEqual(summaries[0], summaries[1])
+        differences = summaries[0]["differences"][0]
+        for metric in ["home_score", "away_score"]:
+            self.assertLess(differences[metric]["standard_error"], differences[metric]["unpaired_standard_error"] / 2)
+        self.assertGreater(differences["home_score"]["mean"], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
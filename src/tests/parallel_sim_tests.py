@@ -0,0 +1,65 @@
+import pickle
+import time
+import unittest
+
+from adaptive_sim import AdaptiveGame, run_adaptive, run_fixed
+from common import Weather
+from parallel_sim import GamePool, run_longest_first
+from sampling import derive_seed
+from sim_fixtures import make_game
+
+
+def make_games():
+    # coffee leaves wired and tired buffs on the teams, which mustn't carry into the next iteration
+    return [AdaptiveGame(make_game(weather, seed=1, headless=True), derive_seed(9, game_idx))
+            for game_idx, weather in enumerate([Weather.SUN2, Weather.ECLIPSE, Weather.PEANUTS, Weather.COFFEE])]
+
+
+def start_job(name):
+    return name, time.monotonic()
+
+
+class TestParallelSim(unittest.TestCase):
+    def test_games_pickle_without_their_models(self):
+        game = make_game(Weather.ECLIPSE, seed=2, headless=True, use_matchup_table=True)
+        copy = pickle.loads(pickle.dumps(game))
+        self.assertIs(copy.clf[next(iter(game.clf))], game.clf[next(iter(game.clf))])
+        self.assertIs(copy.matchup_table.clf, copy.clf)
+        self.assertIn(copy.cur_batting_team, [copy.home_team, copy.away_team])
+        self.assertEqual(copy.simulate_game()[:2], game.simulate_game()[:2])
+
+    def test_pool_matches_serial_run(self):
+        serial = make_games()
+        run_fixed(serial, 25, chunk_size=10)
+        parallel = make_games()
+        with GamePool(2) as pool:
+            run_fixed(parallel, 25, chunk_size=10, pool=pool)
+        for serial_game, parallel_game in zip(serial, parallel):
+            self.assertEqual(parallel_game.home_scores, serial_game.home_scores)
+            self.assertEqual(parallel_game.away_scores, serial_game.away_scores)
+            self.assertEqual(parallel_game.home_wins, serial_game.home_wins)
+            for serial_team, parallel_team in [(serial_game.game.home_team, parallel_game.game.home_team),
+                                               (serial_game.game.away_team, parallel_game.game.away_team)]:
+                self.assertEqual(parallel_team.game_stats, serial_team.game_stats)
+                self.assertEqual(parallel_team.segmented_stats, serial_team.segmented_stats)
+
+    def test_pool_runs_adaptive_games(self):
+        games = make_games()
+        with GamePool(2) as pool:
+            run_adaptive(games, 0.25, 40, 100, chunk_size=10, pool=pool)
+        serial = make_games()
+        run_adaptive(serial, 0.25, 40, 100, chunk_size=10)
+        self.assertEqual([game.home_scores for game in games], [game.home_scores for game in serial])
+        self.assertGreater(sum(game.iterations for game in games), 90)
+
+    def test_longest_jobs_start_first(self):
+        jobs = [("short",), ("long",), ("middle",), ("longest",)]
+        outcomes = run_longest_first(start_job, jobs, [1.0, 5.0, 3.0, 9.0], workers=1)
+        # the results come back in job order whatever order the jobs ran in
+        self.assertEqual([name for name, _ in outcomes], ["short", "long", "middle", "longest"])
+        started = [name for name, _ in sorted(outcomes, key=lambda outcome: outcome[1])]
+        self.assertEqual(started, ["longest", "long", "middle", "short"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import math
+import random
+import unittest
+
+from plate_appearance import PlateAppearanceChain
+from sim_fixtures import make_game
+from common import BlaseballStatistics as Stats
+from common import PlateAppearanceOutcome as Pa
+from common import SimulationGranularity
+
+PITCH_PROBS = [0.35, 0.1, 0.2, 0.1, 0.15, 0.1]
+
+
+def count_sim(rng, balls_for_walk, strikes_for_out, fiery_chance, flinch, steal_chance):
+    """Play out a count pitch by pitch with the rules of GameState.pitch_sim"""
+    balls, strikes, pitches = 0, 0, 0
+    while True:
+        pitches += 1
+        roll, total, pitch = rng.random(), 0.0, 5
+        for idx, prob in enumerate(PITCH_PROBS):
+            total += prob
+            if roll < total:
+                pitch = idx
+                break
+        num_strikes = 2 if rng.random() < fiery_chance else 1
+        if pitch == 0:
+            balls += 1
+            if balls == balls_for_walk:
+                return Pa.WALK, pitches
+        elif pitch in [1, 5]:
+            strikes += num_strikes
+            if strikes >= strikes_for_out:
+                return Pa.STRIKEOUT, pitches
+        elif pitch == 2:
+            if strikes < strikes_for_out - 1:
+                strikes += 2 if num_strikes == 2 and strikes < strikes_for_out - 2 else 1
+        elif flinch and strikes == 0:
+            strikes += 1
+        else:
+            return Pa.HIT if pitch == 3 else Pa.OUT, pitches
+        if rng.random() < steal_chance:
+            return Pa.STEAL_ATTEMPT, pitches
+
+
+class TestPlateAppearanceChain(unittest.TestCase):
+    def test_certain_walk(self):
+        chain = PlateAppearanceChain([1.0, 0.0, 0.0, 0.0, 0.0, 0.0], 4, 3)
+        self.assertEqual(len(chain.exits()), 1)
+        pa_exit = chain.exits()[0]
+        self.assertEqual((pa_exit.outcome, pa_exit.balls, pa_exit.strikes), (Pa.WALK, 4, 0))
+        self.assertAlmostEqual(pa_exit.probability, 1.0)
+        self.assertAlmostEqual(pa_exit.pitches, 4.0)
+        self.assertAlmostEqual(pa_exit.balls_thrown, 4.0)
+        self.assertAlmostEqual(chain.outcome_probs(2, 1)[Pa.WALK], 1.0)
+        self.assertAlmostEqual(chain.expected_pitches(2, 1), 2.0)
+
+    def test_matches_pitch_by_pitch_count(self):
+        for balls_for_walk, strikes_for_out, fiery_chance, flinch, steal_chance in [
+            (4, 3, 0.0, False, 0.0),
+            (4, 3, 0.25, True, 0.0),
+            (5, 4, 0.25, False, 0.1),
+        ]:
+            chain = PlateAppearanceChain(
+                PITCH_PROBS, balls_for_walk, strikes_for_out, fiery_chance, flinch, steal_chance
+            )
+            rng = random.Random(7)
+            num_samples = 20000
+            counts = {outcome: 0 for outcome in Pa}
+            pitches = 0
+            for _ in range(num_samples):
+                outcome, num_pitches = count_sim(
+                    rng, balls_for_walk, strikes_for_out, fiery_chance, flinch, steal_chance
+                )
+                counts[outcome] += 1
+                pitches += num_pitches
+            for outcome, prob in chain.outcome_probs().items():
+                error = 4 * math.sqrt(prob * (1 - prob) / num_samples) + 1e-9
+                self.assertAlmostEqual(counts[outcome] / num_samples, prob, delta=error)
+            self.assertAlmostEqual(pitches / num_samples, chain.expected_pitches(), delta=0.05)
+            self.assertAlmostEqual(sum(chain.outcome_probs().values()), 1.0)
+
+
+class TestPlateAppearanceGranularity(unittest.TestCase):
+    def play(self, granularity):
+        random.seed(23)
+        game = make_game(use_matchup_table=True, granularity=granularity)
+        for _ in range(120):
+            game.simulate_game()
+            game.reset_game_state()
+        totals = {}
+        for team in [game.home_team, game.away_team]:
+            for player_stats in team.game_stats.values():
+                for stat in [Stats.BATTER_PLATE_APPEARANCES, Stats.BATTER_WALKS, Stats.BATTER_STRIKEOUTS,
+                             Stats.BATTER_HITS, Stats.BATTER_PITCHES_FACED, Stats.STOLEN_BASE_ATTEMPTS]:
+                    totals[stat] = totals.get(stat, 0.0) + player_stats.get(stat, 0.0)
+        return totals
+
+    def test_matches_pitch_granularity(self):
+        pitch = self.play(SimulationGranularity.PITCH)
+        plate_appearance = self.play(SimulationGranularity.PLATE_APPEARANCE)
+        for stat in [Stats.BATTER_WALKS, Stats.BATTER_STRIKEOUTS, Stats.BATTER_HITS, Stats.STOLEN_BASE_ATTEMPTS]:
+            rates = [totals[stat] / totals[Stats.BATTER_PLATE_APPEARANCES] for totals in [pitch, plate_appearance]]
+            num_pas = min(pitch[Stats.BATTER_PLATE_APPEARANCES], plate_appearance[Stats.BATTER_PLATE_APPEARANCES])
+            error = 4 * math.sqrt(2 * rates[0] * (1 - rates[0]) / num_pas)
+            self.assertAlmostEqual(rates[0], rates[1], delta=error)
+        pitch_rates = [totals[Stats.BATTER_PITCHES_FACED] / totals[Stats.BATTER_PLATE_APPEARANCES]
+                       for totals in [pitch, plate_appearance]]
+        self.assertAlmostEqual(pitch_rates[0], pitch_rates[1], delta=0.05 * pitch_rates[0])
@@ -0,0 +1,54 @@
+import json
+import os
+import tempfile
+import unittest
+
+import power_rankings
+from sim_fixtures import link_current_models, make_team
+
+TEAMS = ["b72f3061-f573-40d7-832a-5ad475bd7909", "878c1bf6-0d21-4659-bfee-916c8314d69c",
+         "b024e975-1c4a-4575-8936-a3754a08806a"]
+
+
+class TestPowerRankings(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        # the rankings read and write under ../season_sim, so they run from a src directory of their own
+        src_dir = os.path.join(directory.name, 'src')
+        bprm_dir = os.path.join(directory.name, 'season_sim', 'bprm')
+        models_dir = os.path.join(directory.name, 'season_sim', 'models')
+        for path in [src_dir, bprm_dir, models_dir]:
+            os.makedirs(path)
+        link_current_models(models_dir)
+        matches = [{"team_id": team_id, "team_name": power_rankings.team_name_map[team_id],
+                    "matches": [o_team for o_team in TEAMS if o_team != team_id]} for team_id in TEAMS]
+        with open(os.path.join(bprm_dir, 'matches.json'), 'w') as file:
+            json.dump(matches, file)
+        cwd = os.getcwd()
+        os.chdir(src_dir)
+        self.addCleanup(os.chdir, cwd)
+        self.bprm_dir = bprm_dir
+        for idx, team_id in enumerate(TEAMS):
+            power_rankings.team_states[team_id] = make_team(team_id, f"team{idx}", idx == 0, idx)
+        self.addCleanup(power_rankings.team_states.clear)
+
+    def run_rankings(self, workers):
+        # enough games that some are in coffee weather, whose buffs would carry into later matchups on shared teams
+        power_rankings.run_sim(15, 20, seed=5, workers=workers)
+        outputs = {}
+        for name in ['15_20_iter_results.json', '15_20_iter_all_pitchers.json', 'weathers.json']:
+            with open(os.path.join(self.bprm_dir, name), 'r') as file:
+                outputs[name] = json.load(file)
+        return outputs
+
+    def test_workers_get_the_serial_results(self):
+        serial = self.run_rankings(1)
+        self.assertEqual(sum(serial['weathers.json'].values()), 60)
+        self.assertEqual(self.run_rankings(2), serial)
+        # the shared team states aren't played on, so a second serial run is the same too
+        self.assertEqual(self.run_rankings(1), serial)
+
+
+if __name__ == '__main__':
+    unittest.main()
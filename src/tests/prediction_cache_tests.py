@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+
+from common import MachineLearnedModel as Ml
+from model_registry import model_registry, SHIPPED_MODEL_SET
+from prediction_cache import PredictionCache
+
+
+class TestPredictionCache(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.RandomState(1234)
+        self.clf = model_registry.get_model(SHIPPED_MODEL_SET, Ml.PITCH)
+        self.fv = [list(self.rng.uniform(0, 1, size=self.clf.n_features_in_))]
+
+    def test_exact_key(self):
+        cache = PredictionCache(max_size=4)
+        first = cache.get_probs(Ml.PITCH, self.clf, self.fv)
+        second = cache.get_probs(Ml.PITCH, self.clf, [list(self.fv[0])])
+        self.assertIs(first, second)
+        np.testing.assert_array_equal(first, self.clf.predict_proba(self.fv)[0])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        nudged = [list(self.fv[0])]
+        nudged[0][0] += 1e-12
+        cache.get_probs(Ml.PITCH, self.clf, nudged)
+        self.assertEqual(cache.misses, 2)
+
+    def test_quantized_key(self):
+        cache = PredictionCache(max_size=4, precision=3)
+        cache.get_probs(Ml.PITCH, self.clf, self.fv)
+        nudged = [list(self.fv[0])]
+        nudged[0][0] += 1e-7
+        cache.get_probs(Ml.PITCH, self.clf, nudged)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_lru_eviction(self):
+        cache = PredictionCache(max_size=2)
+        fvs = [[list(self.rng.uniform(0, 1, size=self.clf.n_features_in_))] for _ in range(3)]
+        cache.get_probs(Ml.PITCH, self.clf, fvs[0])
+        cache.get_probs(Ml.PITCH, self.clf, fvs[1])
+        cache.get_probs(Ml.PITCH, self.clf, fvs[0])
+        cache.get_probs(Ml.PITCH, self.clf, fvs[2])
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        # fvs[1] was least recently used so it was the one evicted
+        cache.get_probs(Ml.PITCH, self.clf, fvs[0])
+        self.assertEqual(cache.hits, 2)
+        cache.get_probs(Ml.PITCH, self.clf, fvs[1])
+        self.assertEqual(cache.misses, 4)
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from result_cache import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.data_dir = directory.name
+        os.makedirs(os.path.join(self.data_dir, 'stlats'))
+        os.makedirs(os.path.join(self.data_dir, 'season_data'))
+        self.write_stlats('{"a": 1}')
+        with open(os.path.join(self.data_dir, 'season_data', 'season25.json'), 'w') as file:
+            file.write('[]')
+        self.runs = 0
+
+    def write_stlats(self, content):
+        with open(os.path.join(self.data_dir, 'stlats', 's24_preseason_stlats.json'), 'w') as file:
+            file.write(content)
+
+    def make_cache(self, **kwargs):
+        return ResultCache(os.path.join(self.data_dir, 'cache'), data_dir=self.data_dir, **kwargs)
+
+    def run_sim(self):
+        self.runs += 1
+        return {"run": self.runs}
+
+    def test_identical_requests_are_cached(self):
+        cache = self.make_cache()
+        params = {"iterations": 100, "season": 24, "seed": 3}
+        self.assertEqual(cache.get_or_compute('seasonsim', params, self.run_sim), {"run": 1})
+        self.assertEqual(cache.get_or_compute('seasonsim', dict(params, workers=4), self.run_sim), {"run": 1})
+        # another process reads the same entries
+        self.assertEqual(self.make_cache().get_or_compute('seasonsim', params, self.run_sim), {"run": 1})
+        self.assertEqual(cache.get_or_compute('seasonsim', dict(params, seed=4), self.run_sim), {"run": 2})
+        self.assertEqual(cache.get_or_compute('seasonsim', dict(params, cache=False), self.run_sim), {"run": 3})
+        self.write_stlats('{"a": 2}')
+        self.assertEqual(cache.get_or_compute('seasonsim', params, self.run_sim), {"run": 4})
+        # without its stlats on disk what a season plays is only known once the run fetches them
+        self.assertEqual(cache.get_or_compute('seasonsim', dict(params, season=23), self.run_sim), {"run": 5})
+        self.assertEqual(cache.get_or_compute('seasonsim', dict(params, season=23), self.run_sim), {"run": 6})
+
+    def test_daily_requests_key_on_the_live_games(self):
+        cache = self.make_cache()
+        params = {"iterations": 100, "day": 5, "seed": 3}
+        games = [{"homeTeam": "a", "awayTeam": "b", "homePitcher": "p", "gameComplete": False}]
+        live = {"season": 24, "day": 5, "games": games, "team_ids": ["a", "b"]}
+        self.assertEqual(cache.get_or_compute('dailysim', params, self.run_sim, live_data=live), {"run": 1})
+        self.assertEqual(cache.get_or_compute('dailysim', params, self.run_sim, live_data=live), {"run": 1})
+        finished = dict(live, games=[dict(games[0], gameComplete=True)])
+        self.assertEqual(cache.get_or_compute('dailysim', params, self.run_sim, live_data=finished), {"run": 2})
+        new_pitcher = dict(live, games=[dict(games[0], homePitcher="q")])
+        self.assertEqual(cache.get_or_compute('dailysim', params, self.run_sim, live_data=new_pitcher), {"run": 3})
+
+    def test_entries_expire_and_fit_in_max_bytes(self):
+        cache = self.make_cache(ttl=60.0, max_bytes=200)
+        cache.put("old", {"payload": "x" * 50})
+        os.utime(cache._path("old"), (time.time() - 120, time.time() - 120))
+        self.assertIsNone(cache.get("old"))
+        for key in ["first", "second", "third"]:
+            cache.put(key, {"payload": "x" * 50})
+            time.sleep(0.01)
+        self.assertIsNone(cache.get("first"))
+        self.assertEqual(cache.get("third")["payload"], {"payload": "x" * 50})
+
+    def test_concurrent_requests_run_once(self):
+        cache = self.make_cache()
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_sim():
+            started.set()
+            release.wait(10)
+            return self.run_sim()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            cache.get_or_compute('seasonsim', {"season": 24}, slow_sim))) for _ in range(3)]
+        threads[0].start()
+        started.wait(10)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual(results, [{"run": 1}] * 3)
+        self.assertEqual(self.runs, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
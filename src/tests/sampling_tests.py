@@ -0,0 +1,134 @@
+import random
+import unittest
+
+import numpy as np
+
+from common import RandomSource, Weather
+from sampling import derive_seed, IterationStreams, RandomStream
+from sim_fixtures import make_game
+
+
+class TestRandomStream(unittest.TestCase):
+    def test_blocks_keep_stream_order(self):
+        single = RandomStream(5, block_size=7)
+        rolls = [single.random() for _ in range(20)]
+        mixed = RandomStream(5, block_size=7)
+        mixed_rolls = [mixed.random() for _ in range(3)] + list(mixed.uniforms(12)) + \
+            [mixed.random() for _ in range(5)]
+        self.assertEqual(rolls, mixed_rolls)
+        self.assertEqual(rolls[:7], list(np.random.default_rng(5).random(7)))
+
+    def test_choice_always_picks_an_outcome(self):
+        stream = RandomStream(3)
+        # sums short of 1 used to return None for rolls above the total
+        short = [0.2, 0.3, 0.4999]
+        counts = [0, 0, 0]
+        for _ in range(20000):
+            counts[stream.choice(short)] += 1
+        self.assertEqual(sum(counts), 20000)
+        for count, prob in zip(counts, short):
+            self.assertAlmostEqual(count / 20000, prob / sum(short), delta=0.02)
+        self.assertEqual(stream.choice(np.array([0.0, 1.0, 0.0])), 1)
+
+    def test_choices_matches_choice(self):
+        probs = np.array([[0.1, 0.6, 0.3], [0.5, 0.25, 0.25], [0.0, 0.0, 1.0]])
+        rows = np.tile(probs, (4000, 1))
+        picks = RandomStream(9).choices(rows)
+        self.assertEqual(picks.shape, (12000,))
+        self.assertTrue(np.all(picks[2::3] == 2))
+        for row_idx, row in enumerate(probs):
+            freqs = np.bincount(picks[row_idx::3], minlength=3) / 4000
+            np.testing.assert_allclose(freqs, row, atol=0.03)
+        # one batched draw consumes the same rolls as single draws
+        single = RandomStream(9)
+        self.assertEqual([single.choice(row) for row in rows[:30]], list(RandomStream(9).choices(rows[:30])))
+
+    def test_games_replay_from_seed(self):
+        scores = []
+        for _ in range(2):
+            game = make_game(seed=42)
+            home_score, away_score, _ = game.simulate_game()
+            scores.append((home_score, away_score, len(game.game_log)))
+        self.assertEqual(scores[0], scores[1])
+        # without a seed the stream is seeded from the random module
+        random.seed(4)
+        first = make_game().rng.random()
+        random.seed(4)
+        self.assertEqual(make_game().rng.random(), first)
+
+    def test_derived_streams_replay_in_any_order(self):
+        first = [RandomStream(derive_seed(11, key)).random() for key in range(4)]
+        second = [RandomStream(derive_seed(11, key)).random() for key in reversed(range(4))]
+        self.assertEqual(first, list(reversed(second)))
+        self.assertEqual(len(set(first)), 4)
+        self.assertEqual(RandomStream(11).child(2, 5).random(), RandomStream(derive_seed(derive_seed(11, 2), 5)).random())
+        # spawned streams don't depend on how far the parent has rolled
+        stream = RandomStream(11)
+        stream.uniforms(5000)
+        self.assertEqual(stream.spawn().random(), RandomStream(11).spawn().random())
+
+    def test_split_iterations_match_serial(self):
+        def play(iterations):
+            game = make_game()
+            scores = []
+            for iteration in iterations:
+                game.set_random_stream(RandomStream(derive_seed(8, iteration)))
+                home_score, away_score, _ = game.simulate_game()
+                scores.append((home_score, away_score))
+                game.reset_game_state()
+            return scores
+
+        serial = play(range(6))
+        # as if the iterations were handed to two workers, each with its own copy of the game
+        self.assertEqual(serial, play(range(3)) + play(range(3, 6)))
+
+    def test_teams_roll_from_the_game_stream(self):
+        game = make_game(seed=1)
+        self.assertIs(game.home_team.rng, game.rng)
+        self.assertIs(game.away_team.rng, game.rng)
+        clone = game.clone()
+        self.assertIs(clone.home_team.rng, clone.rng)
+        self.assertIsNot(clone.rng, game.rng)
+
+    def test_reseed_restarts_every_holder(self):
+        game = make_game(seed=1)
+        game.rng.random()
+        game.rng.reseed(derive_seed(7, 1, 2))
+        expected = RandomStream(derive_seed(7, 1, 2)).uniforms(3).tolist()
+        self.assertEqual([game.home_team._random_roll(), game.away_team._random_roll(), game._random_roll()], expected)
+
+
+class TestIterationStreams(unittest.TestCase):
+    def test_pseudo_iterations_roll_from_derived_seeds(self):
+        streams = IterationStreams(6)
+        self.assertEqual(streams.stream(3).uniforms(5).tolist(), RandomStream(derive_seed(6, 3)).uniforms(5).tolist())
+        self.assertEqual(streams.stream(3, 1).random(), RandomStream(derive_seed(6, 3, 1)).random())
+
+    def test_antithetic_pairs_mirror_each_other(self):
+        streams = IterationStreams(6, RandomSource.ANTITHETIC)
+        first = streams.stream(4).uniforms(10000)
+        second = streams.stream(5).uniforms(10000)
+        np.testing.assert_allclose(first + second, 1.0)
+        self.assertTrue(np.all(second < 1.0))
+        self.assertFalse(np.allclose(streams.stream(6).uniforms(10), first[:10]))
+        self.assertTrue(streams.stream(5).child(2).antithetic)
+        # a pair plays two different games
+        game = make_game(Weather.SUN2, headless=True)
+        scores = []
+        for x in range(2):
+            game.set_random_stream(streams.stream(x))
+            scores.append(game.simulate_game()[:2])
+            game.reset_game_state()
+        self.assertNotEqual(scores[0], scores[1])
+
+    def test_sobol_points_lead_each_iteration(self):
+        streams = IterationStreams(6, RandomSource.SOBOL, dimensions=8)
+        leads = np.array([streams.stream(x).uniforms(8) for x in range(128)])
+        # every dimension of the first 64 and first 128 points has one point in each of as many equal strata
+        for num_points in [64, 128]:
+            for dimension in range(8):
+                strata = np.floor(leads[:num_points, dimension] * num_points).astype(int)
+                self.assertEqual(sorted(strata.tolist()), list(range(num_points)))
+        stream = IterationStreams(6, RandomSource.SOBOL, dimensions=8).stream(3)
+        self.assertEqual(stream.uniforms(8).tolist(), leads[3].tolist())
+        self.assertEqual(stream.random(), RandomStream(derive_seed(6, 3)).random())
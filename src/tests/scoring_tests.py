@@ -0,0 +1,28 @@
+import unittest
+from decimal import Decimal
+
+from sim_fixtures import make_game
+from common import from_tenths, to_tenths, Weather
+
+
+class TestTenthsScoring(unittest.TestCase):
+    def test_conversions(self):
+        self.assertEqual(to_tenths(Decimal("1.0")), 10)
+        self.assertEqual(to_tenths(Decimal("0")), 0)
+        self.assertEqual(to_tenths("-0.3"), -3)
+        self.assertEqual(to_tenths(2.7), 27)
+        self.assertEqual(from_tenths(-4), Decimal("-0.4"))
+        self.assertEqual(str(from_tenths(10)), "1.0")
+
+    def test_partial_runs_stay_exact(self):
+        game = make_game(Weather.SUN2)
+        game.away_score = Decimal("9.5")
+        # three acidic unruns and a blaserunning steal
+        for amt in [-4, -4, -4, 2]:
+            game.increase_batting_team_runs(amt)
+        self.assertEqual(game.away_score, Decimal("8.5"))
+        game.increase_batting_team_runs(15)
+        # sun 2 takes ten runs off once the score reaches 10
+        self.assertEqual(game.away_score_tenths, 0)
+        game.home_score = Decimal("1.1")
+        self.assertEqual(game.home_score_tenths, 11)
@@ -0,0 +1,99 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+import season_sim
+from common import fk_key
+from sim_fixtures import link_current_models
+
+TEAMS = ["b72f3061-f573-40d7-832a-5ad475bd7909", "878c1bf6-0d21-4659-bfee-916c8314d69c",
+         "b024e975-1c4a-4575-8936-a3754a08806a", "adc5b394-8f76-416d-9ce9-813706877b84"]
+SEASON = 15
+DAYS = [0, 1, 2]
+
+
+def make_stlats(seed):
+    rng = random.Random(seed)
+    stlats = {}
+    for team_idx, team_id in enumerate(TEAMS):
+        positions = [(pos, "BATTER") for pos in range(1, 10)] + [(pos, "PITCHER") for pos in range(1, 3)]
+        for pos, position_type in positions:
+            player_id = f"{team_idx}_{position_type}_{pos}"
+            player = {fk_name: rng.random() for fk_name in fk_key.values()}
+            player.update({"leagueTeamId": team_id, "position_id": pos, "position_type": position_type,
+                           "name": player_id, "blood": None, "permAttr": []})
+            stlats[player_id] = player
+    return stlats
+
+
+def make_schedule():
+    games = []
+    for day in DAYS:
+        for home_idx, away_idx in [(0, 1), (2, 3)] if day % 2 == 0 else [(1, 2), (3, 0)]:
+            games.append({
+                "id": f"d{day}_{home_idx}_{away_idx}",
+                "day": day,
+                "homeTeam": TEAMS[home_idx],
+                "awayTeam": TEAMS[away_idx],
+                "homeTeamName": f"team{home_idx}",
+                "awayTeamName": f"team{away_idx}",
+                "homePitcher": f"{home_idx}_PITCHER_{day % 2 + 1}",
+                "awayPitcher": f"{away_idx}_PITCHER_{day % 2 + 1}",
+                "homeOdds": 0.5,
+                "awayOdds": 0.5,
+                "weather": 1 if day % 2 == 0 else 7,
+            })
+    return games
+
+
+class TestFullSeasonSim(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        # the season sim reads and writes under ../season_sim, so it runs from a src directory of its own
+        data_dir = os.path.join(directory.name, 'season_sim')
+        for path in [os.path.join(directory.name, 'src'), os.path.join(data_dir, 'models'),
+                     os.path.join(data_dir, 'stlats'), os.path.join(data_dir, 'season_data')]:
+            os.makedirs(path)
+        link_current_models(os.path.join(data_dir, 'models'))
+        with open(os.path.join(data_dir, 'ballparks.json'), 'w') as file:
+            json.dump({}, file)
+        with open(os.path.join(data_dir, 'season_data', f"season{SEASON + 1}.json"), 'w') as file:
+            json.dump(make_schedule(), file)
+        with open(os.path.join(data_dir, 'stlats', f"s{SEASON}_preseason_stlats.json"), 'w') as file:
+            json.dump(make_stlats(0), file)
+        # a past season has the stlats of every day, these change from day to day
+        for day in range(0, 99):
+            with open(os.path.join(data_dir, 'stlats', f"s{SEASON}_d{day}_stlats.json"), 'w') as file:
+                json.dump(make_stlats(day + 1), file)
+        cwd = os.getcwd()
+        os.chdir(os.path.join(directory.name, 'src'))
+        self.addCleanup(os.chdir, cwd)
+        self.addCleanup(season_sim.team_states.clear)
+        self.results_dir = os.path.join(data_dir, 'results')
+
+    def read_days(self, file_id):
+        outputs = {}
+        res_dir = os.path.join(self.results_dir, f"{file_id}_season_sim_stats")
+        for kind in ['team_records', 'player_stats']:
+            for day in DAYS:
+                with open(os.path.join(res_dir, kind, f"day{day}.json"), 'r') as file:
+                    outputs[(kind, day)] = json.load(file)
+        return outputs
+
+    def test_full_season_matches_a_sim_per_day(self):
+        for future in [True, False]:
+            for day in DAYS:
+                # each day as its own request, which starts from fresh team states
+                season_sim.team_states.clear()
+                season_sim.run_season_sim(SEASON, day, f"daily{future}", 4, future=future, seed=7)
+            season_sim.run_full_season_sim(SEASON, f"full{future}", 4, future=future, seed=7, workers=2, days=DAYS)
+            per_day = self.read_days(f"daily{future}")
+            self.assertEqual(len(per_day[('team_records', 0)]), 4)
+            self.assertEqual(self.read_days(f"full{future}"), per_day)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+import unittest
+
+from common import BlaseballStatistics as Stats
+from common import RandomSource, SimulationGranularity, Weather
+from shard_sim import GameAccumulator, read_shard, reduce_shard_files, run_shard, run_sharded, split_shards, \
+    write_shard
+from sim_fixtures import make_game
+
+
+def same_totals(test, first, second):
+    test.assertEqual(first.to_dict(), second.to_dict())
+
+
+class TestShardSim(unittest.TestCase):
+    def test_split_shards_covers_every_iteration(self):
+        self.assertEqual(split_shards(10, 3), [(0, 4), (4, 3), (7, 3)])
+        self.assertEqual(split_shards(2, 5), [(0, 1), (1, 1)])
+
+    def test_shards_merge_into_one_run(self):
+        game = make_game(Weather.SUN2, seed=1, headless=True)
+        whole = run_shard(game, 5, RandomSource.PSEUDO, 0, 24)
+        self.assertEqual(whole.iterations, 24)
+        same_totals(self, run_sharded(game, 5, 24, 4), whole)
+        same_totals(self, run_sharded(game, 5, 24, 3, workers=2), whole)
+        self.assertAlmostEqual(whole.home_scores.mean(24) * 24,
+                               sum(tenths * count for tenths, count in whole.home_scores.histogram.items()) / 10)
+        self.assertEqual(sum(whole.away_scores.histogram.values()), 24)
+        averages = whole.average_stats(whole.home_stats)
+        self.assertEqual(len(averages), len(whole.home_stats.players))
+
+    def test_expected_pitch_counts_merge_exactly(self):
+        game = make_game(Weather.ECLIPSE, seed=1, headless=True, granularity=SimulationGranularity.PLATE_APPEARANCE)
+        whole = run_shard(game, 5, RandomSource.PSEUDO, 0, 40)
+        pitches = whole.home_stats.table().total(Stats.PITCHER_PITCHES_THROWN) + \
+            whole.away_stats.table().total(Stats.PITCHER_PITCHES_THROWN)
+        # plate appearances count their pitches as expected values
+        self.assertNotEqual(pitches, round(pitches, 1))
+        # only those are saved as fractions, every count as a plain int
+        saved = [value for _, _, value in whole.home_stats.to_dict()["totals"]]
+        self.assertTrue(any(isinstance(value, list) for value in saved))
+        self.assertTrue(any(isinstance(value, int) for value in saved))
+        for num_shards in [2, 4, 7]:
+            same_totals(self, run_sharded(game, 5, 40, num_shards), whole)
+
+    def test_merge_is_associative(self):
+        game = make_game(Weather.ECLIPSE, seed=2, headless=True)
+        shards = [run_shard(game, 6, RandomSource.PSEUDO, start, 5) for start in range(0, 15, 5)]
+        left = GameAccumulator().merge(GameAccumulator.from_dict(shards[0].to_dict())).merge(shards[1])
+        left.merge(shards[2])
+        right = GameAccumulator.from_dict(shards[1].to_dict()).merge(shards[2])
+        same_totals(self, left, GameAccumulator.from_dict(shards[0].to_dict()).merge(right))
+
+    def test_shard_files_reduce_to_the_run(self):
+        game = make_game(Weather.PEANUTS, seed=3, headless=True)
+        with tempfile.TemporaryDirectory() as directory:
+            filenames = []
+            for start, num_iterations in split_shards(12, 3):
+                filename = os.path.join(directory, f"shard{start}.json")
+                write_shard(run_shard(game, 7, RandomSource.PSEUDO, start, num_iterations), filename)
+                filenames.append(filename)
+            with open(filenames[0], 'r') as file:
+                self.assertEqual(json.load(file)["iterations"], 4)
+            self.assertEqual(read_shard(filenames[1]).iterations, 4)
+            same_totals(self, reduce_shard_files(filenames), run_sharded(game, 7, 12, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Games built on the shipped models for tests that need to simulate whole games"""
+import os
+import random
+from decimal import Decimal
+
+from game_state import GameState, InningHalf
+from model_registry import CURRENT_MODEL_SET, SHIPPED_MODEL_SET
+from team_state import TeamState
+from common import ForbiddenKnowledge as FK
+from common import BloodType, Weather
+from stadium import Stadium
+
+default_stadium = Stadium(
+    "team_id",
+    "stadium_id",
+    "stadium_name",
+    0.5,
+    0.5,
+    0.5,
+    0.5,
+    0.5,
+    0.5,
+    0.5,
+    [],
+)
+
+
+def make_team(team_id: str, prefix: str, is_home: bool, seed: int) -> TeamState:
+    rng = random.Random(seed)
+    player_ids = [f"{prefix}_{idx}" for idx in range(10)]
+    stlats = {player_id: {fk: rng.random() for fk in FK if fk != FK.VIBES} for player_id in player_ids}
+    team = TeamState(
+        team_id=team_id,
+        name=prefix,
+        season=15,
+        day=1,
+        stadium=default_stadium,
+        weather=Weather.ECLIPSE,
+        is_home=is_home,
+        num_bases=4,
+        balls_for_walk=4,
+        strikes_for_out=3,
+        outs_for_inning=3,
+        lineup={idx: player_ids[idx - 1] for idx in range(1, 10)},
+        rotation={1: player_ids[9]},
+        starting_pitcher=player_ids[9],
+        cur_pitcher_pos=1,
+        stlats=stlats,
+        buffs={player_id: {} for player_id in player_ids},
+        game_stats={},
+        segmented_stats={},
+        blood={player_id: BloodType.A for player_id in player_ids},
+        player_names={player_id: player_id for player_id in player_ids},
+        cur_batter_pos=1,
+    )
+    team.reset_team_state(game_stat_reset=True)
+    return team
+
+
+def make_game(
+    weather: Weather = Weather.ECLIPSE,
+    home_team_id: str = "b72f3061-f573-40d7-832a-5ad475bd7909",
+    away_team_id: str = "878c1bf6-0d21-4659-bfee-916c8314d69c",
+    **kwargs,
+) -> GameState:
+    home_team = make_team(home_team_id, "home", True, 1)
+    away_team = make_team(away_team_id, "away", False, 2)
+    return GameState(
+        game_id="test_game",
+        season=15,
+        day=1,
+        stadium=default_stadium,
+        home_team=home_team,
+        away_team=away_team,
+        home_score=Decimal("0"),
+        away_score=Decimal("0"),
+        inning=1,
+        half=InningHalf.TOP,
+        outs=0,
+        strikes=0,
+        balls=0,
+        weather=weather,
+        model_set=SHIPPED_MODEL_SET,
+        **kwargs,
+    )
+
+
+def link_current_models(models_dir: str) -> None:
+    """Stand the shipped models in for the current ones the drivers play on, in a season_sim/models directory"""
+    for model in CURRENT_MODEL_SET.models:
+        os.symlink(os.path.abspath(SHIPPED_MODEL_SET.get_path(model)),
+                   os.path.join(models_dir, os.path.basename(CURRENT_MODEL_SET.get_path(model))))
@@ -0,0 +1,70 @@
+import unittest
+
+from sim_fixtures import make_game
+from common import BlaseballStatistics as Stats
+from common import SimulationGranularity, StatProfile, Weather
+from daily_sim import summarize_simulations
+from stats_table import BATTER_EVENT_STATS, PITCHER_EVENT_STATS, PROFILE_STATS
+from team_state import TEAM_ID
+
+
+class TestStatProfile(unittest.TestCase):
+    def test_profiles_play_the_same_games(self):
+        games = {profile: make_game(seed=4, headless=True, stat_profile=profile) for profile in StatProfile}
+        for _ in range(5):
+            scores = {profile: game.simulate_game()[:2] for profile, game in games.items()}
+            self.assertEqual(len(set(scores.values())), 1)
+            for game in games.values():
+                game.reset_game_state()
+        full = games[StatProfile.FULL]
+        for profile, game in games.items():
+            for team, full_team in [(game.home_team, full.home_team), (game.away_team, full.away_team)]:
+                for player_id, stats in team.game_stats.items():
+                    for stat, value in stats.items():
+                        expected = full_team.game_stats[player_id][stat] if stat in PROFILE_STATS[profile] else 0.0
+                        self.assertEqual(value, expected)
+            self.assertEqual(game.home_team.game_stats[TEAM_ID][Stats.TEAM_WINS],
+                             full.home_team.game_stats[TEAM_ID][Stats.TEAM_WINS])
+        self.assertFalse(games[StatProfile.WINS_ONLY].count_pitches)
+
+    def test_pitcher_lines_summarize_like_the_box_score(self):
+        summaries = []
+        for profile in [StatProfile.PITCHER_LINES, StatProfile.FULL]:
+            game = make_game(seed=6, headless=True, stat_profile=profile)
+            for _ in range(5):
+                game.simulate_game()
+                game.reset_game_state()
+            summaries.append(summarize_simulations(game.home_team, game.away_team, [], [], 5))
+        self.assertEqual(summaries[0], summaries[1])
+        full = game.away_team.game_stats
+        self.assertEqual(summaries[1]["away_team"]["strikeouts"] * 5,
+                         sum(stats[Stats.BATTER_STRIKEOUTS] for stats in full.values()))
+
+    def test_event_counts_derive_the_same_stats(self):
+        for weather, profile, granularity in [
+            (Weather.SUN2, StatProfile.FULL, SimulationGranularity.PITCH),
+            (Weather.COFFEE, StatProfile.PITCHER_LINES, SimulationGranularity.PITCH),
+            (Weather.ECLIPSE, StatProfile.FULL, SimulationGranularity.PLATE_APPEARANCE),
+        ]:
+            games = [make_game(weather, seed=8, headless=True, stat_profile=profile, granularity=granularity,
+                               use_matchup_table=True, event_counts=event_counts)
+                     for event_counts in [False, True]]
+            for game in games:
+                for _ in range(4):
+                    game.simulate_game()
+                    game.reset_game_state()
+            for stats_of in [lambda team: team.game_stats, lambda team: team.segmented_stats]:
+                self.assertEqual(stats_of(games[0].home_team), stats_of(games[1].home_team))
+                self.assertEqual(stats_of(games[0].away_team), stats_of(games[1].away_team))
+            pitcher = games[1].home_team.starting_pitcher
+            self.assertGreater(games[1].home_team.game_stats[pitcher][Stats.PITCHER_BATTERS_FACED], 0.0)
+
+    def test_profiles_keep_whole_events(self):
+        for kept in PROFILE_STATS.values():
+            for event_stats in [BATTER_EVENT_STATS, PITCHER_EVENT_STATS]:
+                for stats in event_stats.values():
+                    self.assertIn(len(kept.intersection(stats)), [0, len(stats)])
+
+
+if __name__ == '__main__':
+    unittest.main()
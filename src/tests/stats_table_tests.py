@@ -0,0 +1,61 @@
+import copy
+import pickle
+import unittest
+
+from common import BlaseballStatistics as Stats
+from stats_table import INITIAL_DAYS, INITIAL_PLAYERS, StatsTable
+from sim_fixtures import make_game
+
+
+class TestStatsTable(unittest.TestCase):
+    def test_accumulates_and_exports_dicts(self):
+        table = StatsTable()
+        for idx in range(INITIAL_PLAYERS + 1):
+            table.add(f"p{idx}", Stats.BATTER_HITS.value, 1.0, idx % (INITIAL_DAYS + 1))
+        table.add("p0", Stats.BATTER_HITS.value, 2.0, 7)
+        table.add("p0", Stats.PITCHER_STRIKEOUTS.value, 1.0, 0)
+        game_stats = table.game_stats()
+        self.assertEqual(len(game_stats), INITIAL_PLAYERS + 1)
+        self.assertEqual(game_stats["p0"][Stats.BATTER_HITS], 3.0)
+        self.assertEqual(game_stats["p0"][Stats.PITCHER_STRIKEOUTS], 1.0)
+        self.assertEqual(game_stats["p1"][Stats.PITCHER_STRIKEOUTS], 0.0)
+        self.assertEqual(set(game_stats["p1"].keys()), set(Stats))
+        segmented = table.segmented_stats()
+        self.assertEqual(sorted(segmented.keys()), list(range(INITIAL_DAYS + 1)) + [7])
+        self.assertEqual(set(segmented[7].keys()), {"p0"})
+        self.assertEqual(segmented[0]["p0"][Stats.PITCHER_STRIKEOUTS], 1.0)
+        self.assertEqual(table.get("p0", Stats.BATTER_HITS), 3.0)
+        self.assertEqual(table.get("missing", Stats.BATTER_HITS), 0.0)
+
+        for cloned in [copy.deepcopy(table), pickle.loads(pickle.dumps(table))]:
+            cloned.add("p0", Stats.BATTER_HITS.value, 1.0, 0)
+            self.assertEqual(cloned.get("p0", Stats.BATTER_HITS), 4.0)
+        self.assertEqual(table.get("p0", Stats.BATTER_HITS), 3.0)
+
+        table.reset(["p0", "new"])
+        self.assertEqual(table.segmented_stats(), {})
+        self.assertEqual(table.game_stats()["new"][Stats.BATTER_HITS], 0.0)
+        self.assertEqual(table.game_stats()["p0"][Stats.BATTER_HITS], 0.0)
+
+    def test_merge_and_load_match_dict_stats(self):
+        game = make_game(seed=3)
+        copies = [game.home_team.copy_for_game() for _ in range(2)]
+        for day, team in enumerate(copies):
+            team.update_stat("home_1", Stats.BATTER_HITS, 1.0, day)
+            team.update_stat("sub", Stats.BATTER_WALKS, 2.0, day)
+        game.home_team.reset_game_stats()
+        for team in copies:
+            game.home_team.merge_stats(team)
+        game_stats = game.home_team.game_stats
+        self.assertEqual(game_stats["home_1"][Stats.BATTER_HITS], 2.0)
+        self.assertEqual(game_stats["sub"][Stats.BATTER_WALKS], 4.0)
+        self.assertEqual(game.home_team.segmented_stats[1]["sub"][Stats.BATTER_WALKS], 2.0)
+
+        loaded = StatsTable()
+        loaded.load(game_stats, game.home_team.segmented_stats)
+        self.assertEqual(loaded.game_stats(), game_stats)
+        self.assertEqual(loaded.segmented_stats(), game.home_team.segmented_stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,6 @@
 import os
 import unittest
 
-from decimal import Decimal
 from team_state import TeamState
 from common import BlaseballStatistics as Stats
 from common import ForbiddenKnowledge as FK
@@ -495,19 +494,19 @@ class TestValidateModifiers(TestTeamState):
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.PITCHING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.DEFENSE])
         self.assertEqual(1, self.team_state.player_buffs["p1"][PlayerBuff.UNDER_OVER])
-        self.team_state.validate_game_state_additives(Decimal(4.0), default_stadium)
+        self.team_state.validate_game_state_additives(40, default_stadium)
         self.assertEqual(1.2, self.team_state.player_additives["p1"][AdditiveTypes.BASE_RUNNING])
         self.assertEqual(1.2, self.team_state.player_additives["p1"][AdditiveTypes.BATTING])
         self.assertEqual(1.2, self.team_state.player_additives["p1"][AdditiveTypes.PITCHING])
         self.assertEqual(1.2, self.team_state.player_additives["p1"][AdditiveTypes.DEFENSE])
         self.assertEqual(2, self.team_state.player_buffs["p1"][PlayerBuff.UNDER_OVER])
-        self.team_state.validate_game_state_additives(Decimal(5.0), default_stadium)
+        self.team_state.validate_game_state_additives(50, default_stadium)
         self.assertEqual(1.2, self.team_state.player_additives["p1"][AdditiveTypes.BASE_RUNNING])
         self.assertEqual(1.2, self.team_state.player_additives["p1"][AdditiveTypes.BATTING])
         self.assertEqual(1.2, self.team_state.player_additives["p1"][AdditiveTypes.PITCHING])
         self.assertEqual(1.2, self.team_state.player_additives["p1"][AdditiveTypes.DEFENSE])
         self.assertEqual(2, self.team_state.player_buffs["p1"][PlayerBuff.UNDER_OVER])
-        self.team_state.validate_game_state_additives(Decimal(5.1), default_stadium)
+        self.team_state.validate_game_state_additives(51, default_stadium)
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.BASE_RUNNING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.BATTING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.PITCHING])
@@ -521,19 +520,19 @@ class TestValidateModifiers(TestTeamState):
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.PITCHING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.DEFENSE])
         self.assertEqual(1, self.team_state.player_buffs["p1"][PlayerBuff.OVER_UNDER])
-        self.team_state.validate_game_state_additives(Decimal(4.0), default_stadium)
+        self.team_state.validate_game_state_additives(40, default_stadium)
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.BASE_RUNNING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.BATTING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.PITCHING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.DEFENSE])
         self.assertEqual(1, self.team_state.player_buffs["p1"][PlayerBuff.OVER_UNDER])
-        self.team_state.validate_game_state_additives(Decimal(6.0), default_stadium)
+        self.team_state.validate_game_state_additives(60, default_stadium)
         self.assertEqual(1.0/1.2, self.team_state.player_additives["p1"][AdditiveTypes.BASE_RUNNING])
         self.assertEqual(1.0/1.2, self.team_state.player_additives["p1"][AdditiveTypes.BATTING])
         self.assertEqual(1.0/1.2, self.team_state.player_additives["p1"][AdditiveTypes.PITCHING])
         self.assertEqual(1.0/1.2, self.team_state.player_additives["p1"][AdditiveTypes.DEFENSE])
         self.assertEqual(2, self.team_state.player_buffs["p1"][PlayerBuff.OVER_UNDER])
-        self.team_state.validate_game_state_additives(Decimal(5.0), default_stadium)
+        self.team_state.validate_game_state_additives(50, default_stadium)
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.BASE_RUNNING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.BATTING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.PITCHING])
@@ -545,31 +544,31 @@ class TestValidateModifiers(TestTeamState):
         self.team_state.season = 15
         self.team_state.weather = Weather.SUN2
         self.team_state.runners_aboard = False
-        self.team_state.validate_game_state_additives(Decimal(4.0), default_stadium)
+        self.team_state.validate_game_state_additives(40, default_stadium)
         self.assertEqual(1.0, self.team_state.batting_addition)
         self.assertEqual(1.0, self.team_state.pitching_addition)
         self.assertEqual(1.0, self.team_state.base_running_addition)
         self.assertEqual(1.0, self.team_state.defense_addition)
         self.team_state.weather = Weather.FLOODING
-        self.team_state.validate_game_state_additives(Decimal(4.0), default_stadium)
+        self.team_state.validate_game_state_additives(40, default_stadium)
         self.assertEqual(1.0, self.team_state.batting_addition)
         self.assertEqual(1.0, self.team_state.pitching_addition)
         self.assertEqual(1.0, self.team_state.base_running_addition)
         self.assertEqual(1.0, self.team_state.defense_addition)
         self.team_state.team_enum = Team.MOIST_TALKERS
-        self.team_state.validate_game_state_additives(Decimal(4.0), default_stadium)
+        self.team_state.validate_game_state_additives(40, default_stadium)
         self.assertEqual(1.0, self.team_state.batting_addition)
         self.assertEqual(1.0, self.team_state.pitching_addition)
         self.assertEqual(1.0, self.team_state.base_running_addition)
         self.assertEqual(1.0, self.team_state.defense_addition)
         self.team_state.runners_aboard = True
-        self.team_state.validate_game_state_additives(Decimal(4.0), default_stadium)
+        self.team_state.validate_game_state_additives(40, default_stadium)
         self.assertEqual(1.25, self.team_state.batting_addition)
         self.assertEqual(1.25, self.team_state.pitching_addition)
         self.assertEqual(1.25, self.team_state.base_running_addition)
         self.assertEqual(1.25, self.team_state.defense_addition)
         self.team_state.runners_aboard = False
-        self.team_state.validate_game_state_additives(Decimal(4.0), default_stadium)
+        self.team_state.validate_game_state_additives(40, default_stadium)
         self.assertEqual(1.0, self.team_state.batting_addition)
         self.assertEqual(1.0, self.team_state.pitching_addition)
         self.assertEqual(1.0, self.team_state.base_running_addition)
@@ -579,7 +578,7 @@ class TestValidateModifiers(TestTeamState):
         self.team_state.player_buffs["p1"][PlayerBuff.PRESSURE] = 1
         self.team_state.weather = Weather.SUN2
         self.team_state.runners_aboard = True
-        self.team_state.validate_game_state_additives(Decimal(4.0), default_stadium)
+        self.team_state.validate_game_state_additives(40, default_stadium)
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.BASE_RUNNING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.BATTING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.PITCHING])
@@ -588,7 +587,7 @@ class TestValidateModifiers(TestTeamState):
 
         self.team_state.weather = Weather.FLOODING
         self.team_state.runners_aboard = False
-        self.team_state.validate_game_state_additives(Decimal(4.0), default_stadium)
+        self.team_state.validate_game_state_additives(40, default_stadium)
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.BASE_RUNNING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.BATTING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.PITCHING])
@@ -596,7 +595,7 @@ class TestValidateModifiers(TestTeamState):
         self.assertEqual(1, self.team_state.player_buffs["p1"][PlayerBuff.PRESSURE])
 
         self.team_state.runners_aboard = True
-        self.team_state.validate_game_state_additives(Decimal(4.0), default_stadium)
+        self.team_state.validate_game_state_additives(40, default_stadium)
         self.assertEqual(1.25, self.team_state.player_additives["p1"][AdditiveTypes.BASE_RUNNING])
         self.assertEqual(1.25, self.team_state.player_additives["p1"][AdditiveTypes.BATTING])
         self.assertEqual(1.25, self.team_state.player_additives["p1"][AdditiveTypes.PITCHING])
@@ -604,7 +603,7 @@ class TestValidateModifiers(TestTeamState):
         self.assertEqual(2, self.team_state.player_buffs["p1"][PlayerBuff.PRESSURE])
 
         self.team_state.runners_aboard = False
-        self.team_state.validate_game_state_additives(Decimal(4.0), default_stadium)
+        self.team_state.validate_game_state_additives(40, default_stadium)
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.BASE_RUNNING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.BATTING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.PITCHING])
@@ -614,7 +613,7 @@ class TestValidateModifiers(TestTeamState):
     def test_player_super_yummy(self):
         self.team_state.player_buffs["p1"][PlayerBuff.SUPER_YUMMY] = 1
         self.team_state.weather = Weather.SUN2
-        self.team_state.validate_game_state_additives(Decimal(4.0), default_stadium)
+        self.team_state.validate_game_state_additives(40, default_stadium)
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.BASE_RUNNING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.BATTING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.PITCHING])
@@ -622,7 +621,7 @@ class TestValidateModifiers(TestTeamState):
         self.assertEqual(1, self.team_state.player_buffs["p1"][PlayerBuff.SUPER_YUMMY])
 
         default_stadium.has_peanut_mister = True
-        self.team_state.validate_game_state_additives(Decimal(4.0), default_stadium)
+        self.team_state.validate_game_state_additives(40, default_stadium)
         self.assertEqual(1.2, self.team_state.player_additives["p1"][AdditiveTypes.BASE_RUNNING])
         self.assertEqual(1.2, self.team_state.player_additives["p1"][AdditiveTypes.BATTING])
         self.assertEqual(1.2, self.team_state.player_additives["p1"][AdditiveTypes.PITCHING])
@@ -630,7 +629,7 @@ class TestValidateModifiers(TestTeamState):
         self.assertEqual(2, self.team_state.player_buffs["p1"][PlayerBuff.SUPER_YUMMY])
 
         default_stadium.has_peanut_mister = False
-        self.team_state.validate_game_state_additives(Decimal(4.0), default_stadium)
+        self.team_state.validate_game_state_additives(40, default_stadium)
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.BASE_RUNNING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.BATTING])
         self.assertEqual(1.0, self.team_state.player_additives["p1"][AdditiveTypes.PITCHING])
@@ -638,7 +637,7 @@ class TestValidateModifiers(TestTeamState):
         self.assertEqual(1, self.team_state.player_buffs["p1"][PlayerBuff.SUPER_YUMMY])
 
         self.team_state.weather = Weather.PEANUTS
-        self.team_state.validate_game_state_additives(Decimal(4.0), default_stadium)
+        self.team_state.validate_game_state_additives(40, default_stadium)
         self.assertEqual(1.2, self.team_state.player_additives["p1"][AdditiveTypes.BASE_RUNNING])
         self.assertEqual(1.2, self.team_state.player_additives["p1"][AdditiveTypes.BATTING])
         self.assertEqual(1.2, self.team_state.player_additives["p1"][AdditiveTypes.PITCHING])
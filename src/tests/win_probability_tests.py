@@ -0,0 +1,60 @@
+import math
+import random
+import unittest
+
+import numpy as np
+
+from sim_fixtures import make_game
+from team_state import TEAM_ID
+from win_probability import WinProbabilityEngine
+from common import BlaseballStatistics as Stats
+from common import PlayerBuff, Weather
+
+# teams without any team events, so the whole game can be solved
+BREATH_MINTS = "adc5b394-8f76-416d-9ce9-813706877b84"
+GARAGES = "105bc3ff-1320-4e37-8ef0-8d595cb95dd0"
+
+
+def make_solvable_game(weather: Weather = Weather.ECLIPSE):
+    return make_game(weather, home_team_id=BREATH_MINTS, away_team_id=GARAGES)
+
+
+class TestWinProbabilityEngine(unittest.TestCase):
+    def test_can_model(self):
+        self.assertTrue(WinProbabilityEngine.can_model(make_solvable_game()))
+        # the default fixture teams charm and acid
+        self.assertFalse(WinProbabilityEngine.can_model(make_game()))
+        self.assertFalse(WinProbabilityEngine.can_model(make_solvable_game(Weather.SUN2)))
+        game = make_solvable_game()
+        game.home_team.player_buffs[game.home_team.cur_batter][PlayerBuff.SPICY] = 1
+        self.assertFalse(WinProbabilityEngine.can_model(game))
+
+    def test_half_innings_end(self):
+        engine = WinProbabilityEngine(make_solvable_game())
+        for model in [engine.away, engine.home]:
+            np.testing.assert_allclose(model.transfer.sum(axis=(1, 2)), 1.0, atol=1e-9)
+            self.assertTrue(np.all(model.transfer >= 0.0))
+        odds = engine.solve()
+        self.assertAlmostEqual(odds["home_team"]["win"] + odds["away_team"]["win"], 1.0)
+
+    def test_matches_monte_carlo(self):
+        odds = WinProbabilityEngine(make_solvable_game()).solve()
+        random.seed(17)
+        game = make_solvable_game()
+        num_games = 400
+        scores = []
+        for _ in range(num_games):
+            home_score, away_score, _ = game.simulate_game()
+            scores.append((home_score, away_score))
+            game.reset_game_state()
+        home_win = game.home_team.game_stats[TEAM_ID].get(Stats.TEAM_WINS, 0) / num_games
+        expected = odds["home_team"]["win"]
+        self.assertAlmostEqual(home_win, expected, delta=4 * math.sqrt(expected * (1 - expected) / num_games))
+        for team, idx in [(game.home_team, 0), (game.away_team, 1)]:
+            team_odds = odds["home_team" if team.is_home else "away_team"]
+            over_ten = sum(1 for score in scores if score[idx] > 10) / num_games
+            self.assertAlmostEqual(over_ten, team_odds["over_ten"],
+                                   delta=4 * math.sqrt(team_odds["over_ten"] * (1 - team_odds["over_ten"]) / num_games))
+            for stat, key in [(Stats.BATTER_STRIKEOUTS, "strikeouts"), (Stats.BATTER_HRS, "home_runs")]:
+                total = sum(stats.get(stat, 0.0) for stats in team.game_stats.values()) / num_games
+                self.assertAlmostEqual(total, team_odds[key], delta=0.1 * team_odds[key] + 0.1)
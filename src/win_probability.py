@@ -0,0 +1,504 @@
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+from common import MachineLearnedModel as Ml
+from common import PitchEventTeamBuff, PlateAppearanceOutcome, PlayerBuff, Weather
+from common import pitch_reroll_event_map, team_pitch_event_map
+from game_state import BIG_BUCKET_PERCENTAGE, FIERY_TRIGGER_PERCENTAGE, PSYCHIC_TRIGGER_PERCENTAGE, GameState, InningHalf
+from matchup_table import MatchupTable
+from plate_appearance import PlateAppearanceChain
+from team_state import TeamState
+
+# runs in a half inning and runs in a game are tracked up to these totals, anything above is counted at the cap
+MAX_HALF_INNING_RUNS = 40
+MAX_GAME_RUNS = 100
+EXTRA_INNING_TOLERANCE = 1e-12
+MAX_EXTRA_INNINGS = 50
+RUNNER_MODELS = [Ml.SB_ATTEMPT, Ml.SB_SUCCESS, Ml.RUNNER_ADV_HIT, Ml.RUNNER_ADV_OUT]
+# weathers with events that change the score, the runners or a player's buffs mid game
+UNMODELED_WEATHER = [
+    Weather.COFFEE, Weather.COFFEE2, Weather.COFFEE3, Weather.FLOODING, Weather.SUN2, Weather.BLACKHOLE,
+]
+# buffs that turn on and off with the game state or add fractional runs
+UNMODELED_PLAYER_BUFFS = [
+    PlayerBuff.HAUNTED, PlayerBuff.BLASERUNNING, PlayerBuff.UNDER_OVER, PlayerBuff.OVER_UNDER, PlayerBuff.SPICY,
+    PlayerBuff.SUPER_YUMMY, PlayerBuff.PRESSURE, PlayerBuff.TRIPLE_THREAT, PlayerBuff.COFFEE_RALLY,
+]
+# team pitch events the plate appearance chain already models
+MODELED_PITCH_EVENTS = [PitchEventTeamBuff.FIERY, PitchEventTeamBuff.PSYCHIC]
+SKIPPED_BATTER_BUFFS = [PlayerBuff.ELSEWHERE, PlayerBuff.SHELLED]
+PA_OUTCOMES = [
+    PlateAppearanceOutcome.WALK, PlateAppearanceOutcome.STRIKEOUT, PlateAppearanceOutcome.HIT,
+    PlateAppearanceOutcome.OUT,
+]
+
+# (outs, batting order index of the runner on each base or -1, batting order index at bat, (balls, strikes))
+HalfInningState = Tuple[int, Tuple[int, ...], int, Tuple[int, int]]
+# (probability, outs added, bases after, runs, strikeouts, home runs)
+BaseOutcome = Tuple[float, int, Tuple[int, ...], int, int, int]
+
+
+def has_pitch_event(team: TeamState, event: PitchEventTeamBuff) -> bool:
+    return team.team_enum in team_pitch_event_map and team_pitch_event_map[team.team_enum][0] == event
+
+
+def play_half(dist: np.ndarray, transfer: np.ndarray) -> np.ndarray:
+    """Play a half inning from a [batting order index, runs] distribution, counting runs over the cap at the cap"""
+    max_runs = dist.shape[1]
+    ret_val = np.zeros_like(dist)
+    for runs in range(transfer.shape[2]):
+        moved = transfer[:, :, runs].T @ dist
+        if runs < max_runs:
+            ret_val[:, runs:] += moved[:, :max_runs - runs]
+            ret_val[:, max_runs - 1] += moved[:, max_runs - runs:].sum(axis=1)
+        else:
+            ret_val[:, max_runs - 1] += moved.sum(axis=1)
+    return ret_val
+
+
+class HalfInningModel(object):
+    def __init__(self, game: GameState, batting: TeamState, pitching: TeamState, table: MatchupTable) -> None:
+        """ The half innings of one team batting against the other team's starter.  For every batting order index
+        a half inning can start at, solves the chance of each number of runs together with the batter due up next,
+        and the expected strikeouts and home runs.  A state steps exactly like GameState.plate_appearance_sim,
+        by a steal attempt or by the count of a plate appearance running out. """
+        self.num_bases = batting.num_bases
+        self.outs_for_inning = batting.outs_for_inning
+        self.balls_for_walk = batting.balls_for_walk
+        self.strikes_for_out = batting.strikes_for_out
+        self.big_buckets = game.stadium.has_big_buckets
+        self.order = [slot for slot in sorted(batting.lineup.keys())
+                      if not any(buff in batting.player_buffs[batting.lineup[slot]] for buff in SKIPPED_BATTER_BUFFS)]
+        self.fiery_chance = FIERY_TRIGGER_PERCENTAGE if has_pitch_event(pitching, PitchEventTeamBuff.FIERY) else 0.0
+        self.psychic_batter = PSYCHIC_TRIGGER_PERCENTAGE \
+            if has_pitch_event(batting, PitchEventTeamBuff.PSYCHIC) else 0.0
+        self.psychic_pitcher = PSYCHIC_TRIGGER_PERCENTAGE \
+            if has_pitch_event(pitching, PitchEventTeamBuff.PSYCHIC) else 0.0
+
+        # runners are known by batting order index, each runner model is fed the whole lineup at once
+        runner_fvs = []
+        for slot in self.order:
+            runner_fvs.extend(game.gen_runner_fv(
+                batting.get_runner_feature_vector(batting.lineup[slot]),
+                pitching.get_defense_feature_vector(),
+                pitching.get_pitcher_feature_vector(),
+                game.stadium.get_stadium_fv(),
+            ))
+        runner_probs = {model: game.clf[model].predict_proba(runner_fvs)[:, 1] for model in RUNNER_MODELS}
+        self.steal_attempt = runner_probs[Ml.SB_ATTEMPT]
+        self.steal_success = runner_probs[Ml.SB_SUCCESS]
+        self.advance_on_hit = runner_probs[Ml.RUNNER_ADV_HIT]
+        self.advance_on_out = runner_probs[Ml.RUNNER_ADV_OUT]
+        self.pitch_probs = []
+        self.hit_type = []
+        self.out_type = []
+        self.flinch = []
+        for slot in self.order:
+            row = table.rows[(batting.is_home, slot)]
+            self.pitch_probs.append(row.probs[Ml.PITCH])
+            self.hit_type.append(row.probs[Ml.HIT_TYPE])
+            self.out_type.append(row.probs[Ml.OUT_TYPE])
+            self.flinch.append(PlayerBuff.FLINCH in batting.player_buffs[batting.lineup[slot]])
+        self._chains: Dict[Tuple[int, float], PlateAppearanceChain] = {}
+        self._counts: Dict[Tuple[int, float, Tuple[int, int]], Tuple[Dict, List]] = {}
+        self._base_outcomes: Dict[Tuple, List[BaseOutcome]] = {}
+        self._steals: Dict[Tuple[int, ...], Tuple[float, List[BaseOutcome]]] = {}
+        self.num_states = 0
+        # transfer[start, end, runs] and the expected strikeouts and home runs of a half inning from each start
+        self.transfer, self.strikeouts, self.home_runs = self._solve()
+
+    def start_index(self, batting: TeamState) -> int:
+        """The batting order index of the batter due up, skipping unavailable batters as the game does"""
+        for offset in range(len(batting.lineup)):
+            slot = (batting.cur_batter_pos - 1 + offset) % len(batting.lineup) + 1
+            if slot in self.order:
+                return self.order.index(slot)
+        return 0
+
+    # COUNT MECHANICS
+    def _count_outcomes(self, idx: int, steal_chance: float, count: Tuple[int, int]) -> Tuple[Dict, List]:
+        """The chance of each way a plate appearance ends from a count, with the counts a steal attempt
+        interrupts it at kept apart"""
+        key = (idx, steal_chance, count)
+        if key not in self._counts:
+            chain_key = (idx, steal_chance)
+            if chain_key not in self._chains:
+                self._chains[chain_key] = PlateAppearanceChain(
+                    self.pitch_probs[idx], self.balls_for_walk, self.strikes_for_out, self.fiery_chance,
+                    self.flinch[idx], steal_chance,
+                )
+            outcomes = {outcome: 0.0 for outcome in PA_OUTCOMES}
+            interrupts = []
+            for pa_exit in self._chains[chain_key].exits(*count):
+                if pa_exit.outcome == PlateAppearanceOutcome.STEAL_ATTEMPT:
+                    interrupts.append(((pa_exit.balls, pa_exit.strikes), pa_exit.probability))
+                else:
+                    outcomes[pa_exit.outcome] += pa_exit.probability
+            self._counts[key] = (outcomes, interrupts)
+        return self._counts[key]
+
+    # BASE RUNNING MECHANICS, mirroring GameState on a tuple of runners indexed by base - 1
+    def _advance_all(self, bases: Tuple[int, ...], num_bases_to_advance: int) -> Tuple[Tuple[int, ...], int]:
+        new_bases = [-1] * len(bases)
+        runs = 0
+        for base in range(len(bases), 0, -1):
+            if bases[base - 1] < 0:
+                continue
+            if base >= self.num_bases - num_bases_to_advance:
+                runs += 1
+            else:
+                new_bases[base - 1 + num_bases_to_advance] = bases[base - 1]
+        return tuple(new_bases), runs
+
+    def _advance_forced(self, bases: Tuple[int, ...]) -> Tuple[Tuple[int, ...], int]:
+        new_bases = list(bases)
+        runs = 0
+        for base in range(len(bases), 0, -1):
+            if new_bases[base - 1] < 0 or not all(new_bases[lower] >= 0 for lower in range(base - 1)):
+                continue
+            if base == len(bases):
+                runs += 1
+            else:
+                new_bases[base] = new_bases[base - 1]
+            new_bases[base - 1] = -1
+        return tuple(new_bases), runs
+
+    def _extra_bases(self, bases: Tuple[int, ...], chances: Any) -> List[Tuple[float, Tuple[int, ...], int]]:
+        """Every runner with an open base ahead, from the lead runner back, may take one extra base"""
+        outcomes = [(1.0, bases, 0)]
+        for base in range(len(bases), 0, -1):
+            next_outcomes = []
+            for prob, cur_bases, runs in outcomes:
+                runner = cur_bases[base - 1]
+                if runner < 0 or (base < len(cur_bases) and cur_bases[base] >= 0):
+                    next_outcomes.append((prob, cur_bases, runs))
+                    continue
+                moved = list(cur_bases)
+                moved[base - 1] = -1
+                if base == len(cur_bases):
+                    runs_after = runs + 1
+                else:
+                    moved[base] = runner
+                    runs_after = runs
+                next_outcomes.append((prob * chances[runner], tuple(moved), runs_after))
+                next_outcomes.append((prob * (1.0 - chances[runner]), cur_bases, runs))
+            outcomes = next_outcomes
+        return outcomes
+
+    def _steal_outcomes(self, bases: Tuple[int, ...]) -> Tuple[float, List[BaseOutcome]]:
+        """The chance of a steal attempt before a pitch and how the bases and outs change once one is made.  The
+        lead runner with an open base ahead checks first, at most one runner attempts before each pitch."""
+        if bases in self._steals:
+            return self._steals[bases]
+        attempts = []
+        no_steal_chance = 1.0
+        for base in range(len(bases), 0, -1):
+            runner = bases[base - 1]
+            if runner < 0 or (base < len(bases) and bases[base] >= 0):
+                continue
+            attempts.append((base, runner, no_steal_chance * self.steal_attempt[runner]))
+            no_steal_chance *= 1.0 - self.steal_attempt[runner]
+        steal_chance = 1.0 - no_steal_chance
+        ret_val: List[BaseOutcome] = []
+        for base, runner, attempt_chance in attempts:
+            weight = attempt_chance / steal_chance
+            moved = list(bases)
+            moved[base - 1] = -1
+            caught = tuple(moved)
+            if base == len(bases):
+                stolen, runs = caught, 1
+            else:
+                moved[base] = runner
+                stolen, runs = tuple(moved), 0
+            ret_val.append((weight * self.steal_success[runner], 0, stolen, runs, 0, 0))
+            ret_val.append((weight * (1.0 - self.steal_success[runner]), 1, caught, 0, 0, 0))
+        self._steals[bases] = (steal_chance, ret_val)
+        return self._steals[bases]
+
+    def _plate_appearance_outcomes(
+        self, outcome: PlateAppearanceOutcome, outs: int, bases: Tuple[int, ...], idx: int
+    ) -> List[BaseOutcome]:
+        """How the bases and outs change after each way a plate appearance can end"""
+        last_out = outs + 1 >= self.outs_for_inning
+        key = (outcome, last_out, bases, idx)
+        if key in self._base_outcomes:
+            return self._base_outcomes[key]
+        ret_val: List[BaseOutcome] = []
+        if outcome in [PlateAppearanceOutcome.WALK, PlateAppearanceOutcome.STRIKEOUT]:
+            # psychic turns walks into strikeouts for the pitching team and strikeouts into walks for the batters
+            if outcome == PlateAppearanceOutcome.WALK:
+                walk_prob, strikeout_prob = 1.0 - self.psychic_pitcher, self.psychic_pitcher
+            else:
+                walk_prob, strikeout_prob = self.psychic_batter, 1.0 - self.psychic_batter
+            if walk_prob > 0.0:
+                walked, runs = self._advance_forced(bases)
+                ret_val.append((walk_prob, 0, (idx,) + walked[1:], runs, 0, 0))
+            if strikeout_prob > 0.0:
+                ret_val.append((strikeout_prob, 1, bases, 0, 1, 0))
+        elif outcome == PlateAppearanceOutcome.HIT:
+            # 0 = Single, 1 = Double, 2 = Triple, 3 = HR
+            for hit_type, hit_prob in enumerate(self.hit_type[idx]):
+                if hit_type == 3:
+                    cleared, runs = self._advance_all(bases, self.num_bases)
+                    bucket = BIG_BUCKET_PERCENTAGE if self.big_buckets else 0.0
+                    ret_val.append((hit_prob * (1.0 - bucket), 0, cleared, runs + 1, 0, 1))
+                    if bucket > 0.0:
+                        ret_val.append((hit_prob * bucket, 0, cleared, runs + 2, 0, 1))
+                    continue
+                advanced, runs = self._advance_all(bases, hit_type + 1)
+                for extra_prob, extra_bases, extra_runs in self._extra_bases(advanced, self.advance_on_hit):
+                    placed = list(extra_bases)
+                    placed[hit_type] = idx
+                    ret_val.append((hit_prob * extra_prob, 0, tuple(placed), runs + extra_runs, 0, 0))
+        elif last_out:
+            ret_val.append((1.0, 1, bases, 0, 0, 0))
+        else:
+            # 0 = Flyout, 1 = Groundout
+            fly_prob, ground_prob = self.out_type[idx]
+            for extra_prob, extra_bases, extra_runs in self._extra_bases(bases, self.advance_on_out):
+                ret_val.append((fly_prob * extra_prob, 1, extra_bases, extra_runs, 0, 0))
+            advanced, runs = self._advance_all(bases, 1)
+            ret_val.append((ground_prob, 1, advanced, runs, 0, 0))
+        self._base_outcomes[key] = ret_val
+        return ret_val
+
+    def transitions(self, state: HalfInningState) -> List[Tuple[HalfInningState, float, int, int, int]]:
+        """Every step out of a state as (next state, probability, runs, strikeouts, home runs)"""
+        outs, bases, idx, count = state
+        steal_chance, steals = self._steal_outcomes(bases)
+        no_steal_chance = 1.0 - steal_chance
+        outcomes, interrupts = self._count_outcomes(idx, steal_chance, count)
+        # a steal attempt before the first pitch or between two pitches leaves the count where it was
+        steal_counts = [(count, steal_chance)] + [(end_count, no_steal_chance * prob) for end_count, prob in interrupts]
+        ret_val = []
+        for steal_count, count_prob in steal_counts:
+            if count_prob <= 0.0:
+                continue
+            for prob, num_outs, new_bases, runs, strikeouts, home_runs in steals:
+                ret_val.append(((outs + num_outs, new_bases, idx, steal_count), count_prob * prob, runs, strikeouts,
+                                home_runs))
+        next_idx = (idx + 1) % len(self.order)
+        for outcome, outcome_prob in outcomes.items():
+            if outcome_prob <= 0.0:
+                continue
+            for prob, num_outs, new_bases, runs, strikeouts, home_runs in \
+                    self._plate_appearance_outcomes(outcome, outs, bases, idx):
+                ret_val.append(((outs + num_outs, new_bases, next_idx, (0, 0)),
+                                no_steal_chance * outcome_prob * prob, runs, strikeouts, home_runs))
+        return ret_val
+
+    def _solve(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Solve the half inning backwards one number of outs at a time.  Outs never go down, so within a number
+        of outs the runs scored are found in increasing order against a single sparse factorization."""
+        num_batters = len(self.order)
+        empty = (-1,) * (self.num_bases - 1)
+        starts = [(0, empty, idx, (0, 0)) for idx in range(num_batters)]
+        steps: Dict[HalfInningState, List] = {}
+        pending = list(starts)
+        while len(pending) > 0:
+            state = pending.pop()
+            if state in steps:
+                continue
+            steps[state] = self.transitions(state)
+            for next_state, _, _, _, _ in steps[state]:
+                if next_state[0] < self.outs_for_inning and next_state not in steps:
+                    pending.append(next_state)
+        self.num_states = len(steps)
+        # the inning ending is one more level, with a state for each batter due up next inning
+        levels: List[List[Any]] = [[] for _ in range(self.outs_for_inning)]
+        for state in steps.keys():
+            levels[state[0]].append(state)
+        levels.append(list(range(num_batters)))
+        index = {state: idx for level in levels[:-1] for idx, state in enumerate(level)}
+
+        max_runs = MAX_HALF_INNING_RUNS
+        # dist[outs][state, end, runs] is the chance of scoring runs from a state with end due up next inning, the
+        # last column holds every total at or above the cap.  ends is the same summed over the runs and counts the
+        # expected [strikeouts, home runs] from a state
+        dist: List[Any] = [None] * (self.outs_for_inning + 1)
+        ends: List[Any] = [None] * (self.outs_for_inning + 1)
+        counts: List[Any] = [None] * (self.outs_for_inning + 1)
+        dist[-1] = np.zeros((num_batters, num_batters, max_runs))
+        dist[-1][:, :, 0] = np.eye(num_batters)
+        ends[-1] = np.eye(num_batters)
+        counts[-1] = np.zeros((num_batters, 2))
+        for outs in reversed(range(self.outs_for_inning)):
+            level = levels[outs]
+            size = len(level)
+            # the transitions out of the level, keyed by the level they go to and the runs scored
+            entries: Dict[Tuple[int, int], Tuple[List[int], List[int], List[float]]] = {}
+            immediate = np.zeros((size, 2))
+            for src, state in enumerate(level):
+                for next_state, prob, runs, strikeouts, home_runs in steps[state]:
+                    immediate[src, 0] += prob * strikeouts
+                    immediate[src, 1] += prob * home_runs
+                    if next_state[0] >= self.outs_for_inning:
+                        key, dst = (self.outs_for_inning, min(runs, max_runs - 1)), next_state[2]
+                    else:
+                        key, dst = (next_state[0], min(runs, max_runs - 1)), index[next_state]
+                    rows, cols, vals = entries.setdefault(key, ([], [], []))
+                    rows.append(src)
+                    cols.append(dst)
+                    vals.append(prob)
+            matrices = {(next_outs, runs): sparse.csr_matrix((vals, (rows, cols)), shape=(size, len(levels[next_outs])))
+                        for (next_outs, runs), (rows, cols, vals) in entries.items()}
+            same = {runs: matrix for (next_outs, runs), matrix in matrices.items() if next_outs == outs}
+            later = {key: matrix for key, matrix in matrices.items() if key[0] != outs}
+            identity = sparse.identity(size, format="csc")
+            scoreless = same.get(0, sparse.csr_matrix((size, size)))
+            every = sum(same.values(), sparse.csr_matrix((size, size)))
+            solve_scoreless = splu((identity - scoreless).tocsc()).solve
+            solve_every = splu((identity - every).tocsc()).solve
+            rhs_ends = np.zeros((size, num_batters))
+            rhs_counts = immediate
+            for (next_outs, runs), matrix in later.items():
+                rhs_ends += matrix @ ends[next_outs]
+                rhs_counts += matrix @ counts[next_outs]
+            ends[outs] = solve_every(rhs_ends)
+            counts[outs] = solve_every(rhs_counts)
+            level_dist = np.zeros((size, num_batters, max_runs))
+            for total in range(max_runs - 1):
+                rhs = np.zeros((size, num_batters))
+                for (next_outs, runs), matrix in later.items():
+                    if runs <= total:
+                        rhs += matrix @ dist[next_outs][:, :, total - runs]
+                for runs, matrix in same.items():
+                    if 0 < runs <= total:
+                        rhs += matrix @ level_dist[:, :, total - runs]
+                level_dist[:, :, total] = solve_scoreless(rhs)
+            # whatever is left of each end scored at least the cap
+            level_dist[:, :, max_runs - 1] = np.maximum(ends[outs] - level_dist[:, :, :max_runs - 1].sum(axis=2), 0.0)
+            dist[outs] = level_dist
+        start_rows = [index[state] for state in starts]
+        return dist[0][start_rows], counts[0][start_rows, 0], counts[0][start_rows, 1]
+
+
+class WinProbabilityEngine(object):
+    def __init__(self, game: GameState) -> None:
+        """ Exact game outcome odds from the start of a game by dynamic programming over the half innings, in
+        place of Monte Carlo.  Only games without mid game score, runner or additive changes can be solved, check
+        can_model first. """
+        self.game = game
+        self.table = MatchupTable(game.clf, game.stadium.get_stadium_fv())
+        self.table.prepare(game.home_team, game.away_team)
+        self.away = HalfInningModel(game, game.away_team, game.home_team, self.table)
+        self.home = HalfInningModel(game, game.home_team, game.away_team, self.table)
+
+    @classmethod
+    def can_model(cls, game: GameState) -> bool:
+        """Check the game is at its start and nothing in it changes the score, runners or additives mid game"""
+        if game.inning != 1 or game.half != InningHalf.TOP or game.outs != 0 or game.balls != 0 or \
+                game.strikes != 0 or len(game.cur_base_runners) > 0 or game.away_score != 0 or \
+                game.home_score not in [0, 1]:
+            return False
+        if game.weather in UNMODELED_WEATHER:
+            return False
+        for team in [game.home_team, game.away_team]:
+            if game.weather == Weather.BIRD and \
+                    PlayerBuff.FRIEND_OF_CROWS in team.player_buffs[team.starting_pitcher]:
+                return False
+            for player_buffs in team.player_buffs.values():
+                if any(buff in player_buffs for buff in UNMODELED_PLAYER_BUFFS):
+                    return False
+                # over performing turns on after the first step of the game
+                if player_buffs.get(PlayerBuff.OVER_PERFORMING) == 1:
+                    return False
+            if team.team_enum in pitch_reroll_event_map:
+                event, start_season, end_season, req_blood = pitch_reroll_event_map[team.team_enum]
+                if game.check_valid_season(start_season, end_season):
+                    return False
+            if team.team_enum in team_pitch_event_map:
+                event, start_season, end_season, req_blood = team_pitch_event_map[team.team_enum]
+                if event == PitchEventTeamBuff.ACID or \
+                        (event not in MODELED_PITCH_EVENTS and game.check_valid_season(start_season, end_season)):
+                    return False
+        return True
+
+    def solve(self) -> Dict[str, Dict[str, float]]:
+        """The chance of each team winning, being shut out and scoring over 10 and over 20 runs, along with the
+        expected strikeouts and home runs of each team's batters"""
+        away = np.zeros((len(self.away.order), MAX_GAME_RUNS))
+        away[self.away.start_index(self.game.away_team), 0] = 1.0
+        home = np.zeros((len(self.home.order), MAX_GAME_RUNS))
+        home[self.home.start_index(self.game.home_team), int(self.game.home_score)] = 1.0
+        # [strikeouts, home runs] of each team's batters
+        away_counts = np.zeros(2)
+        home_counts = np.zeros(2)
+        # no half before the bottom of the 9th can end the game, so until then the teams score independently
+        for _ in range(9):
+            away_counts += self._expected_counts(self.away, away.sum(axis=1))
+            away = play_half(away, self.away.transfer)
+        for _ in range(8):
+            home_counts += self._expected_counts(self.home, home.sum(axis=1))
+            home = play_half(home, self.home.transfer)
+
+        # final[away runs, home runs] and tied[away index, home index, runs] going into extra innings
+        final = np.zeros((MAX_GAME_RUNS, MAX_GAME_RUNS))
+        tied = np.zeros((len(self.away.order), len(self.home.order), MAX_GAME_RUNS))
+        away_runs = away.sum(axis=0)
+        home_runs = home.sum(axis=0)
+        # the bottom of the 9th is only played when the home team isn't ahead
+        for runs in range(MAX_GAME_RUNS):
+            if away_runs[runs] <= 0.0:
+                continue
+            final[runs, runs + 1:] += away_runs[runs] * home_runs[runs + 1:]
+            trailing = home.copy()
+            trailing[:, runs + 1:] = 0.0
+            home_counts += away_runs[runs] * self._expected_counts(self.home, trailing.sum(axis=1))
+            played = play_half(trailing, self.home.transfer)
+            final[runs] += away_runs[runs] * played.sum(axis=0)
+            final[runs, runs] = 0.0
+            tied[:, :, runs] += np.outer(away[:, runs], played[:, runs])
+
+        away_transfer, home_transfer = self.away.transfer, self.home.transfer
+        num_scored = away_transfer.shape[2]
+        scored = np.arange(num_scored)
+        tied_runs = np.arange(MAX_GAME_RUNS)[:, None, None]
+        away_totals = np.minimum(tied_runs + scored[None, :, None], MAX_GAME_RUNS - 1)
+        home_totals = np.minimum(tied_runs + scored[None, None, :], MAX_GAME_RUNS - 1)
+        for _ in range(MAX_EXTRA_INNINGS):
+            if tied.sum() < EXTRA_INNING_TOLERANCE:
+                break
+            away_counts += self._expected_counts(self.away, tied.sum(axis=(1, 2)))
+            home_counts += self._expected_counts(self.home, tied.sum(axis=(0, 2)))
+            # outcomes[tied runs, away scored, home scored] of the inning, the innings that don't end tied are final
+            outcomes = np.einsum('ahs,ax,hy->sxy', tied, away_transfer.sum(axis=1), home_transfer.sum(axis=1),
+                                 optimize=True)
+            outcomes[:, scored, scored] = 0.0
+            np.add.at(final, (away_totals, home_totals), outcomes)
+            continued = np.einsum('ahs,abx,hcx->bcsx', tied, away_transfer, home_transfer, optimize=True)
+            tied = np.zeros_like(tied)
+            for runs in range(num_scored):
+                tied[:, :, runs:] += continued[:, :, :MAX_GAME_RUNS - runs, runs]
+                tied[:, :, MAX_GAME_RUNS - 1] += continued[:, :, MAX_GAME_RUNS - runs:, runs].sum(axis=2)
+        # what is left after the extra innings cap is spread over the finished games
+        final /= final.sum()
+        return self._summarize(final, away_counts, home_counts)
+
+    @classmethod
+    def _expected_counts(cls, model: HalfInningModel, starts: np.ndarray) -> np.ndarray:
+        return np.array([starts @ model.strikeouts, starts @ model.home_runs])
+
+    @classmethod
+    def _summarize(
+        cls, final: np.ndarray, away_counts: np.ndarray, home_counts: np.ndarray
+    ) -> Dict[str, Dict[str, float]]:
+        runs = np.arange(final.shape[0])
+        home_win = float(np.triu(final, 1).sum())
+        ret_val = {}
+        for team, scores, counts, win in [
+            ("home_team", final.sum(axis=0), home_counts, home_win),
+            ("away_team", final.sum(axis=1), away_counts, 1.0 - home_win),
+        ]:
+            ret_val[team] = {
+                "win": win,
+                "shutout": float(scores[0]),
+                "over_ten": float(scores[runs > 10].sum()),
+                "over_twenty": float(scores[runs > 20].sum()),
+                "strikeouts": float(counts[0]),
+                "home_runs": float(counts[1]),
+            }
+        return ret_val